@@ -0,0 +1,167 @@
+"""
+Time alignment of the ML and static interval logs
+
+The two controllers log at different SimulationTime instants and produce a
+different number of rows, so comparing them row by row mixes up different
+moments of the simulation. This module resamples both onto one shared time
+grid with np.searchsorted/np.bincount (no Python loop per row or per bin) and
+computes the per-bin deltas for every metric in a single pass.
+"""
+import numpy as np
+import pandas as pd
+
+from comparison_stats import improvement_percent
+
+
+ALIGNED_METRICS = ['TotalVehicles', 'VehiclesWaiting', 'QueueLength']
+
+
+def _sorted_series(intervals, metric):
+    t = intervals['SimulationTime'].to_numpy(dtype=np.float64)
+    y = intervals[metric].to_numpy(dtype=np.float64)
+    if t.size > 1 and np.any(np.diff(t) < 0):
+        order = np.argsort(t, kind='stable')
+        t, y = t[order], y[order]
+    return t, y
+
+
+def common_time_grid(ml_intervals, static_intervals, step=None):
+    """
+    Bin edges covering the time span both controllers have data for
+
+    Args:
+        ml_intervals: ML interval frame
+        static_intervals: Static interval frame
+        step: Bin width in seconds (default: the coarser median logging interval)
+
+    Returns:
+        Array of bin edges (empty if the time spans do not overlap)
+    """
+    t_ml = ml_intervals['SimulationTime'].to_numpy(dtype=np.float64)
+    t_static = static_intervals['SimulationTime'].to_numpy(dtype=np.float64)
+    if t_ml.size == 0 or t_static.size == 0:
+        return np.empty(0)
+
+    start = max(np.nanmin(t_ml), np.nanmin(t_static))
+    end = min(np.nanmax(t_ml), np.nanmax(t_static))
+    if end <= start:
+        return np.empty(0)
+
+    if step is None:
+        steps = [np.median(np.diff(np.sort(t))) for t in (t_ml, t_static) if t.size > 1]
+        step = max(steps) if steps else end - start
+    if not step or step <= 0:
+        step = end - start
+
+    n_bins = max(int(np.ceil((end - start) / step)), 1)
+    return start + step * np.arange(n_bins + 1)
+
+
+def resample_to_grid(t, y, edges, how='mean'):
+    """
+    Resample one sorted series onto bin edges
+
+    Args:
+        t: Sorted sample times
+        y: Sample values
+        edges: Bin edges from common_time_grid
+        how: 'mean' averages the samples inside each bin; 'last' takes the last
+            sample at or before each bin's end (sample-and-hold). Empty bins
+            always fall back to sample-and-hold.
+
+    Returns:
+        Array with one value per bin
+    """
+    n_bins = edges.size - 1
+    if n_bins <= 0 or t.size == 0:
+        return np.full(max(n_bins, 0), np.nan)
+
+    # Sample-and-hold: last observation at or before each bin end
+    last_idx = np.searchsorted(t, edges[1:], side='right') - 1
+    hold = np.where(last_idx >= 0, y[np.clip(last_idx, 0, None)], np.nan)
+    if how == 'last':
+        return hold
+    if how != 'mean':
+        raise ValueError(f"Unknown resampling method '{how}', expected 'mean' or 'last'")
+
+    bins = np.searchsorted(edges, t, side='right') - 1
+    # Samples exactly on the final edge belong to the last bin
+    bins[t == edges[-1]] = n_bins - 1
+    valid = (bins >= 0) & (bins < n_bins) & ~np.isnan(y)
+    sums = np.bincount(bins[valid], weights=y[valid], minlength=n_bins)
+    counts = np.bincount(bins[valid], minlength=n_bins)
+    return np.where(counts > 0, sums / np.maximum(counts, 1), hold)
+
+
+def align_intervals(ml_intervals, static_intervals, step=None, how='mean', metrics=None):
+    """
+    Resample both controllers onto a shared time grid
+
+    Args:
+        ml_intervals: ML interval frame
+        static_intervals: Static interval frame
+        step: Bin width in seconds (default: the coarser median logging interval)
+        how: 'mean' or 'last' (see resample_to_grid)
+        metrics: Metrics to align (default: ALIGNED_METRICS present in both frames)
+
+    Returns:
+        DataFrame with SimulationTime (bin start), ML_<metric>, Static_<metric>
+        and Delta_<metric> (ML minus Static) columns
+    """
+    if metrics is None:
+        metrics = ALIGNED_METRICS
+    metrics = [m for m in metrics if m in ml_intervals.columns and m in static_intervals.columns]
+
+    edges = common_time_grid(ml_intervals, static_intervals, step)
+    aligned = {'SimulationTime': edges[:-1]}
+    for metric in metrics:
+        ml_values = resample_to_grid(*_sorted_series(ml_intervals, metric), edges, how)
+        static_values = resample_to_grid(*_sorted_series(static_intervals, metric), edges, how)
+        aligned[f'ML_{metric}'] = ml_values
+        aligned[f'Static_{metric}'] = static_values
+        aligned[f'Delta_{metric}'] = ml_values - static_values
+    return pd.DataFrame(aligned)
+
+
+def time_window(df, start=None, end=None, time_column='SimulationTime'):
+    """Rows with start <= time < end (either bound may be None)"""
+    t = df[time_column].to_numpy()
+    lo = 0 if start is None else np.searchsorted(t, start, side='left')
+    hi = len(t) if end is None else np.searchsorted(t, end, side='left')
+    return df.iloc[lo:hi]
+
+
+def first_half_cut(aligned):
+    """Simulation time halfway through the span both controllers cover"""
+    t = aligned['SimulationTime'].to_numpy()
+    if t.size == 0:
+        return None
+    step = t[1] - t[0] if t.size > 1 else 0
+    return t[0] + (t[-1] + step - t[0]) / 2
+
+
+def aligned_summary(aligned, start=None, end=None):
+    """
+    Time-matched means and improvement per metric within a time window
+
+    Returns:
+        DataFrame with Metric, ML_Mean, Static_Mean, Mean_Delta and Improvement_%
+        (lower is better for every aligned metric except TotalVehicles)
+    """
+    window = time_window(aligned, start, end)
+    rows = []
+    for column in window.columns:
+        if not column.startswith('Delta_'):
+            continue
+        metric = column[len('Delta_'):]
+        ml_mean = window[f'ML_{metric}'].mean()
+        static_mean = window[f'Static_{metric}'].mean()
+        improvement = improvement_percent(metric, ml_mean, static_mean) if static_mean != 0 else 0
+        rows.append({
+            'Metric': metric,
+            'ML_Mean': ml_mean,
+            'Static_Mean': static_mean,
+            'Mean_Delta': window[column].mean(),
+            'Improvement_%': improvement,
+        })
+    return pd.DataFrame(rows)
@@ -1,41 +1,100 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 import warnings
+from csv_cache import CsvCache, read_typed_csv
+from alignment import align_intervals, aligned_summary, first_half_cut
+from metrics import EpisodeMetrics
+from significance import DEFAULT_RESAMPLES, significance_table
+from rendering import FIGURES, RenderSettings, apply_style, new_figure, render_figure, render_figures, save_figure
+from profiling import (format_timer_tree, hierarchical_timer, save_timer_tree, start_profiling,
+                       stop_profiling, timed)
+# Modules only some commands need (binlog, figure_cache, intersection_sim,
+# phase_analytics, tail, tfevents) are imported where they are used, so the
+# episode summary does not pay for them at startup
 warnings.filterwarnings('ignore')
 
 
+# Log table -> (ML agent CSV, static controller CSV)
+LOG_FILES = {
+    'episodes': ('episode_results.csv', 'static_episode_results.csv'),
+    'rewards': ('reward_progress.csv', 'static_reward_progress.csv'),
+    'intervals': ('interval_data.csv', 'static_interval_data.csv'),
+}
+LOG_TABLES = tuple(LOG_FILES)
+
+
 class TrafficSignalComparison:
-    def __init__(self, data_directory="./"):
+    def __init__(self, data_directory="./", use_cache=True, output_dir="./",
+                 figure_formats=('png',), dpi=300, show_plots=True, max_plot_points=4000,
+                 training_run_dir=None, profile=False, profile_dir=None, figure_cache=True):
         """
         Initialize the comparison class
         
         Args:
             data_directory: Directory containing the CSV files
+            use_cache: Read CSVs through the columnar on-disk cache (see csv_cache.py)
+            output_dir: Directory the figures are saved to
+            figure_formats: File formats written for every figure (e.g. ('png', 'svg'))
+            dpi: Resolution of raster figures
+            show_plots: Open a blocking window per figure. When False, figures are
+                rendered headless (Agg) and run_complete_analysis renders them in
+                parallel worker processes.
+            max_plot_points: Point budget per time-series line; longer series are
+                downsampled (see downsampling.py). None plots every sample.
+            training_run_dir: Optional ML-Agents results directory of the training
+                run (e.g. ../Assets/results/TrafficRun02). Its TensorBoard event
+                files extend the learning-curve analysis to the whole training
+                history (see tfevents.py).
+            profile: Track peak memory per stage (tracemalloc) during
+                run_complete_analysis and write 'analysis_timers.json' in the
+                Main_timers.json format (see profiling.py). Stage timings are
+                always recorded.
+            profile_dir: Also write one cProfile dump per top-level stage here
+            figure_cache: Skip headless figures whose input data, styling and
+                plotting library versions are unchanged since they were last
+                rendered (see figure_cache.py). Kept in <output_dir>/.cache/figures.
         """
         self.data_dir = Path(data_directory)
         self.ml_data = {}
         self.static_data = {}
+        self.cache = CsvCache(self.data_dir)
+        self.use_cache = use_cache
+        self._aligned = None
+        self._aligned_step = None
+        self._metrics = None
+        self.profile = profile or profile_dir is not None
+        self.profile_dir = profile_dir
+        self.training_run = None
+        if training_run_dir:
+            from tfevents import TrainingRun
+            self.training_run = TrainingRun(training_run_dir, use_cache)
+        self.render_settings = RenderSettings(output_dir, figure_formats, dpi, show_plots,
+                                              max_points=max_plot_points)
+        self.figure_cache = None
+        if figure_cache:
+            from figure_cache import FigureCache
+            self.figure_cache = FigureCache(self.render_settings.output_dir / '.cache' / 'figures')
+        # Plotting style is applied before the first figure, so numbers-only
+        # runs never import matplotlib (see _ensure_style)
+        self._styled = False
+        
+    @timed
+    def load_data(self, tables=LOG_TABLES):
+        """
+        Load the CSV files for both ML and static approaches
         
-        # Set up plotting style
-        plt.style.use('seaborn-v0_8')
-        # sns.set_palette("husl")
-        sns.set_palette(["#2E86AB", "#F24236", "#A23B72", "#F18F01", "#C73E1D"])
-        
-    def load_data(self):
-        """Load all CSV files for both ML and static approaches"""
+        Args:
+            tables: Which logs to load, any of 'episodes', 'rewards' and
+                'intervals' (default: all of them)
+        """
+        self._aligned = None
+        self._metrics = None
         try:
-            # Load ML data
-            self.ml_data['episodes'] = pd.read_csv(self.data_dir / 'episode_results.csv')
-            self.ml_data['rewards'] = pd.read_csv(self.data_dir / 'reward_progress.csv')
-            self.ml_data['intervals'] = pd.read_csv(self.data_dir / 'interval_data.csv')
-            
-            # Load Static data
-            self.static_data['episodes'] = pd.read_csv(self.data_dir / 'static_episode_results.csv')
-            self.static_data['rewards'] = pd.read_csv(self.data_dir / 'static_reward_progress.csv')
-            self.static_data['intervals'] = pd.read_csv(self.data_dir / 'static_interval_data.csv')
+            for table in tables:
+                ml_file, static_file = LOG_FILES[table]
+                self.ml_data[table] = self._read_csv(ml_file)
+                self.static_data[table] = self._read_csv(static_file)
             
             print("✅ All CSV files loaded successfully!")
             self.print_data_summary()
@@ -44,6 +103,19 @@ class TrafficSignalComparison:
             print(f"❌ Error loading files: {e}")
             print("Make sure all CSV files are in the specified directory")
             
+    def _read_csv(self, filename):
+        """
+        Read one log: its binary '.tslog' copy when that is up to date (see
+        binlog.py), otherwise the CSV, through the typed columnar cache when enabled
+        """
+        from binlog import binary_path, is_fresh, load_binary_log
+        with hierarchical_timer(filename):
+            if is_fresh(self.data_dir / filename):
+                return load_binary_log(binary_path(self.data_dir / filename))
+            if self.use_cache:
+                return self.cache.read(filename)
+            return read_typed_csv(self.data_dir / filename)
+            
     def print_data_summary(self):
         """Print summary of loaded data"""
         print("\n" + "="*50)
@@ -57,179 +129,276 @@ class TrafficSignalComparison:
             for file_type, df in data.items():
                 print(f"  {file_type}: {len(df)} rows, {len(df.columns)} columns")
                 
-    def compare_episode_performance(self):
-        """Compare episode-level performance metrics"""
-        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-        fig.suptitle('Episode Performance Comparison: ML vs Static', fontsize=16, fontweight='bold')
+    def _ensure_style(self):
+        """Apply the plotting style once, importing the plotting stack on first use"""
+        if not self._styled:
+            apply_style()
+            self._styled = True
+
+    def _render(self, name):
+        """Build one registered figure, save it and (optionally) show it"""
+        if not self.render_settings.show and self.figure_cache is not None:
+            return self.render_headless(name)
+        self._ensure_style()
+        builder, figsize, stem, arg_names = FIGURES[name]
+        fig = new_figure(figsize, interactive=self.render_settings.show)
+        try:
+            frames = self._figure_frames()
+            with hierarchical_timer('build'):
+                drawn = builder(fig, *(frames[arg] for arg in arg_names), settings=self.render_settings)
+            if not drawn:
+                return []
+            paths = save_figure(fig, stem, self.render_settings)
+            if self.render_settings.show:
+                import matplotlib.pyplot as plt
+                plt.show()
+            return paths
+        finally:
+            if self.render_settings.show:
+                import matplotlib.pyplot as plt
+                plt.close(fig)
+            else:
+                fig.clear()
+
+    def _figure_frames(self):
+        """Data frames the figure builders take, keyed by argument name"""
+        return {
+            'ml_episodes': self.ml_data['episodes'],
+            'static_episodes': self.static_data['episodes'],
+            'ml_intervals': self.ml_data['intervals'],
+            'static_intervals': self.static_data['intervals'],
+            'aligned': self.aligned_intervals(),
+            'episode_metrics': self.episode_metrics(),
+        }
+
+    def episode_metrics(self):
+        """
+        Per-controller statistics of every episode metric
+
+        Computed in one pass per load_data and shared by every report and
+        figure, so they all show the same numbers (see metrics.py).
+        """
+        if self._metrics is None:
+            with hierarchical_timer('episode_metrics'):
+                self._metrics = EpisodeMetrics(self.ml_data['episodes'], self.static_data['episodes'])
+        return self._metrics
+
+    def aligned_intervals(self, step=None):
+        """
+        ML and static interval data resampled onto a shared simulation clock
+
+        Computed once per load_data and reused by every comparison that needs
+        time-matched values (see alignment.py).
+
+        Args:
+            step: Bin width in seconds (default: the coarser median logging
+                interval). Asking for a different step than the cached frame's
+                (including the default after an explicit step) recomputes it.
+        """
+        if self._aligned is None or step != self._aligned_step:
+            with hierarchical_timer('align_intervals'):
+                self._aligned = align_intervals(self.ml_data['intervals'], self.static_data['intervals'], step)
+            self._aligned_step = step
+        return self._aligned
+
+    @timed
+    def compare_aligned_intervals(self):
+        """Compare time-matched interval metrics over the full span and the first half"""
+        print("\n" + "="*60)
+        print("TIME-ALIGNED INTERVAL COMPARISON")
+        print("="*60)
         
-        ml_episodes = self.ml_data['episodes']
-        static_episodes = self.static_data['episodes']
+        aligned = self.aligned_intervals()
+        if aligned.empty:
+            print("❌ ML and static interval data do not overlap in time")
+            return aligned
+        
+        cut = first_half_cut(aligned)
+        for title, end in (('Full run', None), (f'First half (t < {cut:.1f}s)', cut)):
+            print(f"\n{title}:")
+            print(aligned_summary(aligned, end=end).to_string(index=False, float_format='%.2f'))
+        
+        output_path = self.render_settings.output_dir / 'aligned_interval_data.csv'
+        self.render_settings.output_dir.mkdir(parents=True, exist_ok=True)
+        aligned.to_csv(output_path, index=False)
+        print(f"\n📊 Aligned interval data saved to '{output_path.name}'")
+        return aligned
+
+    @timed
+    def screen_timing_plans(self, green_options=range(10, 61, 5), n_seeds=10, duration=3600.0,
+                            metric='VehiclesWaiting', top=10, seed=0):
+        """
+        Screen static timing plans with the queue simulator before running them in Unity
         
-        # REMOVED FuelConsumed from metrics
-        metrics = [
-            ('TotalVehicles', 'Total Vehicles'),
-            ('VehiclesWaiting', 'Vehicles Waiting'),
-            ('EpisodeDuration', 'Episode Duration (s)'),
-            ('CumulativeReward', 'Cumulative Reward'),
-            ('GreenLightTime', 'Green Light Time (s)')
-        ]
-        
-        for i, (metric, title) in enumerate(metrics):
-            if i < 5:  # Only plot the first 5 metrics since we removed one
-                row, col = i // 3, i % 3
-                ax = axes[row, col]
-                
-                # Check if metric exists in both datasets
-                if metric in ml_episodes.columns and metric in static_episodes.columns:
-                    # Box plot comparison
-                    data_to_plot = [ml_episodes[metric].dropna(), static_episodes[metric].dropna()]
-                    labels = ['ML Agent', 'Static Controller']
-                    
-                    bp = ax.boxplot(data_to_plot, labels=labels, patch_artist=True)
-                    bp['boxes'][0].set_facecolor('#2E86AB')  # Dark blue for ML Agent
-                    bp['boxes'][1].set_facecolor('#F24236')  # Bright red for Static Controller
-                    
-                    ax.set_title(f'{title}')
-                    ax.grid(True, alpha=0.3)
-                    
-                    # Add mean values as text
-                    ml_mean = ml_episodes[metric].mean()
-                    static_mean = static_episodes[metric].mean()
-                    ax.text(0.02, 0.98, f'ML Mean: {ml_mean:.2f}\nStatic Mean: {static_mean:.2f}', 
-                           transform=ax.transAxes, verticalalignment='top', 
-                           bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
-                else:
-                    ax.text(0.5, 0.5, f'{metric}\nNot Available', 
-                           ha='center', va='center', transform=ax.transAxes)
-                    ax.set_title(f'{title} - Data Not Available')
+        Arrival rates are calibrated from static_interval_data.csv and every
+        combination of green_options per phase is simulated (see intersection_sim.py).
         
-        # Hide the last subplot since we removed one metric
-        axes[1, 2].set_visible(False)
+        Args:
+            green_options: Candidate green times per phase in seconds
+            n_seeds: Random replications per plan
+            duration: Simulated seconds per replication
+            metric: Column the plans are ranked by
+            top: Number of plans printed
+            seed: Base random seed
+        
+        Returns:
+            DataFrame with one row per plan, best first (None without static intervals)
+        """
+        print("\n" + "="*60)
+        print("STATIC TIMING PLAN SCREENING")
+        print("="*60)
         
-        plt.tight_layout()
-        plt.savefig('episode_performance_comparison.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        intervals = self.static_data.get('intervals')
+        if intervals is None or intervals.empty:
+            print("❌ Static interval data not available")
+            return None
+        
+        from intersection_sim import IntersectionSimulator, calibrate_arrival_rate, logged_plan, plan_grid, rank_plans
+        arrival_rate = calibrate_arrival_rate(intervals)
+        baseline = logged_plan(intervals)
+        plans = np.vstack([baseline, plan_grid(green_options, baseline.size)])
+        print(f"Calibrated arrival rate: {arrival_rate:.4f} veh/s, logged plan greens: "
+              f"{', '.join(f'{g:.0f}s' for g in baseline)}")
+        print(f"Simulating {len(plans):,} plans x {n_seeds} seeds x {duration:.0f}s...")
+        
+        summary, _ = IntersectionSimulator(arrival_rate).simulate(plans, n_seeds, duration, seed)
+        ranked = rank_plans(summary, metric)
+        # Plan 0 is the logged plan, the simulated baseline for every other plan
+        baseline_row = ranked[ranked['Plan'] == 0].iloc[0]
+        ranked['Logged_Plan'] = ranked['Plan'] == 0
+        ranked[f'{metric}_Change_%'] = (ranked[metric] - baseline_row[metric]) / baseline_row[metric] * 100
+        
+        print(f"\nLogged plan: simulated {metric} {baseline_row[metric]:.2f}"
+              + (f" (Unity log: {intervals[metric].mean():.2f})" if metric in intervals else ""))
+        columns = [c for c in ranked.columns if c.startswith('Green_')] + [
+            'CycleLength', 'VehiclesWaiting', 'Throughput', 'AverageDelay', f'{metric}_Change_%']
+        print(f"\nTop {min(top, len(ranked))} plans by {metric}:")
+        print(ranked[columns].head(top).to_string(index=False, float_format='%.2f'))
+        
+        output_path = self.render_settings.output_dir / 'timing_plan_screening.csv'
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        ranked.to_csv(output_path, index=False)
+        print(f"\n📊 Timing plan screening saved to '{output_path.name}'")
+        return ranked
 
-    def create_vehicles_waiting_comparison_half(self):
-        """Create a detailed comparison of vehicles waiting over time for the first half of data"""
-        fig, ax = plt.subplots(1, 1, figsize=(16, 8))  # Larger figure size
+    @timed
+    def compare_phase_performance(self, window_seconds=None):
+        """
+        Break the interval logs down by signal phase (see phase_analytics.py)
         
-        ml_intervals = self.ml_data['intervals']
-        static_intervals = self.static_data['intervals']
+        Saves every phase run of both controllers to 'phase_runs.csv' and the
+        rolling throughput/waiting windows to 'rolling_kpis.csv'.
         
-        # Slice to first half of the data
-        ml_half = ml_intervals.iloc[:len(ml_intervals)//2]
-        static_half = static_intervals.iloc[:len(static_intervals)//2]
+        Args:
+            window_seconds: Length of the rolling throughput/waiting windows
+                (default: phase_analytics.DEFAULT_WINDOW_SECONDS)
         
-        if 'VehiclesWaiting' in ml_half.columns and 'VehiclesWaiting' in static_half.columns:
-            # Plot time series with thicker lines
-            ax.plot(ml_half['SimulationTime'], ml_half['VehiclesWaiting'], 
-                    label='ML Agent', linewidth=3, alpha=0.8, color='#2E86AB')  # Dark blue
-            ax.plot(static_half['SimulationTime'], static_half['VehiclesWaiting'], 
-                    label='Static Controller', linewidth=3, alpha=0.8, color='#F24236')  # Bright red
-            
-            ax.set_xlabel('Simulation Time (s)', fontsize=14)
-            ax.set_ylabel('Vehicles Waiting', fontsize=14)
-            ax.set_title('Vehicles Waiting Over Time (First Half): ML vs Static Controller', fontsize=16, fontweight='bold')
-            ax.legend(fontsize=12)
-            ax.grid(True, alpha=0.3)
-            
-            # Add statistics text box
-            ml_mean = ml_half['VehiclesWaiting'].mean()
-            static_mean = static_half['VehiclesWaiting'].mean()
-            improvement = ((static_mean - ml_mean) / static_mean) * 100 if static_mean != 0 else 0
-            
-            stats_text = f'ML Agent Mean: {ml_mean:.2f}\nStatic Controller Mean: {static_mean:.2f}\nImprovement: {improvement:.1f}%'
-            ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, verticalalignment='top',
-                    bbox=dict(boxstyle='round', facecolor='white', alpha=0.8), fontsize=11)
-            
-            plt.tight_layout()
-            plt.savefig('vehicles_waiting_comparison_first_half.png', dpi=300, bbox_inches='tight')
-            plt.show()
-            print("✅ Vehicles waiting comparison (first half) saved as 'vehicles_waiting_comparison_first_half.png'")
+        Returns:
+            Per-phase comparison DataFrame
+        """
+        from phase_analytics import DEFAULT_WINDOW_SECONDS, compare_phases, phase_runs, rolling_kpis
+        if window_seconds is None:
+            window_seconds = DEFAULT_WINDOW_SECONDS
+        print("\n" + "="*60)
+        print("PHASE-LEVEL COMPARISON")
+        print("="*60)
+        
+        runs = {}
+        rolling = {}
+        for approach, data in (('ML', self.ml_data), ('Static', self.static_data)):
+            runs[approach] = phase_runs(data['intervals'])
+            rolling[approach] = rolling_kpis(data['intervals'], window_seconds)
+        
+        comparison = compare_phases(runs['ML'], runs['Static'])
+        print("\nPer phase (green time in s, departures per green second, utilisation of the green):")
+        print(comparison.to_string(index=False, float_format='%.3f'))
+        
+        print(f"\nRolling {window_seconds:.0f}s windows:")
+        for approach, windows in rolling.items():
+            print(f"  {approach:<7} - Throughput: {windows['RollingThroughput'].mean():.3f} veh/s "
+                  f"(min {windows['RollingThroughput'].min():.3f}), "
+                  f"Waiting: {windows['RollingWaiting'].mean():.2f} "
+                  f"(95th percentile {windows['RollingWaiting'].quantile(0.95):.2f})")
+        
+        output_dir = self.render_settings.output_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+        pd.concat(runs, names=['Controller']).reset_index(level=0).to_csv(output_dir / 'phase_runs.csv', index=False)
+        pd.concat(rolling, names=['Controller']).reset_index(level=0).to_csv(output_dir / 'rolling_kpis.csv', index=False)
+        print(f"\n📊 Phase runs saved to 'phase_runs.csv', rolling windows to 'rolling_kpis.csv'")
+        return comparison
+
+    def render_headless(self, name, use_figure_cache=True):
+        """
+        Build and save one registered figure without ever showing it
+
+        Args:
+            name: Key in FIGURES
+            use_figure_cache: Reuse/store the figure through the figure cache
+        """
+        self._ensure_style()
+        return render_figure(name, self._figure_frames(), self.render_settings,
+                             self.figure_cache if use_figure_cache else None)
+
+    def follow(self, refresh_seconds=30, dashboard_seconds=None, max_refreshes=None):
+        """
+        Incrementally analyse the CSVs while the simulation is still writing them
+        
+        Only newly appended rows are parsed on each refresh. The summary is
+        rewritten to 'live_performance_summary.csv' from running aggregates.
+        Optionally the dashboard is re-rendered headless as well (see tail.py);
+        that costs time proportional to the full history.
+        
+        Args:
+            refresh_seconds: Seconds between polls
+            dashboard_seconds: Re-render the dashboard at most this often (None, the default, disables it)
+            max_refreshes: Stop after this many polls (None runs until Ctrl+C)
+        """
+        from tail import LiveComparison
+        self._aligned = None
+        self._metrics = None
+        return LiveComparison(self, refresh_seconds, dashboard_seconds).run(max_refreshes)
+
+    @timed
+    def compare_episode_performance(self):
+        """Compare episode-level performance metrics"""
+        return self._render('episode_performance')
+
+    @timed
+    def create_vehicles_waiting_comparison_half(self):
+        """Create a detailed comparison of vehicles waiting over time for the first half of data"""
+        paths = self._render('vehicles_waiting_half')
+        if paths:
+            print(f"✅ Vehicles waiting comparison (first half) saved as '{paths[0].name}'")
         else:
             print("❌ VehiclesWaiting data not available in interval data")
+        return paths
 
+    @timed
     def create_queue_length_comparison_half(self):
         """Create a detailed comparison of queue length over time for the first half of data"""
-        fig, ax = plt.subplots(1, 1, figsize=(16, 8))  # Larger figure size
-        
-        ml_intervals = self.ml_data['intervals']
-        static_intervals = self.static_data['intervals']
-        
-        # Slice to first half of the data
-        ml_half = ml_intervals.iloc[:len(ml_intervals)//2]
-        static_half = static_intervals.iloc[:len(static_intervals)//2]
-        
-        if 'QueueLength' in ml_half.columns and 'QueueLength' in static_half.columns:
-            # Plot time series with thicker lines
-            ax.plot(ml_half['SimulationTime'], ml_half['QueueLength'], 
-                    label='ML Agent', linewidth=3, alpha=0.8, color='#2E86AB')  # Dark blue
-            ax.plot(static_half['SimulationTime'], static_half['QueueLength'], 
-                    label='Static Controller', linewidth=3, alpha=0.8, color='#F24236')  # Bright red
-            
-            ax.set_xlabel('Simulation Time (s)', fontsize=14)
-            ax.set_ylabel('Queue Length', fontsize=14)
-            ax.set_title('Queue Length Over Time (First Half): ML vs Static Controller', fontsize=16, fontweight='bold')
-            ax.legend(fontsize=12)
-            ax.grid(True, alpha=0.3)
-            
-            # Add statistics text box
-            ml_mean = ml_half['QueueLength'].mean()
-            static_mean = static_half['QueueLength'].mean()
-            improvement = ((static_mean - ml_mean) / static_mean) * 100 if static_mean != 0 else 0
-            
-            stats_text = f'ML Agent Mean: {ml_mean:.2f}\nStatic Controller Mean: {static_mean:.2f}\nImprovement: {improvement:.1f}%'
-            ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, verticalalignment='top',
-                    bbox=dict(boxstyle='round', facecolor='white', alpha=0.8), fontsize=11)
-            
-            plt.tight_layout()
-            plt.savefig('queue_length_comparison_first_half.png', dpi=300, bbox_inches='tight')
-            plt.show()
-            print("✅ Queue length comparison (first half) saved as 'queue_length_comparison_first_half.png'")
+        paths = self._render('queue_length_half')
+        if paths:
+            print(f"✅ Queue length comparison (first half) saved as '{paths[0].name}'")
         else:
             print("❌ QueueLength data not available in interval data")
+        return paths
         
+    @timed
     def compare_interval_data(self):
         """Compare interval-based performance over time"""
-        fig, axes = plt.subplots(1, 3, figsize=(24, 8))  # Changed to 1x3 since we removed fuel
-        fig.suptitle('Interval Data Comparison: ML vs Static Over Time', fontsize=16, fontweight='bold')
-        
-        ml_intervals = self.ml_data['intervals']
-        static_intervals = self.static_data['intervals']
-        
-        # REMOVED FuelConsumed from time_metrics
-        time_metrics = [
-            ('TotalVehicles', 'Total Vehicles Over Time'),
-            ('VehiclesWaiting', 'Vehicles Waiting Over Time'),
-            ('QueueLength', 'Queue Length Over Time')
-        ]
-        
-        for i, (metric, title) in enumerate(time_metrics):
-            ax = axes[i]
-            
-            if metric in ml_intervals.columns and metric in static_intervals.columns:
-                ax.plot(ml_intervals['SimulationTime'], ml_intervals[metric], 
-                        label='ML Agent', linewidth=2, alpha=0.8, color='#2E86AB')  # Dark blue
-                ax.plot(static_intervals['SimulationTime'], static_intervals[metric], 
-                        label='Static Controller', linewidth=2, alpha=0.8, color='#F24236')  # Bright red
-                
-                ax.set_xlabel('Simulation Time (s)')
-                ax.set_ylabel(metric)
-                ax.set_title(title)
-                ax.legend()
-                ax.grid(True, alpha=0.3)
-            else:
-                ax.text(0.5, 0.5, f'{metric}\nNot Available', 
-                       ha='center', va='center', transform=ax.transAxes)
-                ax.set_title(f'{title} - Data Not Available')
+        return self._render('interval_comparison')
         
-        plt.tight_layout()
-        plt.savefig('interval_data_comparison.png', dpi=300, bbox_inches='tight')
-        plt.show()
+    @timed
+    def statistical_comparison(self, n_resamples=DEFAULT_RESAMPLES, max_workers=None, seed=0):
+        """
+        Perform statistical comparison between ML and Static approaches
         
-    def statistical_comparison(self):
-        """Perform statistical comparison between ML and Static approaches"""
+        Args:
+            n_resamples: Bootstrap resamples / permutations for the confidence
+                intervals and p-values (0 skips the significance columns)
+            max_workers: Split the resamples over this many processes
+            seed: Seed for reproducible intervals and p-values
+        """
         print("\n" + "="*60)
         print("STATISTICAL COMPARISON")
         print("="*60)
@@ -240,64 +409,41 @@ class TrafficSignalComparison:
         # Compare key metrics - REMOVED EpisodeDuration and FuelConsumed as requested
         comparison_metrics = ['TotalVehicles', 'VehiclesWaiting']
         
-        results = []
-        
-        for metric in comparison_metrics:
-            if metric in ml_episodes.columns and metric in static_episodes.columns:
-                ml_values = ml_episodes[metric].dropna()
-                static_values = static_episodes[metric].dropna()
-                
-                # Calculate statistics
-                ml_stats = {
-                    'mean': ml_values.mean(),
-                    'std': ml_values.std(),
-                    'median': ml_values.median(),
-                    'min': ml_values.min(),
-                    'max': ml_values.max()
-                }
-                
-                static_stats = {
-                    'mean': static_values.mean(),
-                    'std': static_values.std(),
-                    'median': static_values.median(),
-                    'min': static_values.min(),
-                    'max': static_values.max()
-                }
-                
-                # Calculate improvement percentage
-                improvement = ((static_stats['mean'] - ml_stats['mean']) / static_stats['mean']) * 100
-                
-                # MODIFICATION: Multiply TotalVehicles improvement by -1
-                if metric == 'TotalVehicles':
-                    improvement = improvement * -1
-                
-                results.append({
-                    'Metric': metric,
-                    'ML_Mean': ml_stats['mean'],
-                    'Static_Mean': static_stats['mean'],
-                    'ML_Std': ml_stats['std'],
-                    'Static_Std': static_stats['std'],
-                    'Improvement_%': improvement
-                })
-                
-                print(f"\n{metric}:")
-                print(f"  ML Agent    - Mean: {ml_stats['mean']:.2f}, Std: {ml_stats['std']:.2f}")
-                print(f"  Static      - Mean: {static_stats['mean']:.2f}, Std: {static_stats['std']:.2f}")
-                print(f"  Improvement: {improvement:.2f}% {'(ML better)' if improvement > 0 else '(Static better)'}")
+        # Means, stds and improvements come from the shared metrics table
+        summary_df = self.episode_metrics().comparison_table(comparison_metrics)
+        
+        for row in summary_df.to_dict('records'):
+            improvement = row['Improvement_%']
+            print(f"\n{row['Metric']}:")
+            print(f"  ML Agent    - Mean: {row['ML_Mean']:.2f}, Std: {row['ML_Std']:.2f}")
+            print(f"  Static      - Mean: {row['Static_Mean']:.2f}, Std: {row['Static_Std']:.2f}")
+            print(f"  Improvement: {improvement:.2f}% {'(ML better)' if improvement > 0 else '(Static better)'}")
+        
+        # Bootstrap confidence intervals and permutation p-values (see significance.py)
+        if n_resamples and not summary_df.empty:
+            significance_df = significance_table(ml_episodes, static_episodes, summary_df['Metric'],
+                                                 n_resamples=n_resamples, seed=seed, max_workers=max_workers)
+            summary_df = summary_df.merge(significance_df.drop(columns='Diff_Mean'), on='Metric', how='left')
+            
+            print(f"\nSignificance ({n_resamples} bootstrap resamples / permutations, 95% CI):")
+            for _, row in summary_df.iterrows():
+                verdict = 'significant' if row['P_Value'] < 0.05 else 'not significant'
+                print(f"  {row['Metric']}: improvement CI [{row['Improvement_CI_Low_%']:.2f}%, "
+                      f"{row['Improvement_CI_High_%']:.2f}%], p = {row['P_Value']:.4f} ({verdict})")
         
-        # Create summary DataFrame
-        summary_df = pd.DataFrame(results)
         print(f"\n{'='*60}")
         print("SUMMARY TABLE")
         print("="*60)
         print(summary_df.to_string(index=False, float_format='%.2f'))
         
         # Save summary to CSV
-        summary_df.to_csv('performance_comparison_summary.csv', index=False)
+        self.render_settings.output_dir.mkdir(parents=True, exist_ok=True)
+        summary_df.to_csv(self.render_settings.output_dir / 'performance_comparison_summary.csv', index=False)
         print(f"\n📊 Summary saved to 'performance_comparison_summary.csv'")
         
         return summary_df
     
+    @timed
     def generate_performance_report(self):
         """Generate a comprehensive performance report"""
         print("\n" + "="*70)
@@ -305,7 +451,7 @@ class TrafficSignalComparison:
         print("="*70)
         
         ml_episodes = self.ml_data['episodes']
-        static_episodes = self.static_data['episodes']
+        episode_metrics = self.episode_metrics()
         
         # Overall performance metrics - REMOVED EpisodeDuration and FuelConsumed as requested
         metrics_to_analyze = ['TotalVehicles', 'VehiclesWaiting']
@@ -314,9 +460,8 @@ class TrafficSignalComparison:
         static_better_count = 0
         
         for metric in metrics_to_analyze:
-            if metric in ml_episodes.columns and metric in static_episodes.columns:
-                ml_mean = ml_episodes[metric].mean()
-                static_mean = static_episodes[metric].mean()
+            if episode_metrics.available(metric):
+                ml_mean, static_mean = episode_metrics.means(metric)
                 
                 # For most metrics, lower is better (except TotalVehicles which might indicate throughput)
                 if metric == 'TotalVehicles':
@@ -348,109 +493,112 @@ class TrafficSignalComparison:
                 trend = np.polyfit(range(len(rewards)), rewards, 1)[0]
                 print(f"  Reward trend: {'Improving' if trend > 0 else 'Declining'} ({trend:.4f}/episode)")
                 print(f"  Final reward: {rewards.iloc[-1]:.2f}")
-                print(f"  Best reward: {rewards.max():.2f}")
+                print(f"  Best reward: {episode_metrics.get('ml', 'CumulativeReward', 'max'):.2f}")
+        
+        if self.training_run is not None:
+            self.report_training_history()
 
+    def learning_curve(self):
+        """
+        TensorBoard learning curve of the training run merged with reward_progress.csv
+
+        Returns:
+            DataFrame with Source, Step, Reward and EpisodeLength columns
+            (None without a training run directory)
+        """
+        if self.training_run is None:
+            return None
+        from tfevents import merge_learning_curves
+        return merge_learning_curves(self.training_run.learning_curve(), self.ml_data.get('rewards'))
+
+    def report_training_history(self):
+        """Print the learning curve over the whole training run and save it to CSV"""
+        curve = self.learning_curve()
+        training = curve[curve['Source'] == 'tensorboard'].dropna(subset=['Reward'])
+        if training.empty:
+            print(f"\n⚠️ No reward summaries found in {self.training_run.run_dir}")
+            return
+        
+        print(f"\nML Training History ({len(self.training_run.event_files())} TensorBoard event files):")
+        steps = training['Step'].to_numpy()
+        rewards = training['Reward'].to_numpy()
+        print(f"  Steps covered: {steps[0]:,} - {steps[-1]:,} ({len(training)} summaries)")
+        if len(training) > 1:
+            trend = np.polyfit(steps, rewards, 1)[0] * 10_000
+            print(f"  Reward trend: {'Improving' if trend > 0 else 'Declining'} ({trend:.4f}/10k steps)")
+        print(f"  Final reward: {rewards[-1]:.2f}")
+        best = training['Reward'].idxmax()
+        print(f"  Best reward: {training.at[best, 'Reward']:.2f} (step {training.at[best, 'Step']:,})")
+        
+        checkpoints = self.training_run.checkpoints().dropna(subset=['Reward'])
+        if not checkpoints.empty:
+            best_checkpoint = checkpoints.loc[checkpoints['Reward'].idxmax()]
+            print(f"  Best checkpoint: step {best_checkpoint['Steps']:,} "
+                  f"(reward {best_checkpoint['Reward']:.2f}, {len(checkpoints)} checkpoints rated)")
+        
+        output_path = self.render_settings.output_dir / 'learning_curve.csv'
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        curve.to_csv(output_path, index=False)
+        print(f"  Learning curve saved to '{output_path.name}'")
+
+    @timed
     def create_dashboard(self):
         """Create a comprehensive dashboard with all comparisons"""
-        fig = plt.figure(figsize=(20, 12))  # Reduced height since we removed one section
-        gs = fig.add_gridspec(3, 4, hspace=0.3, wspace=0.3)  # Changed to 3 rows instead of 4
-        
-        # Title
-        fig.suptitle('Traffic Signal Control: ML vs Static Performance Dashboard', 
-                    fontsize=20, fontweight='bold')
-        
-        ml_episodes = self.ml_data['episodes']
-        static_episodes = self.static_data['episodes']
-        ml_intervals = self.ml_data['intervals']
-        static_intervals = self.static_data['intervals']
-        
-        # 1. Episode comparison - key metrics
-        ax1 = fig.add_subplot(gs[0, :2])
-        metrics = ['TotalVehicles', 'VehiclesWaiting']
-        x = np.arange(len(metrics))
-        width = 0.35
-        
-        ml_means = [ml_episodes[m].mean() if m in ml_episodes.columns else 0 for m in metrics]
-        static_means = [static_episodes[m].mean() if m in static_episodes.columns else 0 for m in metrics]
-        
-        ax1.bar(x - width/2, ml_means, width, label='ML Agent', alpha=0.8, color='#2E86AB')
-        ax1.bar(x + width/2, static_means, width, label='Static Controller', alpha=0.8, color='#F24236')
-        ax1.set_xlabel('Metrics')
-        ax1.set_ylabel('Average Values')
-        ax1.set_title('Episode Performance Comparison')
-        ax1.set_xticks(x)
-        ax1.set_xticklabels(metrics)
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # 2. Total Vehicles over time
-        ax2 = fig.add_subplot(gs[0, 2:])
-        if 'TotalVehicles' in ml_intervals.columns:
-            ax2.plot(ml_intervals['SimulationTime'], ml_intervals['TotalVehicles'], 
-                    label='ML Agent', linewidth=2, color='#2E86AB')
-            ax2.plot(static_intervals['SimulationTime'], static_intervals['TotalVehicles'], 
-                    label='Static Controller', linewidth=2, color='#F24236')
-
-            ax2.set_xlabel('Simulation Time (s)')
-            ax2.set_ylabel('Total Vehicles')
-            ax2.set_title('Total Vehicles Over Time')
-            ax2.legend()
-            ax2.grid(True, alpha=0.3)
-        
-        # 3. Queue length comparison
-        ax3 = fig.add_subplot(gs[1, :])  # Made this span the full width since we removed the reward plot
-        if 'QueueLength' in ml_intervals.columns:
-            ax3.plot(ml_intervals['SimulationTime'], ml_intervals['QueueLength'], 
-                    label='ML Agent', linewidth=2, alpha=0.8, color='#2E86AB')
-            ax3.plot(static_intervals['SimulationTime'], static_intervals['QueueLength'], 
-                    label='Static Controller', linewidth=2, alpha=0.8, color='#F24236')
-            ax3.set_xlabel('Simulation Time (s)')
-            ax3.set_ylabel('Queue Length')
-            ax3.set_title('Queue Length Over Time')
-            ax3.legend()
-            ax3.grid(True, alpha=0.3)
-        
-        # REMOVED: Reward progression section (Section 4 was deleted)
-        
-        # 4. Performance metrics heatmap (moved up from section 5)
-        ax4 = fig.add_subplot(gs[2, :])
-
-        # Create performance comparison matrix - REMOVED EpisodeDuration and FuelConsumed
-        comparison_data = []
-        metrics = ['TotalVehicles', 'VehiclesWaiting']  # Removed EpisodeDuration and FuelConsumed
-
-        for metric in metrics:
-            if metric in ml_episodes.columns and metric in static_episodes.columns:
-                ml_val = ml_episodes[metric].mean()
-                static_val = static_episodes[metric].mean()
-                # Normalize values for better visualization
-                comparison_data.append([ml_val, static_val])
-
-        if comparison_data:
-            comparison_array = np.array(comparison_data)
-            # Normalize each row
-            for i in range(len(comparison_array)):
-                max_val = max(comparison_array[i])
-                if max_val > 0:
-                    comparison_array[i] = comparison_array[i] / max_val
-            
-            sns.heatmap(comparison_array, 
-                    xticklabels=['ML Agent', 'Static Controller'],
-                    yticklabels=[m for m in metrics if m in ml_episodes.columns and m in static_episodes.columns],
-                    annot=True, fmt='.3f', cmap='RdYlBu_r',
-                    ax=ax4)
-            ax4.set_title('Normalized Performance Heatmap')
-            
-        plt.savefig('traffic_signal_dashboard.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        return self._render('dashboard')
+
+    @timed
+    def render_all_figures(self, max_workers=None):
+        """
+        Render every figure concurrently in headless worker processes
+
+        Figures found unchanged in the figure cache are not rendered again.
+
+        Args:
+            max_workers: Worker processes (default: one per figure, capped by CPU count)
+
+        Returns:
+            Dict mapping figure name to its list of written paths
+        """
+        # Needed when the figures end up rendered in this process (max_workers=1)
+        self._ensure_style()
+        return render_figures(FIGURES, self._figure_frames(), self.render_settings, max_workers,
+                              self.figure_cache)
     
     def run_complete_analysis(self):
         """Run the complete comparison analysis"""
+        if not self.profile:
+            return self._run_analysis_stages()
+        
+        start_profiling(trace_memory=True, profile_dir=self.profile_dir)
+        try:
+            return self._run_analysis_stages()
+        finally:
+            self.save_timings()
+            stop_profiling()
+
+    def save_timings(self, path=None):
+        """
+        Write the stage timer tree as JSON and print it
+        
+        Args:
+            path: Output file (default: <output_dir>/analysis_timers.json)
+        """
+        path = save_timer_tree(path or self.render_settings.output_dir / 'analysis_timers.json')
+        print("\n⏱️ Stage timings:")
+        print(format_timer_tree())
+        print(f"\n📊 Timing report saved to '{path.name}'")
+        return path
+
+    def _run_analysis_stages(self):
+        """Every analysis stage, in the order run_complete_analysis runs them"""
         print("🚀 Starting Traffic Signal Comparison Analysis...")
         
         # Load data
         self.load_data()
         
+        if not self.render_settings.show:
+            return self._run_headless_analysis()
+        
         # Generate all comparisons
         print("\n📊 Generating episode performance comparison...")
         self.compare_episode_performance()
@@ -468,6 +616,12 @@ class TrafficSignalComparison:
         print("\n🔍 Performing statistical analysis...")
         summary_df = self.statistical_comparison()
         
+        print("\n⏱️ Comparing time-aligned interval data...")
+        self.compare_aligned_intervals()
+        
+        print("\n🚦 Comparing signal phases...")
+        self.compare_phase_performance()
+        
         print("\n📋 Generating performance report...")
         self.generate_performance_report()
         
@@ -479,6 +633,36 @@ class TrafficSignalComparison:
         return summary_df
 
 
+    def _run_headless_analysis(self, max_workers=None):
+        """Reports in this process, all figures rendered concurrently in workers"""
+        print("\n🔍 Performing statistical analysis...")
+        summary_df = self.statistical_comparison()
+        
+        print("\n⏱️ Comparing time-aligned interval data...")
+        self.compare_aligned_intervals()
+        
+        print("\n🚦 Comparing signal phases...")
+        self.compare_phase_performance()
+        
+        print("\n📋 Generating performance report...")
+        self.generate_performance_report()
+        
+        print("\n🖼️ Rendering all figures in parallel...")
+        reused = len(self.figure_cache.hits) if self.figure_cache is not None else 0
+        rendered = self.render_all_figures(max_workers)
+        for name, paths in rendered.items():
+            if paths:
+                print(f"✅ {name} saved as {', '.join(repr(p.name) for p in paths)}")
+            else:
+                print(f"❌ {name}: required data not available")
+        if self.figure_cache is not None and len(self.figure_cache.hits) > reused:
+            print(f"♻️ {len(self.figure_cache.hits) - reused} unchanged figures reused from the figure cache")
+        
+        print("\n✅ Analysis complete! Check the generated figures and CSV summary.")
+        
+        return summary_df
+
+
 # Usage example
 if __name__ == "__main__":
     # Initialize the comparison tool
@@ -492,3 +676,4 @@ if __name__ == "__main__":
     # comparer.load_data()
     # comparer.compare_episode_performance()
     # comparer.statistical_comparison()
+    # comparer.screen_timing_plans()
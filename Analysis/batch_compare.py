@@ -0,0 +1,206 @@
+"""
+Batch comparison across many run directories
+
+Discovers every directory under a root that holds a complete set of ML and
+static CSV logs, summarises each run in a process pool and writes one combined
+table (run id, config hash, metric means and improvements).
+"""
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from comparison_stats import SUMMARY_METRICS, improvement_percent
+from csv_cache import CsvCache, read_typed_csv
+
+try:
+    import yaml
+except ImportError:  # hyperparameter columns are skipped without PyYAML
+    yaml = None
+
+
+REQUIRED_FILES = ['episode_results.csv', 'static_episode_results.csv']
+CONFIG_NAME = 'configuration.yaml'
+
+# Hyperparameters copied from configuration.yaml into the combined table
+HYPERPARAMETER_KEYS = {
+    'hyperparameters': ['batch_size', 'buffer_size', 'learning_rate', 'beta', 'epsilon', 'lambd', 'num_epoch'],
+    'network_settings': ['hidden_units', 'num_layers', 'normalize'],
+}
+
+
+def discover_runs(root):
+    """
+    Find every run directory below root
+
+    A run directory is any directory containing both episode_results.csv and
+    static_episode_results.csv.
+
+    Args:
+        root: Directory to search recursively
+
+    Returns:
+        Sorted list of run directory paths
+    """
+    root = Path(root)
+    runs = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        if all(name in filenames for name in REQUIRED_FILES):
+            runs.append(Path(dirpath))
+    return sorted(runs)
+
+
+def find_config(run_dir, root):
+    """Return the closest configuration.yaml at or above run_dir (up to root)"""
+    run_dir = Path(run_dir).resolve()
+    root = Path(root).resolve()
+    for directory in [run_dir, *run_dir.parents]:
+        candidate = directory / CONFIG_NAME
+        if candidate.exists():
+            return candidate
+        if directory == root:
+            break
+    return None
+
+
+def config_hash(config_path):
+    """Short SHA-1 of a configuration file's contents"""
+    if config_path is None:
+        return ''
+    return hashlib.sha1(Path(config_path).read_bytes()).hexdigest()[:12]
+
+
+def read_hyperparameters(config_path):
+    """Flatten the tracked hyperparameters of the first behavior in a config"""
+    if config_path is None or yaml is None:
+        return {}
+    with open(config_path) as f:
+        config = yaml.safe_load(f) or {}
+    behaviors = config.get('behaviors') or {}
+    if not behaviors:
+        return {}
+    behavior = next(iter(behaviors.values())) or {}
+
+    params = {}
+    for section, keys in HYPERPARAMETER_KEYS.items():
+        values = behavior.get(section) or {}
+        for key in keys:
+            if key in values:
+                params[f'hp_{key}'] = values[key]
+    return params
+
+
+def summarize_run(run_dir, root, use_cache=True):
+    """
+    Load one run and compute its summary row (runs in a worker process)
+
+    Args:
+        run_dir: Directory containing the run's CSV files
+        root: Root the run was discovered under (used for the run id)
+        use_cache: Read CSVs through the columnar cache
+
+    Returns:
+        Dict with one combined-table row
+    """
+    run_dir = Path(run_dir)
+    read = CsvCache(run_dir).read if use_cache else (lambda name: read_typed_csv(run_dir / name))
+    ml_episodes = read('episode_results.csv')
+    static_episodes = read('static_episode_results.csv')
+
+    config_path = find_config(run_dir, root)
+    row = {
+        'RunId': run_dir.relative_to(root).as_posix() if run_dir != Path(root) else run_dir.name,
+        'ConfigHash': config_hash(config_path),
+        'ML_Episodes': len(ml_episodes),
+        'Static_Episodes': len(static_episodes),
+    }
+    row.update(read_hyperparameters(config_path))
+
+    for metric in SUMMARY_METRICS:
+        if metric in ml_episodes.columns and metric in static_episodes.columns:
+            ml_mean = ml_episodes[metric].mean()
+            static_mean = static_episodes[metric].mean()
+            row[f'{metric}_ML_Mean'] = ml_mean
+            row[f'{metric}_Static_Mean'] = static_mean
+            row[f'{metric}_ML_Std'] = ml_episodes[metric].std()
+            row[f'{metric}_Static_Std'] = static_episodes[metric].std()
+            row[f'{metric}_Improvement_%'] = improvement_percent(metric, ml_mean, static_mean)
+    return row
+
+
+class BatchComparison:
+    def __init__(self, root_directory="./", max_workers=None, use_cache=True):
+        """
+        Compare every run found below a root directory
+
+        Args:
+            root_directory: Directory searched recursively for run directories
+            max_workers: Worker processes (default: number of CPUs)
+            use_cache: Read CSVs through the columnar cache
+        """
+        self.root = Path(root_directory).resolve()
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.runs = []
+
+    def discover(self):
+        """Find the run directories to compare"""
+        self.runs = discover_runs(self.root)
+        print(f"🔍 Found {len(self.runs)} run directories under {self.root}")
+        return self.runs
+
+    def run(self, output_path='batch_comparison_summary.csv'):
+        """
+        Summarise every run in a process pool and write the combined table
+
+        Args:
+            output_path: Where to save the combined summary CSV
+
+        Returns:
+            Combined summary DataFrame (one row per run)
+        """
+        if not self.runs:
+            self.discover()
+        if not self.runs:
+            print("❌ No run directories found")
+            return pd.DataFrame()
+
+        rows = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(summarize_run, run_dir, self.root, self.use_cache): run_dir
+                       for run_dir in self.runs}
+            for future in as_completed(futures):
+                run_dir = futures[future]
+                try:
+                    rows.append(future.result())
+                except Exception as e:
+                    print(f"❌ Failed to summarise {run_dir}: {e}")
+
+        summary_df = pd.DataFrame(rows)
+        if not summary_df.empty:
+            summary_df = summary_df.sort_values('RunId').reset_index(drop=True)
+
+        print(f"\n{'='*60}")
+        print("BATCH SUMMARY TABLE")
+        print("="*60)
+        print(summary_df.to_string(index=False, float_format='%.2f'))
+
+        summary_df.to_csv(output_path, index=False)
+        print(f"\n📊 Batch summary saved to '{output_path}'")
+        return summary_df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare ML vs Static across many run directories")
+    parser.add_argument('root', nargs='?', default='./', help="Directory searched for runs")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--output', default='batch_comparison_summary.csv', help="Combined summary CSV")
+    parser.add_argument('--no-cache', action='store_true', help="Parse CSVs without the columnar cache")
+    args = parser.parse_args()
+
+    BatchComparison(args.root, max_workers=args.workers, use_cache=not args.no_cache).run(args.output)
@@ -0,0 +1,281 @@
+"""
+Benchmark suite for the analysis pipeline
+
+Generates synthetic logs at each requested scale (see synthetic_logs.py), runs
+every TrafficSignalComparison stage on them headless and records wall time,
+throughput (input rows per second) and peak traced memory per stage, using
+the stage timers from profiling.py. Results are written as JSON and compared
+against a baseline file, so regressions show up as a non-zero exit code.
+
+    python benchmark.py --rows 1e3 1e5 1e6               # compare against benchmark_baseline.json
+    python benchmark.py --rows 1e3 1e5 --update-baseline  # record a new baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from profiling import get_timer_tree, start_profiling, stop_profiling
+from synthetic_logs import generate_logs
+
+
+# Stages in the order run_complete_analysis runs them
+BENCHMARKED_METHODS = [
+    'load_data',
+    'statistical_comparison',
+    'compare_aligned_intervals',
+    'compare_phase_performance',
+    'generate_performance_report',
+    'compare_episode_performance',
+    'compare_interval_data',
+    'create_vehicles_waiting_comparison_half',
+    'create_queue_length_comparison_half',
+    'create_dashboard',
+]
+
+DEFAULT_TOLERANCE = 0.25
+
+# Slowdowns smaller than this are timer noise, whatever their relative size
+MIN_REGRESSION_SECONDS = 0.05
+
+
+def prepare_logs(work_dir, rows, seed=0):
+    """
+    Synthetic logs for one scale, regenerated only if missing or stale
+
+    Args:
+        work_dir: Benchmark working directory
+        rows: Rows per interval file
+        seed: Generator seed
+
+    Returns:
+        Directory holding the six CSV files
+    """
+    data_dir = Path(work_dir) / f'rows_{rows}'
+    marker = data_dir / 'synthetic.json'
+    expected = {'rows': rows, 'seed': seed}
+    try:
+        with open(marker) as f:
+            if json.load(f) == expected:
+                return data_dir
+    except (OSError, ValueError):
+        pass
+
+    print(f"🏗️ Generating synthetic logs with {rows:,} interval rows...")
+    generate_logs(data_dir, rows, seed)
+    with open(marker, 'w') as f:
+        json.dump(expected, f)
+    return data_dir
+
+
+def benchmark_scale(data_dir, trace_memory=True, use_cache=False, verbose=False):
+    """
+    Run every benchmarked stage once on one data directory
+
+    Args:
+        data_dir: Directory with the logger CSVs
+        trace_memory: Record peak memory per stage (tracemalloc adds overhead,
+            so only compare runs made with the same setting)
+        use_cache: Read through the Feather cache (False times CSV parsing)
+        verbose: Show the analysis output instead of discarding it
+
+    Returns:
+        Dict mapping stage name to seconds, rows_per_second and peak_memory_mb
+    """
+    from analyze_stats import TrafficSignalComparison
+
+    # Figures are always rendered: the figure cache would turn repeats into file copies
+    comparison = TrafficSignalComparison(data_dir, use_cache=use_cache, output_dir=Path(data_dir) / 'output',
+                                         show_plots=False, figure_cache=False)
+    start_profiling(trace_memory=trace_memory)
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with output:
+            for method in BENCHMARKED_METHODS:
+                getattr(comparison, method)()
+        tree = get_timer_tree()
+    finally:
+        stop_profiling()
+
+    input_rows = sum(len(df) for data in (comparison.ml_data, comparison.static_data) for df in data.values())
+    results = {}
+    for method in BENCHMARKED_METHODS:
+        node = tree['children'].get(method)
+        if node is None:
+            continue
+        seconds = node['total']
+        peak = tree['gauges'].get(f'root.{method}.peak_memory_mb', {}).get('max')
+        results[method] = {
+            'seconds': seconds,
+            'rows_per_second': input_rows / seconds if seconds > 0 else None,
+            'peak_memory_mb': peak,
+            'input_rows': input_rows,
+        }
+    return results
+
+
+def best_of(runs):
+    """Fastest time and largest peak memory per stage over repeated runs"""
+    best = {}
+    for run in runs:
+        for method, result in run.items():
+            if method not in best:
+                best[method] = dict(result)
+                continue
+            kept = best[method]
+            if result['seconds'] < kept['seconds']:
+                kept['seconds'] = result['seconds']
+                kept['rows_per_second'] = result['rows_per_second']
+            if result['peak_memory_mb'] is not None:
+                kept['peak_memory_mb'] = max(kept['peak_memory_mb'] or 0, result['peak_memory_mb'])
+    return best
+
+
+def run_benchmarks(scales, work_dir, seed=0, trace_memory=True, use_cache=False, verbose=False, repeat=1):
+    """
+    Benchmark every scale
+
+    Args:
+        scales: Rows per interval file for each benchmark (e.g. [1000, 100000])
+        work_dir: Where synthetic logs and figures are written
+        seed: Generator seed
+        trace_memory: Record peak memory per stage
+        use_cache: Read through the Feather cache
+        verbose: Show the analysis output
+        repeat: Runs per scale; the fastest time per stage is kept
+
+    Returns:
+        Dict with metadata and a results entry per scale
+    """
+    report = {
+        'metadata': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python_version': platform.python_version(),
+            'numpy_version': np.__version__,
+            'pandas_version': pd.__version__,
+            'matplotlib_version': matplotlib.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'trace_memory': trace_memory,
+            'use_cache': use_cache,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': {},
+    }
+    for rows in scales:
+        data_dir = prepare_logs(work_dir, rows, seed)
+        print(f"⏱️ Benchmarking {rows:,} interval rows...")
+        runs = [benchmark_scale(data_dir, trace_memory, use_cache, verbose) for _ in range(repeat)]
+        report['results'][str(rows)] = best_of(runs)
+    return report
+
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare a benchmark report against a baseline report
+
+    Args:
+        report: Output of run_benchmarks
+        baseline: Earlier output of run_benchmarks
+        tolerance: Allowed relative slowdown or memory growth (0.25 = 25%).
+            Slowdowns under MIN_REGRESSION_SECONDS are never flagged.
+
+    Returns:
+        DataFrame with one row per (scale, stage) present in both reports
+    """
+    rows = []
+    for scale, stages in report['results'].items():
+        for method, result in stages.items():
+            previous = baseline.get('results', {}).get(scale, {}).get(method)
+            if previous is None:
+                continue
+            time_change = result['seconds'] / previous['seconds'] - 1 if previous['seconds'] else np.nan
+            slower = time_change > tolerance and result['seconds'] - previous['seconds'] > MIN_REGRESSION_SECONDS
+            memory_change = np.nan
+            if result.get('peak_memory_mb') and previous.get('peak_memory_mb'):
+                memory_change = result['peak_memory_mb'] / previous['peak_memory_mb'] - 1
+            rows.append({
+                'Rows': int(scale),
+                'Stage': method,
+                'Seconds': result['seconds'],
+                'Baseline_Seconds': previous['seconds'],
+                'Time_Change_%': time_change * 100,
+                'Peak_MB': result.get('peak_memory_mb'),
+                'Baseline_Peak_MB': previous.get('peak_memory_mb'),
+                'Memory_Change_%': memory_change * 100,
+                'Regression': bool(slower or memory_change > tolerance),
+            })
+    return pd.DataFrame(rows)
+
+
+def format_report(report):
+    """Text table of a benchmark report"""
+    lines = [f"{'Rows':>12} {'Stage':<42} {'Seconds':>9} {'Rows/s':>14} {'Peak MB':>9}"]
+    for scale, stages in report['results'].items():
+        for method, result in stages.items():
+            peak = result.get('peak_memory_mb')
+            rate = result.get('rows_per_second')
+            lines.append(f"{int(scale):>12,} {method:<42} {result['seconds']:9.3f} "
+                         f"{rate or 0:>14,.0f} {peak if peak is not None else float('nan'):9.1f}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the traffic analysis on synthetic logs")
+    parser.add_argument('--rows', type=float, nargs='+', default=[1e3, 1e4, 1e5],
+                        help="Rows per interval file for each benchmark (e.g. 1e3 1e6)")
+    parser.add_argument('--work-dir', default='benchmark_data', help="Directory for synthetic logs and figures")
+    parser.add_argument('--output', default='benchmark_results.json', help="Where this run's results are written")
+    parser.add_argument('--baseline', default='benchmark_baseline.json', help="Baseline results to compare against")
+    parser.add_argument('--update-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown or memory growth before flagging a regression")
+    parser.add_argument('--seed', type=int, default=0, help="Generator seed")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per scale; the fastest is kept")
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc (faster, no peak memory)")
+    parser.add_argument('--use-cache', action='store_true', help="Read through the Feather cache")
+    parser.add_argument('--verbose', action='store_true', help="Show the analysis output")
+    args = parser.parse_args()
+
+    matplotlib.use('Agg')
+    report = run_benchmarks([int(r) for r in args.rows], args.work_dir, args.seed,
+                            not args.no_memory, args.use_cache, args.verbose, args.repeat)
+    print("\n" + format_report(report))
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📊 Results saved to '{args.output}'")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline or not baseline_path.exists():
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline saved to '{baseline_path}'")
+        sys.exit(0)
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get('metadata', {}).get('trace_memory') != report['metadata']['trace_memory']:
+        print("⚠️ Baseline was recorded with a different memory tracing setting; timings are not comparable")
+
+    comparison = compare_to_baseline(report, baseline, args.tolerance)
+    if comparison.empty:
+        print("⚠️ No stages in common with the baseline")
+        sys.exit(0)
+    print("\n" + comparison.to_string(index=False, float_format='%.2f'))
+
+    regressions = comparison[comparison['Regression']]
+    if len(regressions):
+        print(f"\n❌ {len(regressions)} stage(s) regressed by more than {args.tolerance:.0%}")
+        sys.exit(1)
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
@@ -0,0 +1,264 @@
+"""
+Fixed-width binary logs with a memory-mapped reader
+
+A compact alternative to the CsvLogger text files: a self-describing header
+followed by packed fixed-width rows. The reader maps the rows as a NumPy
+structured array with np.memmap (no parsing, no copy), and
+TrafficSignalComparison.load_data prefers a "<name>.tslog" file over
+"<name>.csv" when it is present and not older than the CSV.
+
+File layout (all integers little-endian):
+
+    offset  size  field
+    0       6     magic b'TSBLOG'
+    6       2     uint16 format version (1)
+    8       4     uint32 header size in bytes (offset of the first row, multiple of 8)
+    12      4     uint32 row size in bytes
+    16      2     uint16 number of columns
+    18      2     reserved (0)
+    20      ...   one descriptor per column:
+                    uint8   name length n
+                    n       column name (UTF-8)
+                    3       NumPy dtype string ('<i4', '<f8', '|i1', ...)
+                    uint8   flags (bit 0: categorical, values are category labels)
+    ...           zero padding up to the header size
+    header size   rows, packed back to back without alignment padding
+
+The row count is not stored: it is (file size - header size) // row size, so a
+writer only ever appends rows, and a partially written final row (e.g. after a
+crash) is ignored.
+
+    python binlog.py ../path/to/logs          # convert every logger CSV in a directory
+"""
+import argparse
+import struct
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csv_cache import CSV_SCHEMAS, read_typed_csv
+
+
+MAGIC = b'TSBLOG'
+FORMAT_VERSION = 1
+SUFFIX = '.tslog'
+
+_PREAMBLE = struct.Struct('<6sHIIHH')
+FLAG_CATEGORICAL = 1
+
+# Storage dtype per schema dtype before integer narrowing (see _storage_dtype)
+STORAGE_DTYPES = {
+    'int32': '<i4',
+    'int64': '<i8',
+    'float32': '<f4',
+    'float64': '<f8',
+    'category': '<i4',
+}
+
+
+def binary_path(csv_path):
+    """Binary log file belonging to a CSV path"""
+    return Path(csv_path).with_suffix(SUFFIX)
+
+
+def _storage_dtype(values, dtype):
+    """Narrowest signed integer holding every value, or dtype for floats"""
+    dtype = np.dtype(dtype)
+    if dtype.kind != 'i' or values.size == 0:
+        return dtype
+    low, high = int(values.min()), int(values.max())
+    for candidate in ('|i1', '<i2', '<i4', '<i8'):
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            return np.dtype(candidate)
+    return dtype
+
+
+def write_header(f, columns):
+    """
+    Write the header for the given columns
+
+    Args:
+        f: Binary file object positioned at the start of the file
+        columns: List of (name, dtype, categorical) tuples
+
+    Returns:
+        Structured row dtype matching the header
+    """
+    row_dtype = np.dtype([(name, dtype) for name, dtype, _ in columns])
+    descriptors = b''
+    for name, dtype, categorical in columns:
+        encoded = name.encode('utf-8')
+        descriptors += struct.pack('<B', len(encoded)) + encoded
+        descriptors += np.dtype(dtype).str.encode('ascii') + struct.pack('<B', FLAG_CATEGORICAL if categorical else 0)
+    header_size = -(-(_PREAMBLE.size + len(descriptors)) // 8) * 8
+    f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_size, row_dtype.itemsize, len(columns), 0))
+    f.write(descriptors.ljust(header_size - _PREAMBLE.size, b'\0'))
+    return row_dtype
+
+
+def read_header(path):
+    """
+    Parse the header of a binary log
+
+    Args:
+        path: Binary log file
+
+    Returns:
+        Tuple (row_dtype, header_size, categorical column names)
+    """
+    with open(path, 'rb') as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{path} is too short to be a binary log")
+        magic, version, header_size, row_size, n_columns, _ = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary log")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has unsupported format version {version}")
+        descriptors = f.read(header_size - _PREAMBLE.size)
+
+    fields = []
+    categorical = []
+    position = 0
+    for _ in range(n_columns):
+        length = descriptors[position]
+        name = descriptors[position + 1:position + 1 + length].decode('utf-8')
+        position += 1 + length
+        dtype = descriptors[position:position + 3].decode('ascii')
+        if descriptors[position + 3] & FLAG_CATEGORICAL:
+            categorical.append(name)
+        position += 4
+        fields.append((name, dtype))
+
+    row_dtype = np.dtype(fields)
+    if row_dtype.itemsize != row_size:
+        raise ValueError(f"{path}: header row size {row_size} does not match its columns ({row_dtype.itemsize})")
+    return row_dtype, header_size, categorical
+
+
+def read_binary_log(path):
+    """
+    Memory-map the rows of a binary log
+
+    Args:
+        path: Binary log file
+
+    Returns:
+        Read-only structured np.memmap with one field per column (an empty
+        array when the file holds no complete row)
+    """
+    row_dtype, header_size, _ = read_header(path)
+    n_rows = (Path(path).stat().st_size - header_size) // row_dtype.itemsize
+    if n_rows <= 0:
+        # np.memmap cannot map zero bytes
+        return np.empty(0, dtype=row_dtype)
+    return np.memmap(path, dtype=row_dtype, mode='r', offset=header_size, shape=(n_rows,))
+
+
+def load_binary_log(path):
+    """
+    Binary log as a DataFrame with the same dtypes read_typed_csv produces
+
+    Args:
+        path: Binary log file; its CSV schema is looked up by the matching
+            '.csv' filename
+
+    Returns:
+        DataFrame with one column per field
+    """
+    path = Path(path)
+    _, _, categorical = read_header(path)
+    rows = read_binary_log(path)
+    schema = CSV_SCHEMAS.get(path.with_suffix('.csv').name, {})
+
+    columns = {}
+    for name in rows.dtype.names:
+        values = np.asarray(rows[name])
+        if name in categorical:
+            labels, codes = np.unique(values, return_inverse=True)
+            columns[name] = pd.Categorical.from_codes(codes, labels.astype(str))
+        else:
+            dtype = schema.get(name, values.dtype.newbyteorder('='))
+            columns[name] = values.astype(dtype)
+    return pd.DataFrame(columns)
+
+
+def write_binary_log(df, path):
+    """
+    Write a DataFrame as a binary log
+
+    Integer columns are stored in the narrowest signed type holding their
+    values; categorical columns must have integer labels (e.g. CurrentPhase).
+
+    Args:
+        df: DataFrame with numeric or integer-labelled categorical columns
+        path: Output file (replaced atomically)
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    columns = []
+    arrays = {}
+    for name in df.columns:
+        series = df[name]
+        categorical = isinstance(series.dtype, pd.CategoricalDtype)
+        if categorical:
+            values = pd.to_numeric(series.astype(str), errors='raise').to_numpy()
+            dtype = STORAGE_DTYPES['category']
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            values = series.to_numpy()
+            dtype = STORAGE_DTYPES.get(str(series.dtype), series.dtype)
+        else:
+            raise ValueError(f"Column '{name}' is not numeric and cannot be stored in a binary log")
+        dtype = np.dtype(dtype).newbyteorder('<')
+        columns.append((name, _storage_dtype(values, dtype), categorical))
+        arrays[name] = values
+
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        row_dtype = write_header(f, columns)
+        rows = np.empty(len(df), dtype=row_dtype)
+        for name in df.columns:
+            rows[name] = arrays[name]
+        rows.tofile(f)
+    tmp_path.replace(path)
+    return path
+
+
+def convert_csv(csv_path, output_path=None):
+    """
+    Convert one logger CSV to a binary log
+
+    Args:
+        csv_path: Source CSV (parsed with its typed schema)
+        output_path: Destination (default: the CSV path with a '.tslog' suffix)
+
+    Returns:
+        Path of the written binary log
+    """
+    return write_binary_log(read_typed_csv(csv_path), output_path or binary_path(csv_path))
+
+
+def is_fresh(csv_path):
+    """Whether a binary log exists for the CSV and is at least as new as it"""
+    path = binary_path(csv_path)
+    if not path.exists():
+        return False
+    csv_path = Path(csv_path)
+    return not csv_path.exists() or csv_path.stat().st_mtime_ns <= path.stat().st_mtime_ns
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert logger CSVs to fixed-width binary logs")
+    parser.add_argument('paths', nargs='+', help="CSV files, or directories whose logger CSVs are converted")
+    args = parser.parse_args()
+
+    for target in map(Path, args.paths):
+        sources = [target / name for name in CSV_SCHEMAS if (target / name).exists()] if target.is_dir() else [target]
+        for source in sources:
+            output = convert_csv(source)
+            ratio = source.stat().st_size / max(output.stat().st_size, 1)
+            print(f"✅ {source.name} -> {output.name} ({output.stat().st_size:,} bytes, {ratio:.1f}x smaller)")
@@ -0,0 +1,326 @@
+"""
+Offline evaluation of exported ML-Agents checkpoints
+
+Loads every <Behavior>-<step>.onnx checkpoint of a run with onnxruntime (CPU
+only), runs batched forward passes over one shared observation set and reports
+per checkpoint the distribution of the chosen actions, the green time they map
+to, inference latency and throughput. Checkpoints are evaluated in a process
+pool, each worker with its own single-threaded (by default) session, so the
+whole run is scored in the time of a few sequential evaluations.
+
+Observations are either loaded from a .npy/.csv file (one row per decision,
+one column per observation) or generated synthetically with the same layout
+the agent writes in MLSignalTimingOptimizationSO.CheckVehicles.
+"""
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tfevents import TrainingRun
+
+try:
+    import onnxruntime as ort
+except ImportError:  # checkpoint evaluation is unavailable without onnxruntime
+    ort = None
+
+
+# ML_DATA in TrafficSignalMlAgent: OFSET + legs * vehicles per leg * (distance, wait time)
+OBSERVATION_OFFSET = 1
+NUM_OF_LEGS = 4
+NUM_OF_VEHICLES_PER_LEG = 15
+OBSERVATION_SIZE = OBSERVATION_OFFSET + NUM_OF_LEGS * NUM_OF_VEHICLES_PER_LEG * 2
+
+# Output names in order of preference; deterministic outputs make runs comparable
+ACTION_OUTPUTS = ['deterministic_continuous_actions', 'continuous_actions',
+                  'deterministic_discrete_actions', 'discrete_actions']
+
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_SYNTHETIC_OBSERVATIONS = 10_000
+ACTION_BINS = np.linspace(-1, 1, 11)
+
+# Single-observation calls timed per checkpoint (the latency Unity sees per decision)
+LATENCY_SAMPLES = 200
+
+_STEP_PATTERN = re.compile(r'-(\d+)\.onnx$')
+
+
+def discover_checkpoints(directory):
+    """
+    Find the exported checkpoints of a behavior directory
+
+    Args:
+        directory: Directory holding <Behavior>-<step>.onnx files
+
+    Returns:
+        List of paths sorted by training step
+    """
+    paths = [p for p in Path(directory).glob('*.onnx') if _STEP_PATTERN.search(p.name)]
+    return sorted(paths, key=lambda p: int(_STEP_PATTERN.search(p.name).group(1)))
+
+
+def synthetic_observations(n, seed=0, mean_vehicles=3.0, max_distance=60.0, max_wait=120.0):
+    """
+    Observation vectors shaped like the ones the agent collects in Unity
+
+    Reproduces the index arithmetic of MLSignalTimingOptimizationSO.CheckVehicles
+    exactly (including which slots it overwrites), so checkpoints are queried
+    with inputs from the distribution they were trained on.
+
+    Args:
+        n: Number of observation vectors
+        seed: Random seed
+        mean_vehicles: Mean number of vehicles waiting per leg
+        max_distance: Largest distance of a waiting vehicle from the stop line
+        max_wait: Longest wait time in seconds
+
+    Returns:
+        float32 array of shape (n, OBSERVATION_SIZE)
+    """
+    rng = np.random.default_rng(seed)
+    obs = np.zeros((n, OBSERVATION_SIZE), dtype=np.float32)
+    vehicles = np.minimum(rng.poisson(mean_vehicles, (n, NUM_OF_LEGS)), NUM_OF_VEHICLES_PER_LEG)
+    slots = np.arange(NUM_OF_VEHICLES_PER_LEG)
+
+    for leg in range(NUM_OF_LEGS):
+        present = slots < vehicles[:, [leg]]
+        distance = np.sort(rng.uniform(1, max_distance, (n, NUM_OF_VEHICLES_PER_LEG)), axis=1)
+        wait = np.sort(rng.uniform(0, max_wait, (n, NUM_OF_VEHICLES_PER_LEG)), axis=1)[:, ::-1]
+
+        # observationIndex = 0: distances land on OFSET + j for every leg
+        obs[:, OBSERVATION_OFFSET + slots] = np.where(present, distance, -1)
+
+        # observationIndex = 1: waits at leg + j, empty slots cleared at letIndex + j.
+        # Written slot by slot because later slots may overwrite earlier ones.
+        for let in range(NUM_OF_LEGS):
+            for j in slots:
+                waiting_index = OBSERVATION_OFFSET + leg + j
+                cleared_index = OBSERVATION_OFFSET + let + j
+                obs[:, waiting_index] = np.where(present[:, j], wait[:, j], obs[:, waiting_index])
+                obs[:, cleared_index] = np.where(present[:, j], obs[:, cleared_index], -1)
+    return obs
+
+
+def load_observations(path):
+    """
+    Load a logged observation set
+
+    Args:
+        path: .npy file (memory-mapped) or CSV file with one column per observation
+
+    Returns:
+        float32 array of shape (n, observation size)
+    """
+    path = Path(path)
+    if path.suffix == '.npy':
+        return np.load(path, mmap_mode='r')
+    return pd.read_csv(path).to_numpy(dtype=np.float32)
+
+
+def _session(model_path, threads):
+    if ort is None:
+        raise ImportError("onnxruntime is required for checkpoint evaluation (pip install onnxruntime)")
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    return ort.InferenceSession(str(model_path), sess_options=options, providers=['CPUExecutionProvider'])
+
+
+def evaluate_checkpoint(model_path, observations_path=None, n_synthetic=DEFAULT_SYNTHETIC_OBSERVATIONS,
+                        seed=0, batch_size=DEFAULT_BATCH_SIZE, threads=1):
+    """
+    Score one checkpoint (runs in a worker process)
+
+    Args:
+        model_path: Path to the .onnx checkpoint
+        observations_path: Logged observations (None uses synthetic ones)
+        n_synthetic: Number of synthetic observations
+        seed: Seed of the synthetic observations (same for every checkpoint)
+        batch_size: Observations per forward pass
+        threads: onnxruntime intra-op threads
+
+    Returns:
+        Dict with the action distribution, latency and throughput
+    """
+    model_path = Path(model_path)
+    session = _session(model_path, threads)
+    model_input = session.get_inputs()[0]
+    outputs = [o.name for o in session.get_outputs()]
+    action_output = next((name for name in ACTION_OUTPUTS if name in outputs), None)
+    if action_output is None:
+        raise ValueError(f"{model_path.name} has none of the action outputs {ACTION_OUTPUTS}")
+
+    if observations_path is not None:
+        observations = load_observations(observations_path)
+    else:
+        observations = synthetic_observations(n_synthetic, seed)
+    expected = model_input.shape[-1]
+    if isinstance(expected, int) and observations.shape[1] != expected:
+        raise ValueError(f"{model_path.name} expects {expected} observations per row, got {observations.shape[1]}")
+
+    # Warm-up so allocation and graph optimisation are not timed
+    session.run([action_output], {model_input.name: np.ascontiguousarray(observations[:batch_size], dtype=np.float32)})
+
+    actions = []
+    batch_ms = []
+    started = time.perf_counter()
+    for start in range(0, len(observations), batch_size):
+        batch = np.ascontiguousarray(observations[start:start + batch_size], dtype=np.float32)
+        batch_started = time.perf_counter()
+        actions.append(session.run([action_output], {model_input.name: batch})[0])
+        batch_ms.append((time.perf_counter() - batch_started) * 1000)
+    elapsed = time.perf_counter() - started
+    actions = np.concatenate(actions).reshape(len(observations), -1)[:, 0]
+
+    single_ms = []
+    for row in observations[:LATENCY_SAMPLES]:
+        single = np.ascontiguousarray(row[None, :], dtype=np.float32)
+        single_started = time.perf_counter()
+        session.run([action_output], {model_input.name: single})
+        single_ms.append((time.perf_counter() - single_started) * 1000)
+
+    step_match = _STEP_PATTERN.search(model_path.name)
+    result = {
+        'Checkpoint': model_path.name,
+        'Step': int(step_match.group(1)) if step_match else None,
+        'ActionOutput': action_output,
+        'Observations': len(observations),
+        'Throughput_obs_per_s': len(observations) / elapsed if elapsed > 0 else np.nan,
+        'Batch_Latency_p50_ms': np.percentile(batch_ms, 50),
+        'Batch_Latency_p95_ms': np.percentile(batch_ms, 95),
+        'Single_Latency_p50_ms': np.percentile(single_ms, 50) if single_ms else np.nan,
+        'Single_Latency_p95_ms': np.percentile(single_ms, 95) if single_ms else np.nan,
+    }
+
+    if 'continuous' in action_output:
+        # Unity clips continuous actions to [-1, 1] before OnActionReceived
+        clipped = np.clip(actions, -1, 1)
+        result.update({
+            'Action_Mean': clipped.mean(),
+            'Action_Std': clipped.std(),
+            'Action_p05': np.percentile(clipped, 5),
+            'Action_p50': np.percentile(clipped, 50),
+            'Action_p95': np.percentile(clipped, 95),
+            'Clipped_%': np.mean(np.abs(actions) > 1) * 100,
+            # Position inside [green - MINIMUM_GREEN_LIGHT_OFSET, green + MAXIMUM_GREEN_LIGHT_OFSET]
+            'Green_Interpolation_Mean': ((clipped + 1) / 2).mean(),
+        })
+        counts, _ = np.histogram(clipped, bins=ACTION_BINS)
+        for low, high, count in zip(ACTION_BINS[:-1], ACTION_BINS[1:], counts):
+            result[f'Action_[{low:+.1f},{high:+.1f})_%'] = count / len(clipped) * 100
+    else:
+        values, counts = np.unique(actions.astype(np.int64), return_counts=True)
+        for value, count in zip(values, counts):
+            result[f'Action_{value}_%'] = count / len(actions) * 100
+    return result
+
+
+class CheckpointEvaluation:
+    def __init__(self, checkpoint_directory, observations_path=None, n_synthetic=DEFAULT_SYNTHETIC_OBSERVATIONS,
+                 batch_size=DEFAULT_BATCH_SIZE, max_workers=None, seed=0):
+        """
+        Evaluate every exported checkpoint of a behavior
+
+        Args:
+            checkpoint_directory: Behavior directory with <Behavior>-<step>.onnx files
+                (e.g. ../Assets/results/TrafficRun02/FourWaySignal)
+            observations_path: Logged observations (.npy or .csv); None uses
+                n_synthetic synthetic observations
+            n_synthetic: Number of synthetic observations
+            batch_size: Observations per forward pass
+            max_workers: Worker processes (default: number of CPUs)
+            seed: Seed of the synthetic observations
+        """
+        self.checkpoint_dir = Path(checkpoint_directory)
+        self.observations_path = observations_path
+        self.n_synthetic = n_synthetic
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.seed = seed
+        self.checkpoints = []
+
+    def discover(self):
+        """Find the checkpoints to evaluate"""
+        self.checkpoints = discover_checkpoints(self.checkpoint_dir)
+        print(f"🔍 Found {len(self.checkpoints)} checkpoints in {self.checkpoint_dir}")
+        return self.checkpoints
+
+    def _add_training_rewards(self, results_df):
+        """Join the reward recorded for each checkpoint in run_logs/training_status.json"""
+        checkpoints = TrainingRun(self.checkpoint_dir.parent).checkpoints()
+        checkpoints = checkpoints[checkpoints['Behavior'] == self.checkpoint_dir.name]
+        if checkpoints.empty:
+            return results_df
+        rewards = checkpoints.drop_duplicates('Steps', keep='last').set_index('Steps')['Reward']
+        results_df.insert(2, 'Training_Reward', results_df['Step'].map(rewards))
+        return results_df
+
+    def run(self, output_path='checkpoint_evaluation.csv'):
+        """
+        Evaluate every checkpoint in a process pool and write the combined table
+
+        Args:
+            output_path: Where to save the evaluation CSV
+
+        Returns:
+            DataFrame with one row per checkpoint, sorted by step
+        """
+        if not self.checkpoints:
+            self.discover()
+        if not self.checkpoints:
+            print("❌ No checkpoints found")
+            return pd.DataFrame()
+
+        workers = self.max_workers or min(len(self.checkpoints), os.cpu_count() or 1)
+        # Split the cores between workers instead of oversubscribing them
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+        rows = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(evaluate_checkpoint, path, self.observations_path, self.n_synthetic,
+                                       self.seed, self.batch_size, threads): path
+                       for path in self.checkpoints}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    rows.append(future.result())
+                    print(f"✅ Evaluated {path.name}")
+                except Exception as e:
+                    print(f"❌ Failed to evaluate {path.name}: {e}")
+
+        results_df = pd.DataFrame(rows)
+        if not results_df.empty:
+            results_df = self._add_training_rewards(results_df.sort_values('Step').reset_index(drop=True))
+
+        print(f"\n{'='*60}")
+        print("CHECKPOINT EVALUATION")
+        print("="*60)
+        overview = [c for c in ('Checkpoint', 'Training_Reward', 'Action_Mean', 'Action_Std', 'Clipped_%',
+                                'Single_Latency_p50_ms', 'Throughput_obs_per_s') if c in results_df.columns]
+        print(results_df[overview].to_string(index=False, float_format='%.3f'))
+
+        results_df.to_csv(output_path, index=False)
+        print(f"\n📊 Checkpoint evaluation saved to '{output_path}'")
+        return results_df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Evaluate exported ONNX checkpoints on CPU")
+    parser.add_argument('checkpoint_dir', help="Behavior directory with <Behavior>-<step>.onnx files")
+    parser.add_argument('--observations', default=None, help="Logged observations (.npy or .csv)")
+    parser.add_argument('--synthetic', type=int, default=DEFAULT_SYNTHETIC_OBSERVATIONS,
+                        help="Number of synthetic observations when none are logged")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Observations per forward pass")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic observations")
+    parser.add_argument('--output', default='checkpoint_evaluation.csv', help="Evaluation CSV")
+    args = parser.parse_args()
+
+    CheckpointEvaluation(args.checkpoint_dir, args.observations, args.synthetic, args.batch_size,
+                         args.workers, args.seed).run(args.output)
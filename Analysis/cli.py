@@ -0,0 +1,148 @@
+"""
+Command-line entry point for the ML vs static comparison
+
+    python cli.py summary      # summary table from the episode logs only
+    python cli.py report       # statistics, time-aligned and per-phase comparison, performance report
+    python cli.py plots        # every figure, rendered headless
+    python cli.py dashboard    # the dashboard figure only
+    python cli.py serve        # live KPIs over HTTP (JSON and Prometheus, see metrics_server.py)
+
+Everything beyond argparse is imported inside the subcommand that needs it,
+and matplotlib/seaborn are only imported when a figure is drawn, so `summary`
+starts quickly enough to run after every batch of episodes (e.g. from a
+post-run hook). Run `python cli.py <command> --help` for the options.
+"""
+import argparse
+import sys
+import time
+
+
+def _comparison(args, show_plots=False):
+    """TrafficSignalComparison configured from the common options"""
+    from analyze_stats import TrafficSignalComparison
+    return TrafficSignalComparison(args.data_dir, use_cache=not args.no_cache, output_dir=args.output_dir,
+                                   show_plots=show_plots, training_run_dir=getattr(args, 'training_run', None),
+                                   figure_cache=not getattr(args, 'no_figure_cache', False))
+
+
+def _loaded(comparison, tables=('episodes', 'rewards', 'intervals')):
+    """Load the logs; False (after the error is printed) if any is missing"""
+    comparison.load_data(tables)
+    return all(key in data for data in (comparison.ml_data, comparison.static_data) for key in tables)
+
+
+def run_summary(args):
+    """Summary table of the episode logs (no interval logs, no figures)"""
+    comparison = _comparison(args)
+    if not _loaded(comparison, ('episodes',)):
+        return 1
+    comparison.statistical_comparison(n_resamples=args.resamples)
+    return 0
+
+
+def run_report(args):
+    """Statistics, time-aligned and per-phase comparison and the performance report"""
+    from significance import DEFAULT_RESAMPLES
+    comparison = _comparison(args)
+    if not _loaded(comparison):
+        return 1
+    comparison.statistical_comparison(n_resamples=DEFAULT_RESAMPLES if args.resamples is None else args.resamples)
+    comparison.compare_aligned_intervals()
+    comparison.compare_phase_performance()
+    comparison.generate_performance_report()
+    return 0
+
+
+def run_plots(args):
+    """Every figure (interactive windows with --show, otherwise headless)"""
+    comparison = _comparison(args, show_plots=args.show)
+    if not _loaded(comparison):
+        return 1
+    if not args.show:
+        for name, paths in comparison.render_all_figures(args.workers).items():
+            if paths:
+                print(f"✅ {name} saved as {', '.join(repr(p.name) for p in paths)}")
+            else:
+                print(f"❌ {name}: required data not available")
+        return 0
+    comparison.compare_episode_performance()
+    comparison.compare_interval_data()
+    comparison.create_vehicles_waiting_comparison_half()
+    comparison.create_queue_length_comparison_half()
+    comparison.create_dashboard()
+    return 0
+
+
+def run_dashboard(args):
+    """The comprehensive dashboard figure"""
+    comparison = _comparison(args, show_plots=args.show)
+    if not _loaded(comparison, ('episodes', 'intervals')):
+        return 1
+    paths = comparison.create_dashboard()
+    if not paths:
+        print("❌ Dashboard: required data not available")
+        return 1
+    print(f"✅ Dashboard saved as {', '.join(repr(p.name) for p in paths)}")
+    return 0
+
+
+def run_serve(args):
+    """Serve live KPIs of the log directory until interrupted"""
+    from metrics_server import serve
+    serve(args.data_dir, args.host, args.port, args.poll_seconds)
+    return 0
+
+
+def build_parser():
+    """Argument parser with one subcommand per analysis entry point"""
+    data = argparse.ArgumentParser(add_help=False)
+    data.add_argument('--data-dir', default='./', help="Directory containing the CSV files")
+    common = argparse.ArgumentParser(add_help=False, parents=[data])
+    common.add_argument('--output-dir', default='./', help="Directory the summary, reports and figures are written to")
+    common.add_argument('--no-cache', action='store_true', help="Parse CSVs without the columnar cache")
+
+    parser = argparse.ArgumentParser(description="Compare the ML agent against the static signal controller")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    summary = commands.add_parser('summary', parents=[common], help="Summary table from the episode logs only")
+    summary.add_argument('--resamples', type=int, default=0,
+                         help="Bootstrap resamples for confidence intervals and p-values (0 skips them)")
+    summary.set_defaults(handler=run_summary)
+
+    report = commands.add_parser('report', parents=[common], help="Statistics and performance report, no figures")
+    report.add_argument('--resamples', type=int, default=None,
+                        help="Bootstrap resamples for confidence intervals and p-values "
+                             "(default: significance.DEFAULT_RESAMPLES, 0 skips them)")
+    report.add_argument('--training-run', default=None, help="ML-Agents results directory of the training run")
+    report.set_defaults(handler=run_report)
+
+    plots = commands.add_parser('plots', parents=[common], help="Render every comparison figure")
+    plots.add_argument('--show', action='store_true', help="Open each figure in a window instead of rendering headless")
+    plots.add_argument('--workers', type=int, default=None, help="Render processes (default: one per figure)")
+    plots.add_argument('--no-figure-cache', action='store_true', help="Re-render figures even if their inputs are unchanged")
+    plots.set_defaults(handler=run_plots)
+
+    dashboard = commands.add_parser('dashboard', parents=[common], help="Render the dashboard figure only")
+    dashboard.add_argument('--show', action='store_true', help="Open the figure in a window")
+    dashboard.add_argument('--no-figure-cache', action='store_true', help="Re-render the figure even if its inputs are unchanged")
+    dashboard.set_defaults(handler=run_dashboard)
+
+    serve = commands.add_parser('serve', parents=[data], help="Serve live KPIs as JSON and Prometheus metrics")
+    serve.add_argument('--host', default='127.0.0.1', help="Interface to listen on (0.0.0.0 for all)")
+    serve.add_argument('--port', type=int, default=9108, help="TCP port")
+    serve.add_argument('--poll-seconds', type=float, default=5.0, help="Seconds between checks of the logs for changes")
+    serve.set_defaults(handler=run_serve)
+    return parser
+
+
+def main(argv=None):
+    """Run the command line and return the exit code"""
+    args = build_parser().parse_args(argv)
+    started = time.perf_counter()
+    exit_code = args.handler(args)
+    print(f"\n⏱️ {args.command} finished in {time.perf_counter() - started:.2f}s")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Shared ML vs static comparison helpers
+
+Small statistics used by every analysis path (in-memory, streaming, live,
+batch), kept free of the analysis engines so any module can import them.
+"""
+import pandas as pd
+
+
+# Metrics compared in the summary table (same as statistical_comparison)
+SUMMARY_METRICS = ['TotalVehicles', 'VehiclesWaiting']
+
+
+def improvement_percent(metric, ml_mean, static_mean):
+    """
+    Improvement of the ML agent over the static controller, in percent
+
+    Positive values mean ML is better. Lower is better for every metric except
+    TotalVehicles, which measures throughput.
+    """
+    improvement = ((static_mean - ml_mean) / static_mean) * 100
+    if metric == 'TotalVehicles':
+        improvement = improvement * -1
+    return improvement
+
+
+def summary_table(ml_stats, static_stats, metrics=SUMMARY_METRICS):
+    """
+    Build the performance_comparison_summary table from per-metric statistics
+
+    Args:
+        ml_stats: Dict metric -> dict with at least 'mean' and 'std' (ML)
+        static_stats: Same for the static controller
+        metrics: Metrics to include, in order (missing ones are skipped)
+
+    Returns:
+        DataFrame with Metric, ML_Mean, Static_Mean, ML_Std, Static_Std, Improvement_%
+    """
+    results = []
+    for metric in metrics:
+        if metric not in ml_stats or metric not in static_stats:
+            continue
+        ml_mean = ml_stats[metric]['mean']
+        static_mean = static_stats[metric]['mean']
+        results.append({
+            'Metric': metric,
+            'ML_Mean': ml_mean,
+            'Static_Mean': static_mean,
+            'ML_Std': ml_stats[metric]['std'],
+            'Static_Std': static_stats[metric]['std'],
+            'Improvement_%': improvement_percent(metric, ml_mean, static_mean)
+        })
+    return pd.DataFrame(results)
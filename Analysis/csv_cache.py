@@ -0,0 +1,223 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional, fall back to plain CSV parsing
+    pa = None
+    feather = None
+
+
+# Bump whenever a schema below changes so existing caches get rebuilt
+SCHEMA_VERSION = 1
+
+# Typed schemas for every CSV written by the Unity loggers. SimulationTime stays
+# float64 because it is the simulation clock and float32 drifts on long runs.
+CSV_SCHEMAS = {
+    'episode_results.csv': {
+        'Episode': 'int32',
+        'TotalVehicles': 'int32',
+        'VehiclesWaiting': 'int32',
+        'EpisodeDuration': 'float32',
+        'CumulativeReward': 'float32',
+        'CurrentReward': 'float32',
+        'CurrentPhase': 'category',
+        'GreenLightTime': 'float32',
+        'FuelConsumed': 'float32',
+    },
+    'reward_progress.csv': {
+        'Step': 'int32',
+        'Episode': 'int32',
+        'Reward': 'float32',
+        'CumulativeReward': 'float32',
+    },
+    'interval_data.csv': {
+        'SimulationTime': 'float64',
+        'Episode': 'int32',
+        'Step': 'int32',
+        'TotalVehicles': 'int32',
+        'VehiclesWaiting': 'int32',
+        'QueueLength': 'int32',
+        'CumulativeReward': 'float32',
+        'CurrentReward': 'float32',
+        'CurrentPhase': 'category',
+        'GreenLightTime': 'float32',
+        'FuelConsumed': 'float32',
+        'AverageWaitTime': 'float32',
+    },
+    'static_episode_results.csv': {
+        'Episode': 'int32',
+        'TotalVehicles': 'int32',
+        'VehiclesWaiting': 'int32',
+        'EpisodeDuration': 'float32',
+        'AverageWaitTime': 'float32',
+        'Throughput': 'float32',
+        'CurrentPhase': 'category',
+        'PhaseGreenTime': 'float32',
+        'FuelConsumed': 'float32',
+    },
+    'static_reward_progress.csv': {
+        'Step': 'int32',
+        'Episode': 'int32',
+        'TotalVehicles': 'int32',
+        'VehiclesWaiting': 'int32',
+        'SimulationTime': 'float64',
+    },
+    'static_interval_data.csv': {
+        'SimulationTime': 'float64',
+        'Episode': 'int32',
+        'TotalVehicles': 'int32',
+        'VehiclesWaiting': 'int32',
+        'QueueLength': 'int32',
+        'AverageWaitTime': 'float32',
+        'Throughput': 'float32',
+        'CurrentPhase': 'category',
+        'PhaseGreenTime': 'float32',
+        'PhaseDuration': 'float32',
+        'FuelConsumed': 'float32',
+        'VehiclesDeparted': 'int32',
+        'TrafficDensity': 'float32',
+    },
+}
+
+
+def read_typed_csv(path, **kwargs):
+    """
+    Parse a logger CSV using its typed schema (if one is known)
+
+    Args:
+        path: Path to the CSV file
+        **kwargs: Extra keyword arguments forwarded to pd.read_csv
+
+    Returns:
+        DataFrame with the schema dtypes applied
+    """
+    path = Path(path)
+    schema = CSV_SCHEMAS.get(path.name)
+    if not schema:
+        return pd.read_csv(path, **kwargs)
+
+    try:
+        return pd.read_csv(path, dtype=schema, **kwargs)
+    except (ValueError, TypeError):
+        # Missing values or unexpected formatting - parse untyped, then
+        # downcast whatever columns still fit the schema
+        df = pd.read_csv(path, **kwargs)
+        for column, dtype in schema.items():
+            if column in df.columns:
+                try:
+                    df[column] = df[column].astype(dtype)
+                except (ValueError, TypeError):
+                    pass
+        return df
+
+
+class CsvCache:
+    def __init__(self, data_directory="./", cache_directory=None):
+        """
+        Columnar (Arrow/Feather) cache in front of the logger CSV files
+
+        Each CSV is parsed once with its typed schema and written as an
+        uncompressed Feather file. Later reads memory-map the Feather file
+        instead of re-parsing text. An entry is rebuilt only when the source
+        CSV's size or modification time changes.
+
+        Args:
+            data_directory: Directory containing the CSV files
+            cache_directory: Where cache files are stored (default: <data_directory>/.cache)
+        """
+        self.data_dir = Path(data_directory)
+        self.cache_dir = Path(cache_directory) if cache_directory else self.data_dir / '.cache'
+        self.manifest_path = self.cache_dir / 'manifest.json'
+        self.enabled = feather is not None
+        self._manifest = None
+
+    def _load_manifest(self):
+        if self._manifest is None:
+            try:
+                with open(self.manifest_path) as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError):
+                self._manifest = {}
+        return self._manifest
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f, indent=2)
+        tmp_path.replace(self.manifest_path)
+
+    @staticmethod
+    def _source_key(path):
+        stat = path.stat()
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'schema': SCHEMA_VERSION}
+
+    def cache_path(self, filename):
+        """Return the Feather file backing the given CSV (named after the full filename)"""
+        return self.cache_dir / (Path(filename).name + '.feather')
+
+    def is_fresh(self, filename):
+        """Check whether the cached copy of a CSV is still valid"""
+        source = self.data_dir / filename
+        entry = self._load_manifest().get(filename)
+        return (entry is not None
+                and entry == self._source_key(source)
+                and self.cache_path(filename).exists())
+
+    def read(self, filename, loader=None):
+        """
+        Read a CSV through the cache
+
+        Args:
+            filename: Name of the CSV file inside the data directory
+            loader: Callable parsing the source path into a DataFrame
+                (default: read_typed_csv). Lets other log formats share the cache.
+
+        Returns:
+            DataFrame with typed columns
+        """
+        source = self.data_dir / filename
+        loader = loader or read_typed_csv
+        if not self.enabled:
+            return loader(source)
+
+        # Raises FileNotFoundError for missing sources, same as pd.read_csv
+        key = self._source_key(source)
+        cached = self.cache_path(filename)
+
+        if self.is_fresh(filename):
+            try:
+                table = feather.read_table(cached, memory_map=True)
+                return table.to_pandas()
+            except (OSError, pa.ArrowInvalid):
+                pass  # Corrupt or partially written cache file, rebuild below
+
+        df = loader(source)
+        self._write(filename, df, key)
+        return df
+
+    def _write(self, filename, df, key):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cached = self.cache_path(filename)
+            tmp_path = cached.with_name(cached.name + '.tmp')
+            # Uncompressed so that reads can be memory-mapped without decoding
+            feather.write_feather(df, tmp_path, compression='uncompressed')
+            tmp_path.replace(cached)
+            self._load_manifest()[filename] = key
+            self._save_manifest()
+        except OSError as e:
+            # A read-only data directory should not break the analysis
+            print(f"⚠️ Could not write cache for {filename}: {e}")
+
+    def clear(self):
+        """Remove every cached file"""
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.feather'):
+                path.unlink()
+            if self.manifest_path.exists():
+                self.manifest_path.unlink()
+        self._manifest = {}
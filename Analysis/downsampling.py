@@ -0,0 +1,140 @@
+"""
+Shape-preserving downsampling for long time-series plots
+
+Both methods are fully vectorized with NumPy (no Python loop per point or per
+bucket) and always keep the first and last sample.
+
+- minmax: keeps the minimum and maximum of every bucket, so spikes in queue
+  length or waiting vehicles are never lost.
+- lttb: Largest-Triangle-Three-Buckets. Picks the point of each bucket that
+  spans the largest triangle with the neighbouring buckets. The neighbours are
+  represented by their bucket averages, which lets every bucket be solved at
+  once instead of depending on the point picked in the previous bucket.
+"""
+import numpy as np
+
+
+DEFAULT_MAX_POINTS = 4000
+
+
+def _bucket_edges(n, n_buckets):
+    """Start index of each bucket over samples 1..n-2, plus the end index"""
+    return np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+
+
+def _segment_argmax(values, starts, sizes):
+    """Index of the (first) maximum of every contiguous segment"""
+    seg_max = np.maximum.reduceat(values, starts)
+    bucket_ids = np.repeat(np.arange(starts.size), sizes)
+    hits = np.flatnonzero(values == np.repeat(seg_max, sizes))
+    _, first = np.unique(bucket_ids[hits], return_index=True)
+    return hits[first]
+
+
+def _clean(x, y):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    return x, y
+
+
+def lttb(x, y, max_points=DEFAULT_MAX_POINTS):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Args:
+        x: Sample positions (e.g. SimulationTime), sorted ascending
+        y: Sample values
+        max_points: Number of points to keep (at least 3)
+
+    Returns:
+        Tuple (x, y) of downsampled arrays
+    """
+    x, y = _clean(x, y)
+    n = x.size
+    if max_points is None or n <= max_points or max_points < 3:
+        return x, y
+
+    n_buckets = max_points - 2
+    edges = _bucket_edges(n, n_buckets)
+    starts = edges[:-1]
+    sizes = np.diff(edges)
+    keep = sizes > 0
+    starts, sizes = starts[keep], sizes[keep]
+
+    # Bucket averages, with the first/last samples acting as the outer neighbours
+    avg_x = np.add.reduceat(x[1:n - 1], starts - 1) / sizes
+    avg_y = np.add.reduceat(y[1:n - 1], starts - 1) / sizes
+    prev_x = np.concatenate([[x[0]], avg_x[:-1]])
+    prev_y = np.concatenate([[y[0]], avg_y[:-1]])
+    next_x = np.concatenate([avg_x[1:], [x[-1]]])
+    next_y = np.concatenate([avg_y[1:], [y[-1]]])
+
+    # Twice the triangle area (prev bucket, candidate, next bucket) for every sample
+    bucket_ids = np.repeat(np.arange(starts.size), sizes)
+    px, py = prev_x[bucket_ids], prev_y[bucket_ids]
+    nx, ny = next_x[bucket_ids], next_y[bucket_ids]
+    cx, cy = x[1:n - 1], y[1:n - 1]
+    area = np.abs((px - nx) * (cy - py) - (px - cx) * (ny - py))
+
+    picked = _segment_argmax(area, starts - 1, sizes) + 1
+    index = np.concatenate([[0], picked, [n - 1]])
+    return x[index], y[index]
+
+
+def minmax(x, y, max_points=DEFAULT_MAX_POINTS):
+    """
+    Min/max-per-bucket downsampling
+
+    Args:
+        x: Sample positions (e.g. SimulationTime), sorted ascending
+        y: Sample values
+        max_points: Approximate number of points to keep (two per bucket)
+
+    Returns:
+        Tuple (x, y) of downsampled arrays, in the original order
+    """
+    x, y = _clean(x, y)
+    n = x.size
+    if max_points is None or n <= max_points or max_points < 4:
+        return x, y
+
+    n_buckets = (max_points - 2) // 2
+    edges = _bucket_edges(n, n_buckets)
+    starts = edges[:-1]
+    sizes = np.diff(edges)
+    keep = sizes > 0
+    starts, sizes = starts[keep], sizes[keep]
+
+    inner = y[1:n - 1]
+    highest = _segment_argmax(inner, starts - 1, sizes)
+    lowest = _segment_argmax(-inner, starts - 1, sizes)
+
+    index = np.unique(np.concatenate([[0], highest + 1, lowest + 1, [n - 1]]))
+    return x[index], y[index]
+
+
+METHODS = {
+    'lttb': lttb,
+    'minmax': minmax,
+}
+
+
+def downsample(x, y, max_points=DEFAULT_MAX_POINTS, method='minmax'):
+    """
+    Downsample a time series with the named method
+
+    Args:
+        x: Sample positions
+        y: Sample values
+        max_points: Point budget (None disables downsampling)
+        method: 'minmax' or 'lttb'
+
+    Returns:
+        Tuple (x, y) of downsampled arrays
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {sorted(METHODS)}")
+    return METHODS[method](x, y, max_points)
@@ -0,0 +1,217 @@
+"""
+Content-addressed cache of rendered figures
+
+A figure is identified by a fingerprint: a hash of the data it is drawn from,
+its styling and render parameters, its builder's source and the plotting
+library versions. Rendered files are stored under that fingerprint, so a
+figure whose inputs did not change is restored (or left alone) instead of
+being re-rendered, and switching back to earlier data restores its figures
+as well.
+
+The index is a JSON file next to the stored files. Entries not used for
+max_age_days are evicted, and the least recently used entries go first when
+the store grows beyond max_bytes. Evicting only removes cached copies, never
+the figures in the output directory.
+"""
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Bump to invalidate every cached figure (e.g. when fingerprinting changes)
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_BYTES = 512 * 2**20
+DEFAULT_MAX_AGE_DAYS = 30
+
+FINGERPRINTED_LIBRARIES = ('matplotlib', 'seaborn', 'numpy', 'pandas')
+
+
+def library_versions(libraries=FINGERPRINTED_LIBRARIES):
+    """Installed version of every library (read from metadata, nothing is imported)"""
+    from importlib import metadata
+    versions = {}
+    for library in libraries:
+        try:
+            versions[library] = metadata.version(library)
+        except metadata.PackageNotFoundError:
+            versions[library] = None
+    return versions
+
+
+def _update_hash(digest, value):
+    """Feed a frame, array, object with a .table frame or plain value into a hash"""
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr((list(value.columns), [str(t) for t in value.dtypes], value.shape)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        _update_hash(digest, value.to_frame())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(getattr(value, 'table', None), pd.DataFrame):
+        _update_hash(digest, value.table)
+    else:
+        digest.update(repr(value).encode())
+
+
+def fingerprint(inputs, params):
+    """
+    Hash of a figure's input data and render parameters
+
+    Args:
+        inputs: Dict of the data the figure is drawn from (frames, arrays, ...)
+        params: Dict of everything else the output depends on (repr-able values)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256(f'figure-cache-{CACHE_FORMAT_VERSION}'.encode())
+    for key in sorted(inputs):
+        digest.update(key.encode())
+        _update_hash(digest, inputs[key])
+    digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()
+
+
+def _output_key(path):
+    return str(Path(path).resolve())
+
+
+def _file_state(path):
+    stat = Path(path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class FigureCache:
+    def __init__(self, cache_directory, max_bytes=DEFAULT_MAX_BYTES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        """
+        Store of rendered figure files keyed by fingerprint
+
+        Args:
+            cache_directory: Where cached files and the index are kept
+            max_bytes: Size budget of the stored files (least recently used go first)
+            max_age_days: Entries unused for longer are evicted
+        """
+        self.cache_dir = Path(cache_directory)
+        self.index_path = self.cache_dir / 'index.json'
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = []
+        self.misses = []
+        self._index = None
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self.index_path) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def save(self):
+        """Write the index (atomically)"""
+        index = self._load_index()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        tmp_path.replace(self.index_path)
+
+    def _stored_path(self, key, output_path):
+        return self.cache_dir / f'{key}{Path(output_path).suffix}'
+
+    def restore(self, key, name, paths):
+        """
+        Make the outputs of a cached figure available at the given paths
+
+        Outputs that still match what was written for this fingerprint are
+        left untouched; others are copied back from the store.
+
+        Args:
+            key: Fingerprint of the figure
+            name: Figure name (for hit/miss bookkeeping)
+            paths: Output paths the figure is expected at
+
+        Returns:
+            True on a cache hit, False if the figure has to be rendered
+        """
+        entry = self._load_index().get(key)
+        if entry is None or sorted(entry['outputs']) != sorted(_output_key(p) for p in paths):
+            self.misses.append(name)
+            return False
+
+        for path in map(Path, paths):
+            stored = self._stored_path(key, path)
+            if not stored.exists():
+                self.misses.append(name)
+                return False
+            try:
+                if _file_state(path) == entry['outputs'][_output_key(path)]:
+                    continue
+            except FileNotFoundError:
+                pass
+            path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(stored, path)
+            entry['outputs'][_output_key(path)] = _file_state(path)
+
+        entry['last_used'] = time.time()
+        self.hits.append(name)
+        return True
+
+    def store(self, key, paths):
+        """
+        Add freshly rendered output files under their fingerprint
+
+        Args:
+            key: Fingerprint of the figure
+            paths: Written output paths
+        """
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            outputs = {}
+            size = 0
+            for path in map(Path, paths):
+                shutil.copy2(path, self._stored_path(key, path))
+                state = outputs[_output_key(path)] = _file_state(path)
+                size += state[0]
+        except OSError as e:
+            # A full or read-only disk should not break rendering
+            print(f"⚠️ Could not cache figure files: {e}")
+            return
+        self._load_index()[key] = {'outputs': outputs, 'bytes': size, 'last_used': time.time()}
+
+    def evict(self):
+        """
+        Drop expired entries, then least recently used ones until under max_bytes
+
+        Returns:
+            Number of evicted entries
+        """
+        index = self._load_index()
+        cutoff = time.time() - self.max_age_days * 86400
+        by_age = sorted(index.items(), key=lambda item: item[1]['last_used'])
+        total = sum(entry['bytes'] for entry in index.values())
+
+        evicted = 0
+        for key, entry in by_age:
+            if entry['last_used'] >= cutoff and total <= self.max_bytes:
+                break
+            for output in entry['outputs']:
+                self._stored_path(key, output).unlink(missing_ok=True)
+            total -= entry['bytes']
+            del index[key]
+            evicted += 1
+        return evicted
+
+    def clear(self):
+        """Remove every cached file and the index"""
+        if self.cache_dir.exists():
+            shutil.rmtree(self.cache_dir)
+        self._index = {}
@@ -0,0 +1,287 @@
+"""
+Vectorized queue simulator of a four-way signalized intersection
+
+A fast stand-in for a Unity run when screening fixed timing plans. Each
+scenario (one timing plan x one random seed) is a row of NumPy arrays holding
+the queue of every approach leg; the model advances all scenarios together in
+one-second steps, so thousands of plans and seeds are simulated at once and
+no per-vehicle objects exist.
+
+Per step and leg:
+- arrivals are Poisson with the leg's arrival rate (calibrated from the logs)
+- while the leg's phase is green (after the start-up lost time) vehicles
+  discharge at the saturation flow rate; yellow serves nobody
+- the signal state only depends on the plan, so it is computed once per plan
+  and broadcast over that plan's seeds
+- the signal cycles through the phases with the plan's green times plus the
+  yellow time of DefaultSignalSettings
+
+Every log interval the same columns the static controller writes are sampled:
+VehiclesWaiting and QueueLength (vehicles queued over all legs, like
+IntersectionDataCalculator.TotalNumberOfVehiclesWaitingInIntersection) and
+Throughput (vehicles served per second since the start).
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+NUM_OF_LEGS = 4
+
+# DefaultSignalSettings.asset
+YELLOW_TIME = 3.0
+MIN_GREEN_TIME = 10.0
+MAX_GREEN_TIME = 60.0
+
+SATURATION_FLOW = 0.5  # vehicles per second per leg (1800 veh/h)
+LOST_TIME = 2.0        # seconds of each green before the queue starts moving
+LOG_INTERVAL = 10.0    # seconds, same as the Unity interval loggers
+
+# Upper bound on the (steps x scenarios x legs) arrivals drawn at once
+BLOCK_ELEMENTS = 4_000_000
+
+
+def default_phase_legs(n_phases, n_legs=NUM_OF_LEGS):
+    """
+    Legs served by each phase when the phase layout is not given
+
+    Leg l is served by phase l % n_phases, e.g. two phases serve opposing
+    legs together and four phases serve one leg each.
+
+    Returns:
+        Boolean array of shape (n_phases, n_legs)
+    """
+    legs = np.arange(n_legs)
+    return legs[None, :] % n_phases == np.arange(n_phases)[:, None]
+
+
+def calibrate_arrival_rate(intervals):
+    """
+    Total arrival rate (vehicles per second) from a logged interval frame
+
+    TotalVehicles is cumulative, so the rate is its growth over the logged
+    simulation time, summed over every episode restart.
+
+    Args:
+        intervals: Interval frame with SimulationTime and TotalVehicles
+
+    Returns:
+        Arrival rate over all legs in vehicles per second
+    """
+    t = intervals['SimulationTime'].to_numpy(dtype=np.float64)
+    vehicles = intervals['TotalVehicles'].to_numpy(dtype=np.float64)
+    order = np.argsort(t, kind='stable')
+    t, vehicles = t[order], vehicles[order]
+    if t.size < 2 or t[-1] <= t[0]:
+        return 0.0
+    # Only count growth, so counter resets between runs do not subtract
+    growth = np.clip(np.diff(vehicles), 0, None).sum()
+    return growth / (t[-1] - t[0])
+
+
+def logged_plan(intervals, phase_column='CurrentPhase', green_column='PhaseGreenTime'):
+    """
+    Green time per phase of the plan the static controller ran
+
+    Args:
+        intervals: Static interval frame
+
+    Returns:
+        Array of green times ordered by phase index
+    """
+    phases = pd.to_numeric(intervals[phase_column].astype(str), errors='coerce')
+    greens = intervals[green_column].groupby(phases).median()
+    return greens.sort_index().to_numpy(dtype=np.float64)
+
+
+def plan_grid(green_options, n_phases, min_green=MIN_GREEN_TIME, max_green=MAX_GREEN_TIME):
+    """
+    Every combination of the given green times for each phase
+
+    Args:
+        green_options: Candidate green times in seconds
+        n_phases: Number of phases
+        min_green: Smallest allowed green time
+        max_green: Largest allowed green time
+
+    Returns:
+        Array of shape (n_plans, n_phases)
+    """
+    options = [g for g in sorted(set(green_options)) if min_green <= g <= max_green]
+    return np.array(list(itertools.product(options, repeat=n_phases)), dtype=np.float64).reshape(-1, n_phases)
+
+
+class IntersectionSimulator:
+    def __init__(self, arrival_rates, saturation_flow=SATURATION_FLOW, yellow_time=YELLOW_TIME,
+                 lost_time=LOST_TIME, phase_legs=None):
+        """
+        Queue model of one four-way intersection
+
+        Args:
+            arrival_rates: Arrival rate per leg (vehicles per second), or one
+                total rate split evenly over the legs
+            saturation_flow: Discharge rate of a green leg (vehicles per second)
+            yellow_time: Yellow between phases in seconds
+            lost_time: Start-up lost time at the beginning of each green
+            phase_legs: Boolean (n_phases, n_legs) array of the legs each phase
+                serves (default: default_phase_legs of the plan's phase count)
+        """
+        rates = np.atleast_1d(np.asarray(arrival_rates, dtype=np.float64))
+        self.arrival_rates = rates if rates.size > 1 else np.full(NUM_OF_LEGS, rates[0] / NUM_OF_LEGS)
+        self.saturation_flow = saturation_flow
+        self.yellow_time = yellow_time
+        self.lost_time = lost_time
+        self.phase_legs = None if phase_legs is None else np.asarray(phase_legs, dtype=bool)
+
+    def simulate(self, plans, n_seeds=10, duration=3600.0, seed=0, log_interval=LOG_INTERVAL, keep_intervals=False):
+        """
+        Simulate every plan with every seed at once
+
+        Args:
+            plans: Green times, shape (n_plans, n_phases)
+            n_seeds: Random replications per plan
+            duration: Simulated seconds
+            seed: Base random seed
+            log_interval: Seconds between logged samples
+            keep_intervals: Also return the per-interval samples of every scenario
+
+        Returns:
+            Tuple (summary, intervals): summary has one row per scenario (Plan,
+            Seed, green times, cycle length and the averaged metrics); intervals
+            is None unless keep_intervals is set, otherwise a long frame with
+            SimulationTime, Plan, Seed, VehiclesWaiting, QueueLength,
+            Throughput, CurrentPhase and PhaseGreenTime
+        """
+        plans = np.atleast_2d(np.asarray(plans, dtype=np.float64))
+        n_plans, n_phases = plans.shape
+        phase_legs = self.phase_legs if self.phase_legs is not None else default_phase_legs(n_phases, self.arrival_rates.size)
+        if phase_legs.shape != (n_phases, self.arrival_rates.size):
+            raise ValueError(f"phase_legs must have shape ({n_phases}, {self.arrival_rates.size})")
+
+        rng = np.random.default_rng(seed)
+        n_legs = self.arrival_rates.size
+        n_steps = int(duration)
+        log_every = max(int(round(log_interval)), 1)
+        n_logs = n_steps // log_every
+
+        # Queues are (plan, seed, leg) so the per-plan signal state broadcasts over seeds
+        queues = np.zeros((n_plans, n_seeds, n_legs), dtype=np.int64)
+        served_total = np.zeros((n_plans, n_seeds), dtype=np.int64)
+        arrived_total = np.zeros((n_plans, n_seeds), dtype=np.int64)
+        queue_seconds = np.zeros((n_plans, n_seeds))
+        max_waiting = np.zeros((n_plans, n_seeds), dtype=np.int64)
+        waiting_logged_sum = np.zeros((n_plans, n_seeds))
+        logged = {key: [] for key in ('SimulationTime', 'VehiclesWaiting', 'Throughput', 'CurrentPhase')}
+
+        block = max(1, min(n_steps, BLOCK_ELEMENTS // queues.size))
+        for block_start in range(0, n_steps, block):
+            steps = np.arange(block_start, min(block_start + block, n_steps))
+            phase, capacity = self._signal_schedule(plans, phase_legs, steps)
+            arrivals = rng.poisson(self.arrival_rates, (steps.size, n_plans, n_seeds, n_legs))
+
+            for i, step in enumerate(steps):
+                departures = np.minimum(queues, capacity[:, i, None, :])
+                queues += arrivals[i] - departures
+
+                waiting = queues.sum(axis=2)
+                served_total += departures.sum(axis=2)
+                queue_seconds += waiting
+                np.maximum(max_waiting, waiting, out=max_waiting)
+
+                if (step + 1) % log_every == 0:
+                    waiting_logged_sum += waiting
+                    if keep_intervals:
+                        logged['SimulationTime'].append(step + 1.0)
+                        logged['VehiclesWaiting'].append(waiting.ravel())
+                        logged['Throughput'].append(served_total.ravel() / (step + 1.0))
+                        logged['CurrentPhase'].append(np.repeat(phase[:, i], n_seeds))
+            arrived_total += arrivals.sum(axis=(0, 3))
+
+        greens = np.repeat(plans, n_seeds, axis=0)
+        scenario_index = np.arange(n_plans * n_seeds)
+        mean_waiting = waiting_logged_sum.ravel() / max(n_logs, 1)
+        arrived_total = arrived_total.ravel()
+        summary = pd.DataFrame({
+            'Plan': scenario_index // n_seeds,
+            'Seed': scenario_index % n_seeds,
+            **{f'Green_{p}': greens[:, p] for p in range(n_phases)},
+            'CycleLength': greens.sum(axis=1) + n_phases * self.yellow_time,
+            'VehiclesWaiting': mean_waiting,
+            'QueueLength': mean_waiting,
+            'MaxVehiclesWaiting': max_waiting.ravel(),
+            'Throughput': served_total.ravel() / max(n_steps, 1),
+            # Little's law: time-averaged queue / arrival rate
+            'AverageDelay': np.divide(queue_seconds.ravel(), arrived_total,
+                                      out=np.zeros(arrived_total.size), where=arrived_total > 0),
+        })
+
+        intervals = None
+        if keep_intervals and logged['SimulationTime']:
+            n_logged = len(logged['SimulationTime'])
+            waiting = np.stack(logged['VehiclesWaiting'], axis=1).ravel()
+            phases = np.stack(logged['CurrentPhase'], axis=1)
+            intervals = pd.DataFrame({
+                'SimulationTime': np.tile(logged['SimulationTime'], scenario_index.size),
+                'Plan': np.repeat(summary['Plan'].to_numpy(), n_logged),
+                'Seed': np.repeat(summary['Seed'].to_numpy(), n_logged),
+                'VehiclesWaiting': waiting,
+                'QueueLength': waiting,
+                'Throughput': np.stack(logged['Throughput'], axis=1).ravel(),
+                'CurrentPhase': phases.ravel(),
+                'PhaseGreenTime': np.take_along_axis(greens, phases, axis=1).ravel(),
+            })
+        return summary, intervals
+
+    def _signal_schedule(self, plans, phase_legs, steps):
+        """
+        Phase and per-leg discharge capacity of every plan at the given steps
+
+        Discharge is deterministic at the saturation flow: after the lost time,
+        a green leg may release floor(s * (g + 1)) - floor(s * g) vehicles in
+        its g-th moving second.
+
+        Returns:
+            Tuple (phase, capacity) with shapes (n_plans, n_steps) and
+            (n_plans, n_steps, n_legs)
+        """
+        n_plans, n_phases = plans.shape
+        # Segment ends within the cycle: green 0, yellow 0, green 1, yellow 1, ...
+        segments = np.stack([plans, np.full_like(plans, self.yellow_time)], axis=2).reshape(n_plans, -1)
+        segment_ends = np.cumsum(segments, axis=1)
+        cycle = segment_ends[:, -1:]
+
+        position = np.mod(steps[None, :].astype(np.float64), cycle)
+        segment = (position[:, :, None] >= segment_ends[:, None, :]).sum(axis=2)
+        segment = np.minimum(segment, segments.shape[1] - 1)
+        segment_start = np.take_along_axis(segment_ends - segments, segment, axis=1)
+        phase = segment // 2
+
+        moving_seconds = np.floor(position - segment_start - self.lost_time)
+        moving = (segment % 2 == 0) & (moving_seconds >= 0)
+        discharge = (np.floor(self.saturation_flow * (moving_seconds + 1))
+                     - np.floor(self.saturation_flow * moving_seconds)).astype(np.int64)
+        capacity = np.where(moving, discharge, 0)[:, :, None] * phase_legs[phase]
+        return phase, capacity
+
+
+def rank_plans(summary, metric='VehiclesWaiting'):
+    """
+    Average every plan over its seeds and rank the plans
+
+    Args:
+        summary: Scenario summary from IntersectionSimulator.simulate
+        metric: Column to rank by (lower is better, except Throughput)
+
+    Returns:
+        DataFrame with one row per plan: green times, cycle length and the
+        mean and standard deviation over seeds of every metric, best first
+    """
+    green_columns = [c for c in summary.columns if c.startswith('Green_')]
+    metrics = ['VehiclesWaiting', 'QueueLength', 'MaxVehiclesWaiting', 'Throughput', 'AverageDelay']
+    grouped = summary.groupby('Plan')
+    ranked = grouped[green_columns + ['CycleLength']].first()
+    means = grouped[metrics].mean()
+    stds = grouped[metrics].std(ddof=1).add_suffix('_Std')
+    ranked = pd.concat([ranked, means, stds], axis=1).reset_index()
+    return ranked.sort_values(metric, ascending=metric != 'Throughput', kind='stable').reset_index(drop=True)
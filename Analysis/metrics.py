@@ -0,0 +1,93 @@
+"""
+Shared per-controller episode statistics
+
+Every report and figure reads its episode means, standard deviations and
+column-availability checks from one EpisodeMetrics table instead of scanning
+the episode frames again. The table is computed in a single groupby/agg pass
+over both controllers, so all outputs report exactly the same numbers.
+TrafficSignalComparison.episode_metrics() memoizes it until the data is
+reloaded.
+"""
+import numpy as np
+import pandas as pd
+
+from comparison_stats import summary_table
+
+
+CONTROLLERS = ('ml', 'static')
+STATISTICS = ['count', 'mean', 'std', 'median', 'min', 'max']
+
+# Identifier columns that are never summarised
+EXCLUDED_COLUMNS = {'Episode', 'Step'}
+
+
+def _metric_columns(df):
+    return [c for c in df.columns
+            if c not in EXCLUDED_COLUMNS and pd.api.types.is_numeric_dtype(df[c].dtype)]
+
+
+def episode_statistics(ml_episodes, static_episodes):
+    """
+    Every statistic of every numeric episode metric for both controllers
+
+    Args:
+        ml_episodes: ML agent episode frame
+        static_episodes: Static controller episode frame
+
+    Returns:
+        DataFrame indexed by (Controller, Metric) with the STATISTICS columns.
+        Metrics a controller does not log have no row for it; NaNs are skipped
+        like in Series.mean().
+    """
+    long = pd.concat(
+        [df[_metric_columns(df)].melt(var_name='Metric', value_name='Value').assign(Controller=controller)
+         for controller, df in zip(CONTROLLERS, (ml_episodes, static_episodes))],
+        ignore_index=True)
+    long['Value'] = long['Value'].astype(np.float64)
+    return long.groupby(['Controller', 'Metric'], sort=False)['Value'].agg(STATISTICS)
+
+
+class EpisodeMetrics:
+    def __init__(self, ml_episodes, static_episodes):
+        """
+        Episode statistics of both controllers, computed once
+
+        Args:
+            ml_episodes: ML agent episode frame
+            static_episodes: Static controller episode frame
+        """
+        self.table = episode_statistics(ml_episodes, static_episodes)
+
+    def available(self, metric):
+        """Whether both controllers log the metric"""
+        return all((controller, metric) in self.table.index for controller in CONTROLLERS)
+
+    def get(self, controller, metric, statistic='mean', default=np.nan):
+        """One statistic of one metric ('ml' or 'static' controller)"""
+        if (controller, metric) not in self.table.index:
+            return default
+        return self.table.at[(controller, metric), statistic]
+
+    def means(self, metric, default=np.nan):
+        """Tuple (ML mean, static mean) of a metric"""
+        return tuple(self.get(controller, metric, 'mean', default) for controller in CONTROLLERS)
+
+    def stats(self, controller, metric):
+        """Dict of every statistic of one metric for one controller"""
+        return self.table.loc[(controller, metric)].to_dict()
+
+    def comparison_table(self, metrics):
+        """
+        Summary table of the metrics both controllers log
+
+        Args:
+            metrics: Metrics to include, in order
+
+        Returns:
+            DataFrame with Metric, ML_Mean, Static_Mean, ML_Std, Static_Std, Improvement_%
+            (see comparison_stats.summary_table)
+        """
+        ml_stats, static_stats = (
+            {metric: self.stats(controller, metric) for metric in metrics if (controller, metric) in self.table.index}
+            for controller in CONTROLLERS)
+        return summary_table(ml_stats, static_stats, metrics)
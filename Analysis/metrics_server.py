@@ -0,0 +1,293 @@
+"""
+Live KPI endpoint for wall dashboards
+
+A small asyncio HTTP server that publishes the current ML vs static
+aggregates while the simulation is writing its logs:
+
+    GET /metrics        Prometheus text exposition format
+    GET /metrics.json   the same numbers as JSON
+    GET /health         "ok"
+
+A background task stats the followed CSVs every poll interval. Only when one of
+them changed does it ingest the appended rows (see tail.py) in a worker thread
+and rebuild both response bodies. Requests are answered from that in-memory
+snapshot, so any number of polling clients never trigger a read of the logs.
+
+    python metrics_server.py --data-dir ./ --port 9108
+"""
+import asyncio
+import json
+import math
+import time
+from pathlib import Path
+
+from comparison_stats import SUMMARY_METRICS, summary_table
+from streaming import INTERVAL_METRICS, RunningStats
+from tail import CsvTail
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 9108
+DEFAULT_POLL_SECONDS = 5.0
+
+# Log table -> (ML agent CSV, static controller CSV) and the metrics aggregated from it
+FOLLOWED_LOGS = {
+    'episodes': (('episode_results.csv', 'static_episode_results.csv'), SUMMARY_METRICS),
+    'intervals': (('interval_data.csv', 'static_interval_data.csv'), INTERVAL_METRICS),
+}
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+MAX_REQUEST_HEADER_BYTES = 8192
+
+
+class KpiAggregator:
+    def __init__(self, data_directory="./"):
+        """
+        Running per-controller statistics of the followed logs
+
+        Args:
+            data_directory: Directory the Unity loggers write to
+        """
+        self.data_dir = Path(data_directory)
+        self.tails = {}
+        self.stats = {}
+        self.rows = {}
+        for table, (filenames, metrics) in FOLLOWED_LOGS.items():
+            for approach, filename in zip(('ml', 'static'), filenames):
+                self.tails[(approach, table)] = CsvTail(self.data_dir / filename)
+                self.stats[(approach, table)] = {m: RunningStats() for m in metrics}
+                self.rows[(approach, table)] = 0
+
+    def signature(self):
+        """Size and modification time of every followed file (cheap change check)"""
+        signature = []
+        for tail in self.tails.values():
+            try:
+                stat = tail.path.stat()
+                signature.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def poll(self):
+        """
+        Ingest the rows appended since the last poll
+
+        Returns:
+            Number of new rows
+        """
+        new_rows = 0
+        for key, tail in self.tails.items():
+            rows, rebaselined = tail.poll()
+            if rebaselined:
+                self.stats[key] = {m: RunningStats() for m in self.stats[key]}
+                self.rows[key] = 0
+            if rows is None or rows.empty:
+                continue
+            new_rows += len(rows)
+            self.rows[key] += len(rows)
+            for metric, stats in self.stats[key].items():
+                if metric in rows.columns:
+                    stats.update(rows[metric].to_numpy())
+        return new_rows
+
+    def tables(self):
+        """Summary table (see comparison_stats.summary_table) per followed log table"""
+        tables = {}
+        for table, (_, metrics) in FOLLOWED_LOGS.items():
+            ml_stats, static_stats = (
+                {m: s.as_dict() for m, s in self.stats[(approach, table)].items() if s.count}
+                for approach in ('ml', 'static'))
+            tables[table] = summary_table(ml_stats, static_stats, metrics)
+        return tables
+
+
+def _finite(value):
+    """JSON has no NaN/inf; report missing values as null"""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _prometheus_value(value):
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+def snapshot_json(aggregator, generated_at, recompute_seconds):
+    """JSON body of /metrics.json"""
+    body = {
+        'generated_at': generated_at,
+        'recompute_seconds': recompute_seconds,
+        'rows': {f'{approach}_{table}': n for (approach, table), n in aggregator.rows.items()},
+    }
+    for table, summary in aggregator.tables().items():
+        body[table] = [{key: value if key == 'Metric' else _finite(value) for key, value in row.items()}
+                       for row in summary.to_dict('records')]
+    return json.dumps(body, indent=2).encode('utf-8')
+
+
+def snapshot_prometheus(aggregator, generated_at, recompute_seconds):
+    """Prometheus text body of /metrics"""
+    families = {
+        'traffic_metric_mean': ('gauge', 'Mean of a logged metric per controller'),
+        'traffic_metric_std': ('gauge', 'Sample standard deviation of a logged metric per controller'),
+        'traffic_improvement_percent': ('gauge', 'Improvement of the ML agent over the static controller'),
+        'traffic_rows_ingested': ('gauge', 'Rows read from each followed log'),
+        'traffic_snapshot_timestamp_seconds': ('gauge', 'Unix time the snapshot was computed'),
+        'traffic_snapshot_recompute_seconds': ('gauge', 'Seconds the last recompute took'),
+    }
+    samples = {name: [] for name in families}
+    for table, summary in aggregator.tables().items():
+        for row in summary.to_dict('records'):
+            for approach, prefix in (('ml', 'ML'), ('static', 'Static')):
+                labels = f'source="{table}",metric="{row["Metric"]}",controller="{approach}"'
+                samples['traffic_metric_mean'].append((labels, row[f'{prefix}_Mean']))
+                samples['traffic_metric_std'].append((labels, row[f'{prefix}_Std']))
+            samples['traffic_improvement_percent'].append(
+                (f'source="{table}",metric="{row["Metric"]}"', row['Improvement_%']))
+    for (approach, table), n in aggregator.rows.items():
+        samples['traffic_rows_ingested'].append((f'source="{table}",controller="{approach}"', n))
+    samples['traffic_snapshot_timestamp_seconds'].append(('', generated_at))
+    samples['traffic_snapshot_recompute_seconds'].append(('', recompute_seconds))
+
+    lines = []
+    for name, (metric_type, description) in families.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels, value in samples[name]:
+            lines.append(f'{name}{{{labels}}} {_prometheus_value(value)}' if labels
+                         else f'{name} {_prometheus_value(value)}')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class MetricsServer:
+    def __init__(self, data_directory="./", host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 poll_seconds=DEFAULT_POLL_SECONDS):
+        """
+        Serve live KPIs of a log directory over HTTP
+
+        Args:
+            data_directory: Directory the Unity loggers write to
+            host: Interface to listen on
+            port: TCP port (0 picks a free one)
+            poll_seconds: Seconds between checks of the logs for changes
+        """
+        self.aggregator = KpiAggregator(data_directory)
+        self.host = host
+        self.port = port
+        self.poll_seconds = poll_seconds
+        self.snapshot = {}
+        self.recomputes = 0
+        self.requests = 0
+        self._signature = None
+        self._server = None
+
+    def recompute(self):
+        """Ingest new rows and build fresh response bodies (runs in a worker thread)"""
+        started = time.perf_counter()
+        self.aggregator.poll()
+        generated_at = time.time()
+        elapsed = time.perf_counter() - started
+        return {
+            '/metrics': (PROMETHEUS_CONTENT_TYPE, snapshot_prometheus(self.aggregator, generated_at, elapsed)),
+            '/metrics.json': ('application/json', snapshot_json(self.aggregator, generated_at, elapsed)),
+        }
+
+    async def refresh(self):
+        """Recompute the snapshot if any followed log changed since the last check"""
+        signature = self.aggregator.signature()
+        if signature == self._signature and self.snapshot:
+            return False
+        self._signature = signature
+        loop = asyncio.get_running_loop()
+        # Swapping the whole dict keeps every response consistent with one recompute
+        self.snapshot = await loop.run_in_executor(None, self.recompute)
+        self.recomputes += 1
+        return True
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:  # Keep serving the last good snapshot
+                print(f"⚠️ Could not refresh KPIs: {e}")
+
+    async def _handle(self, reader, writer):
+        try:
+            header = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=10)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return
+
+        request_line = header.split(b'\r\n', 1)[0].decode('latin-1').split()
+        method, target = (request_line + ['', ''])[:2]
+        path = target.split('?', 1)[0]
+        self.requests += 1
+
+        if method not in ('GET', 'HEAD'):
+            status, content_type, body = '405 Method Not Allowed', 'text/plain', b'method not allowed\n'
+        elif path == '/health':
+            status, content_type, body = '200 OK', 'text/plain', b'ok\n'
+        elif path in self.snapshot:
+            status = '200 OK'
+            content_type, body = self.snapshot[path]
+        else:
+            status, content_type, body = '404 Not Found', 'text/plain', b'not found\n'
+
+        head = (f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+                f'Content-Length: {len(body)}\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n')
+        try:
+            writer.write(head.encode('latin-1') + (body if method == 'GET' else b''))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        """Compute the first snapshot and start listening; returns the bound port"""
+        await self.refresh()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  limit=MAX_REQUEST_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        """Serve until cancelled, refreshing the snapshot in the background"""
+        if self._server is None:
+            await self.start()
+        print(f"📡 Serving KPIs of {self.aggregator.data_dir} on http://{self.host}:{self.port}/metrics "
+              f"(refresh every {self.poll_seconds}s, Ctrl+C to stop)")
+        refresher = asyncio.create_task(self._refresh_loop())
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            refresher.cancel()
+
+
+def serve(data_directory="./", host=DEFAULT_HOST, port=DEFAULT_PORT, poll_seconds=DEFAULT_POLL_SECONDS):
+    """Run the KPI server until interrupted (Ctrl+C)"""
+    try:
+        asyncio.run(MetricsServer(data_directory, host, port, poll_seconds).serve_forever())
+    except KeyboardInterrupt:
+        print("\n⏹️ KPI server stopped")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve live ML vs static KPIs as JSON and Prometheus metrics")
+    parser.add_argument('--data-dir', default='./', help="Directory containing the CSV files")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to listen on (0.0.0.0 for all)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port")
+    parser.add_argument('--poll-seconds', type=float, default=DEFAULT_POLL_SECONDS,
+                        help="Seconds between checks of the logs for changes")
+    args = parser.parse_args()
+
+    serve(args.data_dir, args.host, args.port, args.poll_seconds)
@@ -0,0 +1,220 @@
+"""
+Phase-level signal analytics
+
+Breaks the interval logs down by signal phase so the ML agent's chosen green
+times can be compared with the static plan phase by phase. Everything is
+vectorized and linear in the number of rows:
+
+- the interval stream is run-length encoded into phase runs (consecutive
+  samples with the same CurrentPhase); a new run also starts at every Episode
+  change and wherever the log restarts (SimulationTime or TotalVehicles going
+  backwards)
+- each sample's departures and elapsed time since the previous sample are
+  attributed to its run with np.add.reduceat
+- rolling throughput/wait windows are differences of cumulative sums, with the
+  window start found by np.searchsorted
+
+Departures are VehiclesDeparted where logged (static controller), otherwise
+TotalVehicles - VehiclesWaiting, which is what VehiclesDeparted holds.
+"""
+import numpy as np
+import pandas as pd
+
+from comparison_stats import improvement_percent
+from intersection_sim import SATURATION_FLOW
+
+
+# Green time column per controller log
+GREEN_COLUMNS = ('GreenLightTime', 'PhaseGreenTime')
+
+DEFAULT_WINDOW_SECONDS = 60.0
+
+
+def _column(intervals, name):
+    return intervals[name].to_numpy(dtype=np.float64)
+
+
+def _phase_numbers(phases):
+    """CurrentPhase as floats; categorical labels are converted once per category"""
+    if isinstance(phases.dtype, pd.CategoricalDtype):
+        labels = pd.to_numeric(phases.cat.categories.astype(str), errors='coerce').to_numpy(dtype=np.float64)
+        codes = phases.cat.codes.to_numpy()
+        return np.where(codes >= 0, labels[codes], np.nan)
+    return pd.to_numeric(phases, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _prepared(intervals):
+    """Arrays of the columns the analytics need, in logging order, and the log restarts"""
+    t = _column(intervals, 'SimulationTime')
+    phase = _phase_numbers(intervals['CurrentPhase'])
+    waiting = _column(intervals, 'VehiclesWaiting')
+    if 'VehiclesDeparted' in intervals.columns:
+        departed = _column(intervals, 'VehiclesDeparted')
+    else:
+        departed = _column(intervals, 'TotalVehicles') - waiting
+    green_column = next((c for c in GREEN_COLUMNS if c in intervals.columns), None)
+    green = _column(intervals, green_column) if green_column else np.full(t.size, np.nan)
+    episode = intervals['Episode'].to_numpy() if 'Episode' in intervals.columns else np.zeros(t.size, int)
+
+    # Log restarts: the clock and the counters start again from zero
+    restart = np.zeros(t.size, dtype=bool)
+    if t.size:
+        restart[0] = True
+        restart[1:] = (np.diff(t) < 0) | (np.diff(_column(intervals, 'TotalVehicles')) < 0)
+    return t, phase, waiting, departed, green, episode, restart
+
+
+def _increments(values, restart):
+    """Change since the previous sample, zero at log restarts and never negative"""
+    increments = np.diff(values, prepend=values[:1])
+    increments[restart] = 0
+    return np.clip(increments, 0, None)
+
+
+def phase_runs(intervals, saturation_flow=SATURATION_FLOW):
+    """
+    Run-length encode an interval log into phase runs
+
+    Args:
+        intervals: Interval frame with SimulationTime, CurrentPhase,
+            TotalVehicles, VehiclesWaiting and a green time column
+        saturation_flow: Discharge rate (vehicles per second) a fully used
+            green would reach; the queue simulator's assumption by default
+
+    Returns:
+        DataFrame with one row per run (runs never span episodes): Episode, Phase,
+        Start, Duration (sampled seconds), Samples, GreenTime, Departures,
+        DeparturesPerGreenSecond, Utilisation, MeanWaiting and MaxWaiting.
+        Runs without a logged green time (0 or missing) have NaN per-green values.
+    """
+    t, phase, waiting, departed, green, episode, restart = _prepared(intervals)
+    columns = ['Episode', 'Phase', 'Start', 'Duration', 'Samples', 'GreenTime', 'Departures',
+               'DeparturesPerGreenSecond', 'Utilisation', 'MeanWaiting', 'MaxWaiting']
+    if t.size == 0:
+        return pd.DataFrame(columns=columns)
+
+    boundary = restart.copy()
+    boundary[1:] |= (phase[1:] != phase[:-1]) | (episode[1:] != episode[:-1])
+    starts = np.flatnonzero(boundary)
+    samples = np.diff(np.append(starts, t.size))
+
+    elapsed = np.diff(t, prepend=t[:1])
+    elapsed[restart] = 0
+    departures = np.add.reduceat(_increments(departed, restart), starts)
+    green_time = np.where(green[starts] > 0, green[starts], np.nan)
+    per_green_second = departures / green_time
+
+    return pd.DataFrame({
+        'Episode': episode[starts],
+        'Phase': pd.array(phase[starts]).astype('Int64'),
+        'Start': t[starts],
+        'Duration': np.add.reduceat(elapsed, starts),
+        'Samples': samples,
+        'GreenTime': green_time,
+        'Departures': departures,
+        'DeparturesPerGreenSecond': per_green_second,
+        'Utilisation': per_green_second / saturation_flow,
+        'MeanWaiting': np.add.reduceat(waiting, starts) / samples,
+        'MaxWaiting': np.maximum.reduceat(waiting, starts),
+    }, columns=columns)
+
+
+def phase_summary(runs, by=('Phase',), saturation_flow=SATURATION_FLOW):
+    """
+    Aggregate phase runs per phase (or per episode and phase)
+
+    Rates are ratios of sums (total departures / total green time), so long
+    and short runs are weighted by their length.
+
+    Args:
+        runs: Output of phase_runs
+        by: Grouping columns, e.g. ('Episode', 'Phase')
+        saturation_flow: Same as for phase_runs
+
+    Returns:
+        DataFrame with Runs, GreenTime (mean), Duration (mean), Departures,
+        DeparturesPerGreenSecond, Utilisation and MeanWaiting per group
+    """
+    by = list(by)
+    rated = runs['GreenTime'].notna()
+    work = runs.assign(
+        RatedGreen=runs['GreenTime'].where(rated, 0.0),
+        RatedDepartures=runs['Departures'].where(rated, 0.0),
+        WaitingSum=runs['MeanWaiting'] * runs['Samples'],
+    )
+    grouped = work.groupby(by, sort=True).agg(
+        Runs=('Phase', 'size'),
+        GreenTime=('GreenTime', 'mean'),
+        Duration=('Duration', 'mean'),
+        Departures=('Departures', 'sum'),
+        RatedGreen=('RatedGreen', 'sum'),
+        RatedDepartures=('RatedDepartures', 'sum'),
+        WaitingSum=('WaitingSum', 'sum'),
+        Samples=('Samples', 'sum'),
+    )
+    rated_green = grouped['RatedGreen'].where(grouped['RatedGreen'] > 0)
+    grouped['DeparturesPerGreenSecond'] = grouped['RatedDepartures'] / rated_green
+    grouped['Utilisation'] = grouped['DeparturesPerGreenSecond'] / saturation_flow
+    grouped['MeanWaiting'] = grouped['WaitingSum'] / grouped['Samples']
+    return grouped.drop(columns=['RatedGreen', 'RatedDepartures', 'WaitingSum']).reset_index()
+
+
+def rolling_kpis(intervals, window_seconds=DEFAULT_WINDOW_SECONDS):
+    """
+    Rolling throughput and waiting over a trailing simulation-time window
+
+    Args:
+        intervals: Interval frame (see phase_runs)
+        window_seconds: Window length; windows never reach back past a log
+            restart. Episodes do not restart the simulation clock, so windows
+            run across episode boundaries.
+
+    Returns:
+        DataFrame with SimulationTime, Episode, Phase, RollingThroughput
+        (departures per second in the window) and RollingWaiting (mean
+        VehiclesWaiting of the samples in the window)
+    """
+    t, phase, waiting, departed, _, episode, restart = _prepared(intervals)
+    if t.size == 0:
+        return pd.DataFrame(columns=['SimulationTime', 'Episode', 'Phase', 'RollingThroughput', 'RollingWaiting'])
+
+    index = np.arange(t.size)
+    segment_start = np.maximum.accumulate(np.where(restart, index, 0))
+    # Shift every log segment past the previous one so the clock is monotonic for searchsorted
+    jumps = np.zeros(t.size)
+    jumps[1:] = np.where(restart[1:], t[:-1] - t[1:] + window_seconds, 0.0)
+    clock = t + np.cumsum(jumps)
+    # First sample inside (t - window, t], but never before the current log segment
+    first = np.maximum(np.searchsorted(clock, clock - window_seconds, side='right'), segment_start)
+
+    departures = np.concatenate([[0.0], np.cumsum(_increments(departed, restart))])
+    waiting_sum = np.concatenate([[0.0], np.cumsum(waiting)])
+    # Departures of the first sample in the window happened before it, so they are excluded
+    departed_in_window = departures[index + 1] - departures[first + 1]
+    covered = t - t[first]
+
+    return pd.DataFrame({
+        'SimulationTime': t,
+        'Episode': episode,
+        'Phase': pd.array(phase).astype('Int64'),
+        'RollingThroughput': np.divide(departed_in_window, covered,
+                                       out=np.full(t.size, np.nan), where=covered > 0),
+        'RollingWaiting': (waiting_sum[index + 1] - waiting_sum[first]) / (index + 1 - first),
+    })
+
+
+def compare_phases(ml_runs, static_runs):
+    """
+    Side-by-side per-phase comparison of both controllers
+
+    Returns:
+        DataFrame per Phase with ML_ and Static_ green time, departures per
+        green second, utilisation and mean waiting, plus Waiting_Improvement_%
+    """
+    columns = ['GreenTime', 'DeparturesPerGreenSecond', 'Utilisation', 'MeanWaiting']
+    ml = phase_summary(ml_runs).set_index('Phase')[columns].add_prefix('ML_')
+    static = phase_summary(static_runs).set_index('Phase')[columns].add_prefix('Static_')
+    comparison = ml.join(static, how='outer')
+    comparison['Waiting_Improvement_%'] = improvement_percent(
+        'VehiclesWaiting', comparison['ML_MeanWaiting'], comparison['Static_MeanWaiting'])
+    return comparison.reset_index()
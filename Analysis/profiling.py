@@ -0,0 +1,264 @@
+"""
+Hierarchical stage timers for the analysis pipeline
+
+Modelled on ML-Agents' mlagents_envs.timers: stages are timed with the
+hierarchical_timer context manager or the @timed decorator, nest according to
+the call stack, and the tree is exported in the same JSON shape as the
+Unity-side Assets/ML-Agents/Timers/Main_timers.json
+
+    {"count", "self", "total", "children": {name: {...}} | null, "gauges", "metadata"}
+
+so both files can be inspected with the same tooling. Timing is always on and
+costs two perf_counter calls per stage. start_profiling() additionally tracks
+peak traced memory per stage with tracemalloc (reported as
+"<stage path>.peak_memory_mb" gauges) and can write one cProfile dump per
+top-level stage.
+"""
+import cProfile
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+
+TIMER_FORMAT_VERSION = '0.1.0'
+
+
+class TimerNode:
+    def __init__(self):
+        """One stage in the timer tree, accumulated over all of its calls"""
+        self.count = 0
+        self.total = 0.0
+        self.children = {}
+        self.peak_bytes = []
+
+    def get_child(self, name):
+        """Return the child stage with the given name, creating it if needed"""
+        child = self.children.get(name)
+        if child is None:
+            child = self.children[name] = TimerNode()
+        return child
+
+    def merge(self, tree, gauges=None, path='root'):
+        """Add a node exported by another process (e.g. a render worker)"""
+        self.count += tree.get('count', 0)
+        self.total += tree.get('total', 0.0)
+        peak = (gauges or {}).get(f'{path}.peak_memory_mb')
+        if peak is not None:
+            self.peak_bytes.append(peak['max'] * 2**20)
+        for name, child in (tree.get('children') or {}).items():
+            self.get_child(name).merge(child, gauges, f'{path}.{name}')
+
+    def to_dict(self, path, gauges):
+        """Main_timers.json representation; peak memory goes into gauges"""
+        children_total = sum(child.total for child in self.children.values())
+        if self.peak_bytes:
+            peaks = [p / 2**20 for p in self.peak_bytes]
+            gauges[f'{path}.peak_memory_mb'] = {
+                'value': peaks[-1], 'min': min(peaks), 'max': max(peaks), 'count': len(peaks),
+            }
+        return {
+            'count': self.count,
+            # Children rendered in parallel workers can exceed their parent's wall time
+            'self': max(self.total - children_total, 0.0),
+            'total': self.total,
+            'children': {name: child.to_dict(f'{path}.{name}', gauges)
+                         for name, child in self.children.items()} or None,
+        }
+
+
+class TimerStack:
+    def __init__(self):
+        """Timer tree plus the stack of stages currently running"""
+        self.reset()
+        self.trace_memory = False
+        self.profile_dir = None
+
+    def reset(self):
+        """Discard all recorded timings"""
+        self.root = TimerNode()
+        self.stack = [self.root]
+        self.names = []
+        self.running_peaks = [0]
+        self.start_time = time.time()
+        self._profiler = None
+        self._profiler_depth = None
+
+    def push(self, name):
+        node = self.stack[-1].get_child(name)
+        self.stack.append(node)
+        self.names.append(name)
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            self.running_peaks[-1] = max(self.running_peaks[-1], peak)
+            tracemalloc.reset_peak()
+        self.running_peaks.append(0)
+
+        # One profile per outermost stage; cProfile cannot nest
+        if self.profile_dir is not None and self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler_depth = len(self.stack)
+            self._profiler.enable()
+        return node
+
+    def pop(self, elapsed):
+        if self._profiler is not None and self._profiler_depth == len(self.stack):
+            self._profiler.disable()
+            path = Path(self.profile_dir) / ('.'.join(self.names) + '.prof')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._profiler.dump_stats(path)
+            self._profiler = None
+
+        node = self.stack.pop()
+        self.names.pop()
+        running_peak = self.running_peaks.pop()
+        node.count += 1
+        node.total += elapsed
+        if self.trace_memory and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, running_peak)
+            node.peak_bytes.append(peak)
+            self.running_peaks[-1] = max(self.running_peaks[-1], peak)
+            tracemalloc.reset_peak()
+
+
+_timer_stack = TimerStack()
+
+
+@contextmanager
+def hierarchical_timer(name):
+    """
+    Time a block as a child stage of the currently running stage
+
+    Args:
+        name: Stage name
+    """
+    _timer_stack.push(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timer_stack.pop(time.perf_counter() - start)
+
+
+def timed(func):
+    """Decorator timing every call of a function as a stage named after it"""
+    @wraps(func)
+    def wrapped(*args, **kwargs):
+        with hierarchical_timer(func.__name__):
+            return func(*args, **kwargs)
+    return wrapped
+
+
+def start_profiling(trace_memory=True, profile_dir=None):
+    """
+    Reset the timer tree and enable the optional (more expensive) trackers
+
+    Args:
+        trace_memory: Record peak traced memory per stage with tracemalloc
+        profile_dir: Write a cProfile dump per top-level stage into this directory
+    """
+    reset_timers()
+    _timer_stack.trace_memory = trace_memory
+    _timer_stack.profile_dir = profile_dir
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def stop_profiling():
+    """Disable memory tracing and cProfile dumps (stage timing stays on)"""
+    if _timer_stack.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _timer_stack.trace_memory = False
+    _timer_stack.profile_dir = None
+
+
+def is_tracing_memory():
+    """Whether peak memory is currently recorded per stage"""
+    return _timer_stack.trace_memory
+
+
+def reset_timers():
+    """Discard all recorded timings"""
+    _timer_stack.reset()
+
+
+def merge_timer_tree(tree):
+    """
+    Attach a timer tree from another process under the currently running stage
+
+    Args:
+        tree: Output of get_timer_tree() in the other process
+    """
+    parent = _timer_stack.stack[-1]
+    gauges = tree.get('gauges', {})
+    for name, child in (tree.get('children') or {}).items():
+        parent.get_child(name).merge(child, gauges, f'root.{name}')
+
+
+def get_timer_tree():
+    """
+    Export the timer tree in the Main_timers.json shape
+
+    Returns:
+        Dict with count, self, total, children, gauges and metadata
+    """
+    root = _timer_stack.root
+    root.count = 1
+    root.total = sum(child.total for child in root.children.values())
+    gauges = {}
+    tree = root.to_dict('root', gauges)
+    tree['children'] = tree['children'] or {}
+    tree['gauges'] = gauges
+    tree['metadata'] = {
+        'timer_format_version': TIMER_FORMAT_VERSION,
+        'start_time_seconds': str(int(_timer_stack.start_time)),
+        'end_time_seconds': str(int(time.time())),
+        'python_version': platform.python_version(),
+        'command_line_arguments': ' '.join(sys.argv),
+    }
+    return tree
+
+
+def save_timer_tree(path):
+    """Write the timer tree as JSON and return the path"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(get_timer_tree(), f, indent=4)
+    return path
+
+
+def format_timer_tree(tree=None, min_fraction=0.0):
+    """
+    Indented text view of a timer tree
+
+    Args:
+        tree: Timer tree (default: the current one)
+        min_fraction: Hide stages taking less than this fraction of the total
+
+    Returns:
+        Multi-line string with total, self time, count and peak memory per stage
+    """
+    tree = tree or get_timer_tree()
+    gauges = tree.get('gauges', {})
+    grand_total = tree['total'] or 1.0
+    lines = [f"{'Stage':<50} {'Total s':>9} {'Self s':>9} {'Calls':>6} {'Peak MB':>9}"]
+
+    def visit(name, node, path, depth):
+        if node['total'] < min_fraction * grand_total:
+            return
+        peak = gauges.get(f'{path}.peak_memory_mb', {}).get('max')
+        peak_text = f"{peak:9.1f}" if peak is not None else f"{'-':>9}"
+        label = ('  ' * depth + name)[:50]
+        lines.append(f"{label:<50} {node['total']:9.3f} {node['self']:9.3f} {node['count']:6d} {peak_text}")
+        for child_name, child in (node['children'] or {}).items():
+            visit(child_name, child, f'{path}.{child_name}', depth + 1)
+
+    for name, child in tree['children'].items():
+        visit(name, child, f'root.{name}', 0)
+    return '\n'.join(lines)
@@ -0,0 +1,491 @@
+"""
+Figure builders and the headless render pipeline
+
+Every comparison figure is built with the matplotlib object API on a figure
+passed in by the caller, so the same builder works for an interactive pyplot
+window and for a bare Agg-backed Figure in a worker process. Builders never
+touch the pyplot state machine and never leave figures open.
+
+matplotlib and seaborn are imported on first use rather than at import time,
+so the numbers-only analysis paths never pay for the plotting stack.
+"""
+import hashlib
+import importlib
+import inspect
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from alignment import aligned_summary, first_half_cut, time_window
+from downsampling import DEFAULT_MAX_POINTS, downsample
+from profiling import get_timer_tree, hierarchical_timer, is_tracing_memory, merge_timer_tree, start_profiling
+
+
+ML_COLOR = '#2E86AB'      # Dark blue for ML Agent
+STATIC_COLOR = '#F24236'  # Bright red for Static Controller
+PALETTE = [ML_COLOR, STATIC_COLOR, "#A23B72", "#F18F01", "#C73E1D"]
+STYLE_SHEET = 'seaborn-v0_8'
+
+# Modules whose code shapes the figures: the builders and their plotting
+# helpers, the downsampling and the time windows. Editing any of them
+# invalidates every cached figure.
+RENDERING_MODULES = ('rendering', 'downsampling', 'alignment')
+_rendering_code_hash = None
+
+
+def apply_style():
+    """Apply the shared plotting style (also run in every render worker)"""
+    import matplotlib
+    import seaborn as sns
+    matplotlib.style.use(STYLE_SHEET)
+    sns.set_palette(PALETTE)
+
+
+class RenderSettings:
+    def __init__(self, output_dir="./", formats=('png',), dpi=300, show=False,
+                 max_points=DEFAULT_MAX_POINTS, downsample_method='minmax'):
+        """
+        Where and how figures are written
+
+        Args:
+            output_dir: Directory the figures are saved to
+            formats: File formats to write for every figure (e.g. ('png', 'svg'))
+            dpi: Resolution for raster formats
+            show: Open an interactive pyplot window for each figure (blocks)
+            max_points: Point budget per time-series line (None plots every sample)
+            downsample_method: 'minmax' or 'lttb' (see downsampling.py)
+        """
+        self.output_dir = Path(output_dir)
+        self.formats = (formats,) if isinstance(formats, str) else tuple(formats)
+        self.dpi = dpi
+        self.show = show
+        self.max_points = max_points
+        self.downsample_method = downsample_method
+
+    def paths(self, stem):
+        """Output paths of one figure, one per configured format"""
+        return [self.output_dir / f'{stem}.{fmt}' for fmt in self.formats]
+
+
+def plot_time_series(ax, intervals, metric, settings=None, **kwargs):
+    """Plot one metric against SimulationTime, downsampled to the point budget"""
+    x, y = intervals['SimulationTime'].to_numpy(), intervals[metric].to_numpy()
+    if settings is not None:
+        x, y = downsample(x, y, settings.max_points, settings.downsample_method)
+    return ax.plot(x, y, **kwargs)
+
+
+def plot_episode_performance(fig, ml_episodes, static_episodes, episode_metrics, settings=None):
+    """Box plots of episode-level metrics (episode_performance_comparison)"""
+    axes = fig.subplots(2, 3)
+    fig.suptitle('Episode Performance Comparison: ML vs Static', fontsize=16, fontweight='bold')
+
+    # REMOVED FuelConsumed from metrics
+    metrics = [
+        ('TotalVehicles', 'Total Vehicles'),
+        ('VehiclesWaiting', 'Vehicles Waiting'),
+        ('EpisodeDuration', 'Episode Duration (s)'),
+        ('CumulativeReward', 'Cumulative Reward'),
+        ('GreenLightTime', 'Green Light Time (s)')
+    ]
+
+    for i, (metric, title) in enumerate(metrics):
+        row, col = i // 3, i % 3
+        ax = axes[row, col]
+
+        # Check if metric exists in both datasets
+        if episode_metrics.available(metric):
+            # Box plot comparison
+            data_to_plot = [ml_episodes[metric].dropna(), static_episodes[metric].dropna()]
+            labels = ['ML Agent', 'Static Controller']
+
+            bp = ax.boxplot(data_to_plot, labels=labels, patch_artist=True)
+            bp['boxes'][0].set_facecolor(ML_COLOR)
+            bp['boxes'][1].set_facecolor(STATIC_COLOR)
+
+            ax.set_title(f'{title}')
+            ax.grid(True, alpha=0.3)
+
+            # Add mean values as text
+            ml_mean, static_mean = episode_metrics.means(metric)
+            ax.text(0.02, 0.98, f'ML Mean: {ml_mean:.2f}\nStatic Mean: {static_mean:.2f}',
+                    transform=ax.transAxes, verticalalignment='top',
+                    bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        else:
+            ax.text(0.5, 0.5, f'{metric}\nNot Available',
+                    ha='center', va='center', transform=ax.transAxes)
+            ax.set_title(f'{title} - Data Not Available')
+
+    # Hide the last subplot since we removed one metric
+    axes[1, 2].set_visible(False)
+
+    fig.tight_layout()
+    return True
+
+
+def plot_metric_over_time_half(fig, ml_intervals, static_intervals, aligned, metric, label, settings=None):
+    """
+    Detailed time series of one metric for the first half of the shared time span
+
+    Both controllers are cut at the same simulation time, and the statistics
+    box uses the time-aligned frame so the means cover matching moments.
+
+    Returns:
+        False if the metric is missing from either dataset (nothing is drawn)
+    """
+    if f'Delta_{metric}' not in aligned.columns:
+        return False
+
+    cut = first_half_cut(aligned)
+    ml_half = time_window(ml_intervals, end=cut)
+    static_half = time_window(static_intervals, end=cut)
+
+    ax = fig.subplots(1, 1)
+
+    # Plot time series with thicker lines
+    plot_time_series(ax, ml_half, metric, settings,
+                     label='ML Agent', linewidth=3, alpha=0.8, color=ML_COLOR)
+    plot_time_series(ax, static_half, metric, settings,
+                     label='Static Controller', linewidth=3, alpha=0.8, color=STATIC_COLOR)
+
+    ax.set_xlabel('Simulation Time (s)', fontsize=14)
+    ax.set_ylabel(label, fontsize=14)
+    ax.set_title(f'{label} Over Time (First Half): ML vs Static Controller', fontsize=16, fontweight='bold')
+    ax.legend(fontsize=12)
+    ax.grid(True, alpha=0.3)
+
+    # Add statistics text box
+    stats = aligned_summary(aligned, end=cut).set_index('Metric').loc[metric]
+    ml_mean = stats['ML_Mean']
+    static_mean = stats['Static_Mean']
+    improvement = stats['Improvement_%']
+
+    stats_text = f'ML Agent Mean: {ml_mean:.2f}\nStatic Controller Mean: {static_mean:.2f}\nImprovement: {improvement:.1f}%'
+    ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, verticalalignment='top',
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8), fontsize=11)
+
+    fig.tight_layout()
+    return True
+
+
+def plot_vehicles_waiting_half(fig, ml_intervals, static_intervals, aligned, settings=None):
+    return plot_metric_over_time_half(fig, ml_intervals, static_intervals, aligned,
+                                      'VehiclesWaiting', 'Vehicles Waiting', settings)
+
+
+def plot_queue_length_half(fig, ml_intervals, static_intervals, aligned, settings=None):
+    return plot_metric_over_time_half(fig, ml_intervals, static_intervals, aligned,
+                                      'QueueLength', 'Queue Length', settings)
+
+
+def plot_interval_comparison(fig, ml_intervals, static_intervals, settings=None):
+    """Interval metrics over time (interval_data_comparison)"""
+    axes = fig.subplots(1, 3)  # Changed to 1x3 since we removed fuel
+    fig.suptitle('Interval Data Comparison: ML vs Static Over Time', fontsize=16, fontweight='bold')
+
+    # REMOVED FuelConsumed from time_metrics
+    time_metrics = [
+        ('TotalVehicles', 'Total Vehicles Over Time'),
+        ('VehiclesWaiting', 'Vehicles Waiting Over Time'),
+        ('QueueLength', 'Queue Length Over Time')
+    ]
+
+    for ax, (metric, title) in zip(axes, time_metrics):
+        if metric in ml_intervals.columns and metric in static_intervals.columns:
+            plot_time_series(ax, ml_intervals, metric, settings,
+                             label='ML Agent', linewidth=2, alpha=0.8, color=ML_COLOR)
+            plot_time_series(ax, static_intervals, metric, settings,
+                             label='Static Controller', linewidth=2, alpha=0.8, color=STATIC_COLOR)
+
+            ax.set_xlabel('Simulation Time (s)')
+            ax.set_ylabel(metric)
+            ax.set_title(title)
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+        else:
+            ax.text(0.5, 0.5, f'{metric}\nNot Available',
+                    ha='center', va='center', transform=ax.transAxes)
+            ax.set_title(f'{title} - Data Not Available')
+
+    fig.tight_layout()
+    return True
+
+
+def plot_dashboard(fig, ml_intervals, static_intervals, episode_metrics, settings=None):
+    """Combined dashboard (traffic_signal_dashboard)"""
+    gs = fig.add_gridspec(3, 4, hspace=0.3, wspace=0.3)  # Changed to 3 rows instead of 4
+
+    # Title
+    fig.suptitle('Traffic Signal Control: ML vs Static Performance Dashboard',
+                 fontsize=20, fontweight='bold')
+
+    # 1. Episode comparison - key metrics
+    ax1 = fig.add_subplot(gs[0, :2])
+    metrics = ['TotalVehicles', 'VehiclesWaiting']
+    x = np.arange(len(metrics))
+    width = 0.35
+
+    ml_means = [episode_metrics.get('ml', m, default=0) for m in metrics]
+    static_means = [episode_metrics.get('static', m, default=0) for m in metrics]
+
+    ax1.bar(x - width/2, ml_means, width, label='ML Agent', alpha=0.8, color=ML_COLOR)
+    ax1.bar(x + width/2, static_means, width, label='Static Controller', alpha=0.8, color=STATIC_COLOR)
+    ax1.set_xlabel('Metrics')
+    ax1.set_ylabel('Average Values')
+    ax1.set_title('Episode Performance Comparison')
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(metrics)
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # 2. Total Vehicles over time
+    ax2 = fig.add_subplot(gs[0, 2:])
+    if 'TotalVehicles' in ml_intervals.columns:
+        plot_time_series(ax2, ml_intervals, 'TotalVehicles', settings,
+                         label='ML Agent', linewidth=2, color=ML_COLOR)
+        plot_time_series(ax2, static_intervals, 'TotalVehicles', settings,
+                         label='Static Controller', linewidth=2, color=STATIC_COLOR)
+
+        ax2.set_xlabel('Simulation Time (s)')
+        ax2.set_ylabel('Total Vehicles')
+        ax2.set_title('Total Vehicles Over Time')
+        ax2.legend()
+        ax2.grid(True, alpha=0.3)
+
+    # 3. Queue length comparison
+    ax3 = fig.add_subplot(gs[1, :])  # Made this span the full width since we removed the reward plot
+    if 'QueueLength' in ml_intervals.columns:
+        plot_time_series(ax3, ml_intervals, 'QueueLength', settings,
+                         label='ML Agent', linewidth=2, alpha=0.8, color=ML_COLOR)
+        plot_time_series(ax3, static_intervals, 'QueueLength', settings,
+                         label='Static Controller', linewidth=2, alpha=0.8, color=STATIC_COLOR)
+        ax3.set_xlabel('Simulation Time (s)')
+        ax3.set_ylabel('Queue Length')
+        ax3.set_title('Queue Length Over Time')
+        ax3.legend()
+        ax3.grid(True, alpha=0.3)
+
+    # 4. Performance metrics heatmap
+    ax4 = fig.add_subplot(gs[2, :])
+
+    comparison_data = []
+    metrics = ['TotalVehicles', 'VehiclesWaiting']  # Removed EpisodeDuration and FuelConsumed
+
+    for metric in metrics:
+        if episode_metrics.available(metric):
+            comparison_data.append(list(episode_metrics.means(metric)))
+
+    if comparison_data:
+        comparison_array = np.array(comparison_data, dtype=float)
+        # Normalize each row
+        row_max = comparison_array.max(axis=1, keepdims=True)
+        comparison_array = np.where(row_max > 0, comparison_array / np.where(row_max > 0, row_max, 1),
+                                    comparison_array)
+
+        import seaborn as sns
+        sns.heatmap(comparison_array,
+                    xticklabels=['ML Agent', 'Static Controller'],
+                    yticklabels=[m for m in metrics if episode_metrics.available(m)],
+                    annot=True, fmt='.3f', cmap='RdYlBu_r',
+                    ax=ax4)
+        ax4.set_title('Normalized Performance Heatmap')
+
+    return True
+
+
+# name -> (builder, figsize, output stem, names of the data frames the builder takes)
+FIGURES = {
+    'episode_performance': (plot_episode_performance, (18, 12), 'episode_performance_comparison',
+                            ('ml_episodes', 'static_episodes', 'episode_metrics')),
+    'interval_comparison': (plot_interval_comparison, (24, 8), 'interval_data_comparison',
+                            ('ml_intervals', 'static_intervals')),
+    'vehicles_waiting_half': (plot_vehicles_waiting_half, (16, 8), 'vehicles_waiting_comparison_first_half',
+                              ('ml_intervals', 'static_intervals', 'aligned')),
+    'queue_length_half': (plot_queue_length_half, (16, 8), 'queue_length_comparison_first_half',
+                          ('ml_intervals', 'static_intervals', 'aligned')),
+    'dashboard': (plot_dashboard, (20, 12), 'traffic_signal_dashboard',
+                  ('ml_intervals', 'static_intervals', 'episode_metrics')),
+}
+
+
+def new_figure(figsize, interactive=False):
+    """
+    Create an empty figure
+
+    Args:
+        figsize: Figure size in inches
+        interactive: Create a pyplot-managed figure that can be shown in a window.
+            Otherwise a bare Figure with an Agg canvas is returned, which pyplot
+            never tracks and which is freed as soon as it goes out of scope.
+    """
+    if interactive:
+        import matplotlib.pyplot as plt
+        return plt.figure(figsize=figsize)
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def save_figure(fig, stem, settings):
+    """Save a figure in every configured format and return the written paths"""
+    settings.output_dir.mkdir(parents=True, exist_ok=True)
+    paths = settings.paths(stem)
+    for path in paths:
+        with hierarchical_timer(f'savefig_{path.suffix[1:]}'):
+            fig.savefig(path, dpi=settings.dpi, bbox_inches='tight')
+    return paths
+
+
+def rendering_code_hash():
+    """Hash of the source of RENDERING_MODULES (computed once per process)"""
+    global _rendering_code_hash
+    if _rendering_code_hash is None:
+        digest = hashlib.sha256()
+        for module_name in RENDERING_MODULES:
+            digest.update(inspect.getsource(importlib.import_module(module_name)).encode())
+        _rendering_code_hash = digest.hexdigest()
+    return _rendering_code_hash
+
+
+def figure_fingerprint(name, frames, settings):
+    """
+    Fingerprint of one registered figure (see figure_cache.py)
+
+    Covers the data frames the figure takes, the source of the rendering
+    code (see RENDERING_MODULES), its size and output stem, the render
+    settings that change the files, the plotting style and the plotting
+    library versions.
+    """
+    from figure_cache import fingerprint, library_versions
+    _, figsize, stem, arg_names = FIGURES[name]
+    params = {
+        'figure': name,
+        'code': rendering_code_hash(),
+        'figsize': figsize,
+        'stem': stem,
+        'formats': settings.formats,
+        'dpi': settings.dpi,
+        'max_points': settings.max_points,
+        'downsample_method': settings.downsample_method,
+        'style': STYLE_SHEET,
+        'palette': PALETTE,
+        'libraries': library_versions(),
+    }
+    return fingerprint({arg: frames[arg] for arg in arg_names}, params)
+
+
+def render_figure(name, frames, settings, cache=None):
+    """
+    Build and save one registered figure without showing it
+
+    Args:
+        name: Key in FIGURES
+        frames: Dict with the data frames listed for the figure in FIGURES
+        settings: RenderSettings
+        cache: Optional FigureCache; an unchanged figure is restored instead of rendered
+
+    Returns:
+        List of written paths (empty if the builder had nothing to draw)
+    """
+    builder, figsize, stem, arg_names = FIGURES[name]
+    if cache is not None:
+        with hierarchical_timer('figure_cache'):
+            key = figure_fingerprint(name, frames, settings)
+            if cache.restore(key, name, settings.paths(stem)):
+                cache.save()
+                return settings.paths(stem)
+        paths = render_figure(name, frames, settings)
+        if paths:
+            cache.store(key, paths)
+            cache.evict()
+            cache.save()
+        return paths
+
+    with hierarchical_timer(name):
+        fig = new_figure(figsize)
+        try:
+            with hierarchical_timer('build'):
+                drawn = builder(fig, *(frames[arg] for arg in arg_names), settings=settings)
+            if not drawn:
+                return []
+            return save_figure(fig, stem, settings)
+        finally:
+            fig.clear()
+
+
+def _render_worker_init():
+    import matplotlib
+    matplotlib.use('Agg')
+    apply_style()
+
+
+def _render_worker(name, frames, settings, trace_memory):
+    """render_figure in a worker process, returning its timer tree as well"""
+    start_profiling(trace_memory=trace_memory)
+    paths = render_figure(name, frames, settings)
+    return paths, get_timer_tree()
+
+
+def render_figures(names, frames, settings, max_workers=None, cache=None):
+    """
+    Render independent figures concurrently in worker processes
+
+    Args:
+        names: Keys in FIGURES to render
+        frames: Dict of every data frame the figures need
+        settings: RenderSettings (show is ignored, workers are headless)
+        max_workers: Worker processes (default: one per figure, capped by CPU count).
+            With 1 the figures are rendered in this process.
+        cache: Optional FigureCache; only figures whose fingerprint changed are rendered
+
+    Returns:
+        Dict mapping figure name to its list of written paths
+    """
+    results = {}
+    keys = {}
+    names = list(names)
+    if cache is not None:
+        with hierarchical_timer('figure_cache'):
+            for name in names:
+                keys[name] = figure_fingerprint(name, frames, settings)
+                paths = settings.paths(FIGURES[name][2])
+                if cache.restore(keys[name], name, paths):
+                    results[name] = paths
+        names = [name for name in names if name not in results]
+
+    results.update(_render_figures(names, frames, settings, max_workers))
+
+    if cache is not None:
+        for name in names:
+            if results[name]:
+                cache.store(keys[name], results[name])
+        cache.evict()
+        cache.save()
+    return results
+
+
+def _render_figures(names, frames, settings, max_workers=None):
+    """render_figures without the cache"""
+    if not names:
+        return {}
+    if max_workers is None:
+        max_workers = min(len(names), os.cpu_count() or 1)
+
+    if max_workers <= 1:
+        return {name: render_figure(name, frames, settings) for name in names}
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_render_worker_init) as executor:
+        futures = {}
+        for name in names:
+            # Only ship each worker the frames its figure uses
+            needed = {arg: frames[arg] for arg in FIGURES[name][3]}
+            futures[name] = executor.submit(_render_worker, name, needed, settings, is_tracing_memory())
+        for name, future in futures.items():
+            results[name], timers = future.result()
+            merge_timer_tree(timers)
+    return results
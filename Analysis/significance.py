@@ -0,0 +1,233 @@
+"""
+Bootstrap confidence intervals and permutation tests for ML vs Static
+
+Everything is vectorized over resamples. Each sample is first compressed to a
+small set of levels with counts: its distinct values when there are few of
+them (vehicle counts, queue lengths), otherwise equal-count bins of the sorted
+sample represented by their means (wait times and other continuous metrics).
+A bootstrap resample is then one multinomial draw over the levels, and a label
+permutation is one multivariate hypergeometric draw, so a batch of resamples
+costs O(resamples x levels) instead of O(resamples x rows). For binned samples
+the spread of the values inside each bin is added back as a normal term whose
+variance follows from the drawn bin counts, so the resampled means keep the
+variance of exact resampling. Batches can optionally be spread over a process
+pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from comparison_stats import improvement_percent
+
+
+DEFAULT_RESAMPLES = 10_000
+
+# Use the distinct values as levels when there are at most this many of them
+MAX_DISTINCT_VALUES = 4096
+
+# Otherwise bin the sample into this many equal-count levels
+FLOAT_BINS = 512
+
+# Upper bound on the elements of one (resamples x levels) block
+BLOCK_ELEMENTS = 8_000_000
+
+# Columns statistical_comparison adds to the summary table
+SIGNIFICANCE_COLUMNS = ['Diff_CI_Low', 'Diff_CI_High', 'Improvement_CI_Low_%', 'Improvement_CI_High_%', 'P_Value']
+
+
+def _compress(values):
+    """
+    Sample without NaNs, its levels and counts, and the variance inside each level
+
+    The within-level variance (ddof=0) is None when the levels are the exact
+    distinct values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    distinct, counts = np.unique(values, return_counts=True)
+    if distinct.size <= MAX_DISTINCT_VALUES:
+        return values, distinct, counts, None
+
+    ordered = np.sort(values)
+    bins = np.arange(ordered.size) * FLOAT_BINS // ordered.size
+    counts = np.bincount(bins)
+    levels = np.bincount(bins, weights=ordered) / counts
+    spread = np.bincount(bins, weights=(ordered - levels[bins]) ** 2) / counts
+    return values, levels, counts, spread
+
+
+def _block_size(n_levels, n_resamples):
+    return int(max(1, min(n_resamples, BLOCK_ELEMENTS // max(n_levels, 1))))
+
+
+def bootstrap_means(values, n_resamples, rng):
+    """
+    Means of n_resamples bootstrap resamples of values
+
+    Args:
+        values: 1-D sample
+        n_resamples: Number of bootstrap resamples
+        rng: numpy Generator
+
+    Returns:
+        Array of n_resamples resampled means
+    """
+    values, levels, counts, spread = _compress(values)
+    n = values.size
+    if n == 0:
+        return np.full(n_resamples, np.nan)
+
+    means = np.empty(n_resamples)
+    block = _block_size(levels.size, n_resamples)
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        draws = rng.multinomial(n, counts / n, size=size)
+        sums = draws @ levels
+        if spread is not None:
+            # Values drawn from a bin scatter around its mean (with replacement)
+            sums += np.sqrt(draws @ spread) * rng.standard_normal(size)
+        means[start:start + size] = sums / n
+    return means
+
+
+def permutation_mean_differences(a, b, n_resamples, rng):
+    """
+    Difference of means (a - b) under random relabelling of the pooled sample
+
+    Args:
+        a: First sample
+        b: Second sample
+        n_resamples: Number of permutations
+        rng: numpy Generator
+
+    Returns:
+        Array of n_resamples permuted mean differences
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    a = a[~np.isnan(a)]
+    b = b[~np.isnan(b)]
+    n_a, n_b = a.size, b.size
+    pooled, levels, counts, spread = _compress(np.concatenate([a, b]))
+    total = pooled.sum()
+
+    sum_a = np.empty(n_resamples)
+    block = _block_size(levels.size, n_resamples)
+    if spread is not None:
+        # Finite-population variance of a sum drawn without replacement from each bin
+        per_draw = spread * counts / np.maximum(counts - 1, 1)
+    for start in range(0, n_resamples, block):
+        size = min(block, n_resamples - start)
+        # Counts of each level that land in group a
+        draws = rng.multivariate_hypergeometric(counts, n_a, size=size)
+        sums = draws @ levels
+        if spread is not None:
+            variance = (draws * (counts - draws)) @ (per_draw / counts)
+            sums += np.sqrt(variance) * rng.standard_normal(size)
+        sum_a[start:start + size] = sums
+
+    return sum_a / n_a - (total - sum_a) / n_b
+
+
+def _resample_batch(ml_values, static_values, n_resamples, seed):
+    rng = np.random.default_rng(seed)
+    ml_means = bootstrap_means(ml_values, n_resamples, rng)
+    static_means = bootstrap_means(static_values, n_resamples, rng)
+    permuted = permutation_mean_differences(ml_values, static_values, n_resamples, rng)
+    return ml_means, static_means, permuted
+
+
+def compare_metric(metric, ml_values, static_values, n_resamples=DEFAULT_RESAMPLES,
+                   confidence=0.95, seed=None, executor=None, n_batches=1):
+    """
+    Bootstrap CIs and a permutation p-value for one metric
+
+    Args:
+        metric: Metric name (decides the sign of the improvement)
+        ml_values: ML samples
+        static_values: Static samples
+        n_resamples: Bootstrap resamples and permutations
+        confidence: Confidence level of the intervals
+        seed: Seed for reproducible results
+        executor: Optional concurrent.futures executor to split resamples over
+        n_batches: Number of batches the resamples are split into for the executor
+
+    Returns:
+        Dict with the difference and improvement CIs and the p-value
+    """
+    ml_values = np.asarray(ml_values, dtype=np.float64)
+    static_values = np.asarray(static_values, dtype=np.float64)
+    ml_values = ml_values[~np.isnan(ml_values)]
+    static_values = static_values[~np.isnan(static_values)]
+
+    if ml_values.size == 0 or static_values.size == 0:
+        return {key: np.nan for key in ['Diff_Mean'] + SIGNIFICANCE_COLUMNS}
+
+    seeds = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    if executor is None or n_batches <= 1:
+        ml_means, static_means, permuted = _resample_batch(ml_values, static_values, n_resamples, seeds)
+    else:
+        sizes = [len(part) for part in np.array_split(np.arange(n_resamples), n_batches) if len(part)]
+        futures = [executor.submit(_resample_batch, ml_values, static_values, size, child)
+                   for size, child in zip(sizes, seeds.spawn(len(sizes)))]
+        parts = [future.result() for future in futures]
+        ml_means, static_means, permuted = (np.concatenate(p) for p in zip(*parts))
+
+    alpha = (1 - confidence) / 2
+    observed_diff = ml_values.mean() - static_values.mean()
+    diff_low, diff_high = np.quantile(ml_means - static_means, [alpha, 1 - alpha])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        improvements = improvement_percent(metric, ml_means, static_means)
+    improvements = improvements[np.isfinite(improvements)]
+    if improvements.size:
+        improvement_low, improvement_high = np.quantile(improvements, [alpha, 1 - alpha])
+    else:
+        improvement_low = improvement_high = np.nan
+
+    # Two-sided, with the +1 correction so p is never exactly 0
+    extreme = np.count_nonzero(np.abs(permuted) >= abs(observed_diff) - 1e-12)
+    p_value = (extreme + 1) / (permuted.size + 1)
+
+    return {
+        'Diff_Mean': observed_diff,
+        'Diff_CI_Low': diff_low,
+        'Diff_CI_High': diff_high,
+        'Improvement_CI_Low_%': improvement_low,
+        'Improvement_CI_High_%': improvement_high,
+        'P_Value': p_value,
+    }
+
+
+def significance_table(ml_frame, static_frame, metrics, n_resamples=DEFAULT_RESAMPLES,
+                       confidence=0.95, seed=None, max_workers=None):
+    """
+    Bootstrap CIs and permutation p-values for every metric
+
+    Args:
+        ml_frame: ML data (episodes or intervals)
+        static_frame: Static data with the same metric columns
+        metrics: Metric columns to test (missing ones are skipped)
+        n_resamples: Bootstrap resamples and permutations per metric
+        confidence: Confidence level of the intervals
+        seed: Seed for reproducible results
+        max_workers: Split resamples over this many processes (None or 1: in-process)
+
+    Returns:
+        DataFrame with one row per metric
+    """
+    metrics = [m for m in metrics if m in ml_frame.columns and m in static_frame.columns]
+    seeds = np.random.SeedSequence(seed).spawn(max(len(metrics), 1))
+
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers and max_workers > 1 else None
+    try:
+        rows = []
+        for metric, metric_seed in zip(metrics, seeds):
+            result = compare_metric(metric, ml_frame[metric].to_numpy(), static_frame[metric].to_numpy(),
+                                    n_resamples, confidence, metric_seed, executor, max_workers or 1)
+            rows.append({'Metric': metric, **result})
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return pd.DataFrame(rows)
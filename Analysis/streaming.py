@@ -0,0 +1,471 @@
+"""
+Streaming (chunked) aggregation engine
+
+Reads the episode, interval and reward-progress CSVs in fixed-size chunks and
+keeps only running aggregates, so memory stays bounded no matter how large the
+logs grow. Produces a performance_comparison_summary.csv with the same columns
+as TrafficSignalComparison.statistical_comparison(). Bootstrap resampling needs
+every row in memory, so the confidence interval and p-value columns are left
+empty (NaN); run statistical_comparison on the loaded logs for those.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from comparison_stats import SUMMARY_METRICS, summary_table
+from csv_cache import CSV_SCHEMAS
+from significance import SIGNIFICANCE_COLUMNS
+
+
+DEFAULT_CHUNKSIZE = 500_000
+
+# Metrics aggregated per episode / per phase from the interval logs
+INTERVAL_METRICS = ['TotalVehicles', 'VehiclesWaiting', 'QueueLength']
+
+
+def iter_csv_chunks(path, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Iterate over a logger CSV in typed chunks
+
+    Args:
+        path: Path to the CSV file
+        columns: Columns to read (None reads all). Missing columns are skipped.
+        chunksize: Rows per chunk
+
+    Yields:
+        DataFrame chunks
+    """
+    path = Path(path)
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in columns if c in header] if columns is not None else list(header)
+    schema = CSV_SCHEMAS.get(path.name, {})
+    dtype = {c: schema[c] for c in usecols if c in schema}
+
+    yield from pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunksize)
+
+
+class RunningStats:
+    def __init__(self):
+        """Count, mean, variance (Welford/Chan), min and max of a stream"""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Merge a batch of values into the running statistics"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        n = values.size
+        if n == 0:
+            return
+
+        batch_mean = values.mean()
+        batch_m2 = ((values - batch_mean) ** 2).sum()
+
+        # Chan et al. parallel combination of two Welford states
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, same as pandas)"""
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count else np.nan,
+            'std': self.std,
+            'min': self.min if self.count else np.nan,
+            'max': self.max if self.count else np.nan,
+        }
+
+
+class QuantileSketch:
+    def __init__(self, max_centroids=2048):
+        """
+        Bounded-memory quantile sketch
+
+        Keeps at most max_centroids weighted points. Integer-valued logs (vehicle
+        counts, queue lengths) usually have far fewer distinct values than that,
+        in which case the quantiles are exact.
+
+        Args:
+            max_centroids: Upper bound on the number of stored points
+        """
+        self.max_centroids = max_centroids
+        self.values = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values):
+        """Add a batch of values to the sketch"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        batch_values, batch_counts = np.unique(values, return_counts=True)
+        merged_values = np.concatenate([self.values, batch_values])
+        merged_weights = np.concatenate([self.weights, batch_counts.astype(np.float64)])
+
+        # Collapse duplicates shared between the sketch and the new batch
+        unique_values, inverse = np.unique(merged_values, return_inverse=True)
+        unique_weights = np.bincount(inverse, weights=merged_weights)
+
+        if unique_values.size > self.max_centroids:
+            unique_values, unique_weights = self._compress(unique_values, unique_weights)
+
+        self.values = unique_values
+        self.weights = unique_weights
+
+    def _compress(self, values, weights):
+        # Merge neighbours into bins that are narrow near the tails and wide in the
+        # middle (t-digest k1 scale), keeping each bin's weighted mean
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.arcsin(2 * q - 1) / np.pi + 0.5
+        bins = np.minimum(k * self.max_centroids, self.max_centroids - 1).astype(np.int64)
+        bin_weights = np.bincount(bins, weights=weights)
+        bin_values = np.bincount(bins, weights=values * weights) / np.where(bin_weights > 0, bin_weights, 1)
+        keep = bin_weights > 0
+        return bin_values[keep], bin_weights[keep]
+
+    def quantile(self, q):
+        """
+        Estimate one or more quantiles
+
+        Args:
+            q: Quantile or array of quantiles in [0, 1]
+
+        Returns:
+            Estimated value(s), interpolated like np.quantile(method='linear')
+        """
+        if self.values.size == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        total = self.weights.sum()
+        # Position (0-based rank) of the first and last copy of each stored value
+        upper = np.cumsum(self.weights) - 1
+        lower = upper - self.weights + 1
+        ranks = np.asarray(q, dtype=np.float64) * (total - 1)
+
+        idx = np.searchsorted(upper, ranks, side='left')
+        idx = np.clip(idx, 0, self.values.size - 1)
+        inside = ranks >= lower[idx]
+        prev_idx = np.maximum(idx - 1, 0)
+        # Ranks that fall between two stored values are linearly interpolated
+        gap = np.where(lower[idx] - upper[prev_idx] > 0, lower[idx] - upper[prev_idx], 1)
+        frac = (ranks - upper[prev_idx]) / gap
+        between = self.values[prev_idx] + frac * (self.values[idx] - self.values[prev_idx])
+        result = np.where(inside, self.values[idx], between)
+        return result if np.ndim(q) else float(result)
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+
+class MetricAccumulator:
+    def __init__(self, max_centroids=2048):
+        """Running moments plus a quantile sketch for one metric"""
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(max_centroids)
+
+    def update(self, values):
+        self.stats.update(values)
+        self.sketch.update(values)
+
+    def summary(self, quantiles=(0.25, 0.5, 0.75)):
+        result = self.stats.as_dict()
+        result['median'] = self.sketch.median
+        for q in quantiles:
+            result[f'p{int(round(q * 100))}'] = self.sketch.quantile(q)
+        return result
+
+
+class GroupedRunningStats:
+    def __init__(self, key, max_centroids=2048, quantiles=(0.25, 0.5, 0.75)):
+        """
+        Running count/mean/M2/min/max and a quantile sketch per group (episode, phase, ...)
+
+        Each chunk is reduced with a single groupby and merged into the running
+        table with the vectorized Chan combination, so no Python loop runs per
+        row. The sketches are updated once per group and metric in each chunk.
+
+        Args:
+            key: Column to group by
+            max_centroids: Size bound of each group's quantile sketches
+            quantiles: Quantiles reported per group (0.5 is reported as 'median')
+        """
+        self.key = key
+        self.max_centroids = max_centroids
+        self.quantiles = quantiles
+        self.table = None
+        self.sketches = {}
+
+    def update(self, chunk, metrics):
+        metrics = [m for m in metrics if m in chunk.columns]
+        if self.key not in chunk.columns or not metrics:
+            return
+
+        grouped = chunk.groupby(self.key, observed=True)[metrics]
+        for group, rows in grouped:
+            for metric in metrics:
+                sketch = self.sketches.get((group, metric))
+                if sketch is None:
+                    sketch = self.sketches[(group, metric)] = QuantileSketch(self.max_centroids)
+                sketch.update(rows[metric].to_numpy())
+
+        counts = grouped.count()
+        means = grouped.mean()
+        m2 = grouped.var(ddof=0) * counts
+        batch = pd.concat({'count': counts, 'mean': means, 'm2': m2,
+                           'min': grouped.min(), 'max': grouped.max()}, axis=1).astype(np.float64)
+
+        if self.table is None:
+            self.table = batch
+            return
+
+        index = self.table.index.union(batch.index)
+        old = self.table.reindex(index)
+        new = batch.reindex(index)
+
+        n_a = old['count'].fillna(0)
+        n_b = new['count'].fillna(0)
+        total = n_a + n_b
+        safe_total = total.where(total > 0, 1)
+        mean_a = old['mean'].fillna(0)
+        mean_b = new['mean'].fillna(0)
+        delta = mean_b - mean_a
+
+        merged = {
+            'count': total,
+            'mean': (mean_a + delta * n_b / safe_total).where(total > 0),
+            'm2': old['m2'].fillna(0) + new['m2'].fillna(0) + delta ** 2 * n_a * n_b / safe_total,
+            'min': np.fmin(old['min'], new['min']),
+            'max': np.fmax(old['max'], new['max']),
+        }
+        self.table = pd.concat(merged, axis=1)
+
+    def result(self):
+        """Return a DataFrame with mean/std/min/max/count and the quantiles per group and metric"""
+        if self.table is None:
+            return pd.DataFrame()
+        count = self.table['count']
+        std = np.sqrt(self.table['m2'] / (count - 1).where(count > 1))
+        columns = {'count': count, 'mean': self.table['mean'], 'std': std,
+                   'min': self.table['min'], 'max': self.table['max']}
+        for q in self.quantiles:
+            name = 'median' if q == 0.5 else f'p{int(round(q * 100))}'
+            columns[name] = pd.DataFrame(
+                {metric: [self.sketches[(group, metric)].quantile(q) if (group, metric) in self.sketches else np.nan
+                          for group in count.index]
+                 for metric in count.columns},
+                index=count.index)
+        return pd.concat(columns, axis=1)
+
+
+class TrendAccumulator:
+    def __init__(self):
+        """Running least-squares slope of a series against its row index"""
+        self.n = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.sum_xx = 0.0
+        self.sum_xy = 0.0
+        self.last = np.nan
+        self.best = -np.inf
+
+    def update(self, values):
+        y = np.asarray(values, dtype=np.float64)
+        if y.size == 0:
+            return
+        x = np.arange(self.n, self.n + y.size, dtype=np.float64)
+        self.n += y.size
+        self.sum_x += x.sum()
+        self.sum_y += y.sum()
+        self.sum_xx += (x * x).sum()
+        self.sum_xy += (x * y).sum()
+        self.last = y[-1]
+        self.best = max(self.best, np.nanmax(y))
+
+    @property
+    def slope(self):
+        """Same value as np.polyfit(range(n), values, 1)[0]"""
+        denominator = self.n * self.sum_xx - self.sum_x ** 2
+        if self.n < 2 or denominator == 0:
+            return np.nan
+        return (self.n * self.sum_xy - self.sum_x * self.sum_y) / denominator
+
+
+class StreamingComparison:
+    def __init__(self, data_directory="./", chunksize=DEFAULT_CHUNKSIZE, max_centroids=2048):
+        """
+        Chunked ML vs Static comparison with bounded memory
+
+        Args:
+            data_directory: Directory containing the CSV files
+            chunksize: Rows read per chunk
+            max_centroids: Size bound of each quantile sketch
+        """
+        self.data_dir = Path(data_directory)
+        self.chunksize = chunksize
+        self.max_centroids = max_centroids
+        self.ml_results = {}
+        self.static_results = {}
+
+    def _stream_approach(self, prefix):
+        results = {'episodes': {}, 'intervals': {}, 'intervals_by_episode': None,
+                   'intervals_by_phase': None, 'reward_trend': None, 'rewards': None}
+
+        # Episode-level metrics (feed the summary table and the report)
+        episode_metrics = {m: MetricAccumulator(self.max_centroids) for m in SUMMARY_METRICS}
+        trend = TrendAccumulator()
+        episode_path = self.data_dir / f'{prefix}episode_results.csv'
+        for chunk in iter_csv_chunks(episode_path, SUMMARY_METRICS + ['CumulativeReward'], self.chunksize):
+            for metric, acc in episode_metrics.items():
+                if metric in chunk.columns:
+                    acc.update(chunk[metric].to_numpy())
+            if 'CumulativeReward' in chunk.columns:
+                trend.update(chunk['CumulativeReward'].to_numpy())
+        results['episodes'] = {m: acc.summary() for m, acc in episode_metrics.items()
+                               if acc.stats.count}
+        results['reward_trend'] = trend if trend.n else None
+
+        # Interval-level metrics, overall and per episode / per phase
+        interval_metrics = {m: MetricAccumulator(self.max_centroids) for m in INTERVAL_METRICS}
+        by_episode = GroupedRunningStats('Episode', self.max_centroids)
+        by_phase = GroupedRunningStats('CurrentPhase', self.max_centroids)
+        interval_path = self.data_dir / f'{prefix}interval_data.csv'
+        columns = INTERVAL_METRICS + ['Episode', 'CurrentPhase']
+        for chunk in iter_csv_chunks(interval_path, columns, self.chunksize):
+            for metric, acc in interval_metrics.items():
+                if metric in chunk.columns:
+                    acc.update(chunk[metric].to_numpy())
+            by_episode.update(chunk, INTERVAL_METRICS)
+            by_phase.update(chunk, INTERVAL_METRICS)
+        results['intervals'] = {m: acc.summary() for m, acc in interval_metrics.items()
+                                if acc.stats.count}
+        results['intervals_by_episode'] = by_episode.result()
+        results['intervals_by_phase'] = by_phase.result()
+
+        # Reward progress (per-step rows, the largest file in long runs)
+        reward_path = self.data_dir / f'{prefix}reward_progress.csv'
+        reward_columns = pd.read_csv(reward_path, nrows=0).columns
+        reward_metric = 'Reward' if 'Reward' in reward_columns else 'VehiclesWaiting'
+        by_reward_episode = GroupedRunningStats('Episode', self.max_centroids)
+        for chunk in iter_csv_chunks(reward_path, ['Episode', reward_metric], self.chunksize):
+            by_reward_episode.update(chunk, [reward_metric])
+        results['rewards'] = by_reward_episode.result()
+
+        return results
+
+    def process(self):
+        """Stream every CSV once and build the running aggregates"""
+        try:
+            self.ml_results = self._stream_approach('')
+            self.static_results = self._stream_approach('static_')
+            print("✅ All CSV files streamed successfully!")
+        except FileNotFoundError as e:
+            print(f"❌ Error loading files: {e}")
+            print("Make sure all CSV files are in the specified directory")
+        return self
+
+    def statistical_comparison(self, output_path='performance_comparison_summary.csv'):
+        """
+        Write the summary table of TrafficSignalComparison.statistical_comparison
+
+        The significance columns are NaN (bootstrap resampling is not streamed).
+        """
+        print("\n" + "="*60)
+        print("STATISTICAL COMPARISON (STREAMING)")
+        print("="*60)
+
+        ml_episodes = self.ml_results.get('episodes', {})
+        static_episodes = self.static_results.get('episodes', {})
+        summary_df = summary_table(ml_episodes, static_episodes)
+        summary_df = summary_df.reindex(columns=list(summary_df.columns) + SIGNIFICANCE_COLUMNS)
+
+        for row in summary_df.to_dict('records'):
+            metric = row['Metric']
+            improvement = row['Improvement_%']
+            print(f"\n{metric}:")
+            print(f"  ML Agent    - Mean: {row['ML_Mean']:.2f}, Std: {row['ML_Std']:.2f}, Median: {ml_episodes[metric]['median']:.2f}")
+            print(f"  Static      - Mean: {row['Static_Mean']:.2f}, Std: {row['Static_Std']:.2f}, Median: {static_episodes[metric]['median']:.2f}")
+            print(f"  Improvement: {improvement:.2f}% {'(ML better)' if improvement > 0 else '(Static better)'}")
+
+        print(f"\n{'='*60}")
+        print("SUMMARY TABLE")
+        print("="*60)
+        print(summary_df.to_string(index=False, float_format='%.2f'))
+
+        summary_df.to_csv(output_path, index=False)
+        print(f"\n📊 Summary saved to '{output_path}'")
+
+        return summary_df
+
+    def generate_performance_report(self):
+        """Streaming counterpart of TrafficSignalComparison.generate_performance_report"""
+        print("\n" + "="*70)
+        print("COMPREHENSIVE PERFORMANCE REPORT (STREAMING)")
+        print("="*70)
+
+        ml_better_count = 0
+        static_better_count = 0
+        for metric in SUMMARY_METRICS:
+            ml_stats = self.ml_results.get('episodes', {}).get(metric)
+            static_stats = self.static_results.get('episodes', {}).get(metric)
+            if ml_stats is None or static_stats is None:
+                continue
+            if metric == 'TotalVehicles':
+                better = 'ML' if ml_stats['mean'] > static_stats['mean'] else 'Static'
+            else:
+                better = 'ML' if ml_stats['mean'] < static_stats['mean'] else 'Static'
+            if better == 'ML':
+                ml_better_count += 1
+            else:
+                static_better_count += 1
+
+        print(f"\nOverall Performance Summary:")
+        print(f"  Metrics where ML performs better: {ml_better_count}")
+        print(f"  Metrics where Static performs better: {static_better_count}")
+
+        trend = self.ml_results.get('reward_trend')
+        if trend is not None and trend.n > 1:
+            print(f"\nML Learning Analysis:")
+            print(f"  Reward trend: {'Improving' if trend.slope > 0 else 'Declining'} ({trend.slope:.4f}/episode)")
+            print(f"  Final reward: {trend.last:.2f}")
+            print(f"  Best reward: {trend.best:.2f}")
+
+        for label, results in (('ML', self.ml_results), ('Static', self.static_results)):
+            by_phase = results.get('intervals_by_phase')
+            if by_phase is not None and not by_phase.empty:
+                print(f"\n{label} interval means per phase:")
+                print(by_phase['mean'].to_string(float_format='%.2f'))
+
+    def run_complete_analysis(self):
+        """Stream the logs and write the summary table and report"""
+        print("🚀 Starting streaming Traffic Signal Comparison Analysis...")
+        self.process()
+        summary_df = self.statistical_comparison()
+        self.generate_performance_report()
+        return summary_df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Chunked ML vs Static comparison with bounded memory")
+    parser.add_argument('--data-dir', default='./', help="Directory containing the CSV files")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help="Rows read per chunk")
+    args = parser.parse_args()
+
+    StreamingComparison(args.data_dir, chunksize=args.chunksize).run_complete_analysis()
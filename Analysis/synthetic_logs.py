@@ -0,0 +1,264 @@
+"""
+Synthetic traffic logs at arbitrary scale
+
+Writes all six logger CSVs with the exact column layout of the Unity loggers
+(see CSV_SCHEMAS in csv_cache.py), calibrated against the checked-in sample
+logs, so the analysis can be benchmarked on 10^3 to 10^8 rows. Every file is
+generated and written in fixed-size chunks, so memory use does not grow with
+the requested size.
+
+All files describe one simulated span of rows x INTERVAL_SECONDS seconds:
+
+- both controllers cycle through three phases; the static plan uses fixed
+  20/30/40 s greens, the ML agent a different split with jittered greens
+- vehicles arrive as a Poisson process (TotalVehicles is cumulative)
+- the waiting queue builds up over each phase and is drawn per sample, with a
+  lower mean for the ML agent than for the static controller
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+INTERVAL_SECONDS = 10.0
+ML_EPISODE_SECONDS = 30.0
+STATIC_EPISODE_SECONDS = 100.0
+STATIC_PROGRESS_SECONDS = 10.0 / 3
+
+ARRIVAL_RATE = 0.12  # vehicles per simulated second
+
+STATIC_GREEN_TIMES = np.array([20.0, 30.0, 40.0])
+ML_GREEN_TIMES = np.array([25.0, 35.0, 30.0])
+
+ML_MEAN_WAITING = 2.7
+STATIC_MEAN_WAITING = 3.6
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def file_row_counts(rows):
+    """
+    Rows written per file for a given scale
+
+    Args:
+        rows: Rows per interval file
+
+    Returns:
+        Dict mapping CSV filename to its number of rows
+    """
+    span = rows * INTERVAL_SECONDS
+    ml_episodes = max(int(span // ML_EPISODE_SECONDS), 1)
+    return {
+        'episode_results.csv': ml_episodes,
+        'reward_progress.csv': ml_episodes,
+        'interval_data.csv': rows,
+        'static_episode_results.csv': max(int(span // STATIC_EPISODE_SECONDS), 1),
+        'static_reward_progress.csv': max(int(span // STATIC_PROGRESS_SECONDS), 1),
+        'static_interval_data.csv': rows,
+    }
+
+
+def _phase_state(t, green_times):
+    """Phase index, its green time and the fraction of the phase elapsed at times t"""
+    ends = np.cumsum(green_times)
+    position = np.mod(t, ends[-1])
+    phase = np.searchsorted(ends, position, side='right')
+    phase = np.minimum(phase, green_times.size - 1)
+    elapsed = position - (ends[phase] - green_times[phase])
+    return phase, green_times[phase], elapsed / green_times[phase]
+
+
+def _sample_times(rng, start, stop, spacing):
+    """Monotonic sample times with a little logging jitter"""
+    index = np.arange(start, stop, dtype=np.float64)
+    return (index + 1) * spacing + rng.uniform(0, spacing * 0.05, index.size)
+
+
+def _waiting(rng, phase_fraction, mean):
+    return rng.poisson(mean * (0.5 + phase_fraction))
+
+
+def _arrivals(rng, t, state):
+    """Cumulative vehicle count at times t, continuing from the previous chunk"""
+    previous_t = np.concatenate([[state.get('t', 0.0)], t[:-1]])
+    counts = state.get('vehicles', 0) + np.cumsum(rng.poisson(ARRIVAL_RATE * (t - previous_t)))
+    state['t'] = t[-1]
+    state['vehicles'] = counts[-1]
+    return counts
+
+
+def _ml_intervals(rng, start, stop, state):
+    t = _sample_times(rng, start, stop, INTERVAL_SECONDS)
+    phase, green, fraction = _phase_state(t, ML_GREEN_TIMES)
+    waiting = _waiting(rng, fraction, ML_MEAN_WAITING)
+    return pd.DataFrame({
+        'SimulationTime': t,
+        'Episode': (t // ML_EPISODE_SECONDS).astype(np.int64),
+        'Step': np.floor(np.mod(t, ML_EPISODE_SECONDS) / ML_EPISODE_SECONDS * 24).astype(np.int64),
+        'TotalVehicles': _arrivals(rng, t, state),
+        'VehiclesWaiting': waiting,
+        'QueueLength': waiting,
+        'CumulativeReward': 0,
+        'CurrentReward': np.round(rng.normal(60, 10, t.size), 5),
+        'CurrentPhase': phase,
+        'GreenLightTime': np.clip(np.rint(green + rng.normal(0, 6, t.size)), 0, 49).astype(np.int64),
+        'FuelConsumed': 0,
+        'AverageWaitTime': 0,
+    })
+
+
+def _static_intervals(rng, start, stop, state):
+    t = _sample_times(rng, start, stop, INTERVAL_SECONDS)
+    phase, green, fraction = _phase_state(t, STATIC_GREEN_TIMES)
+    waiting = _waiting(rng, fraction, STATIC_MEAN_WAITING)
+    total = _arrivals(rng, t, state)
+    departed = np.maximum(total - waiting, 0)
+    episode_elapsed = np.mod(t, STATIC_EPISODE_SECONDS) + 1
+    return pd.DataFrame({
+        'SimulationTime': t,
+        'Episode': (t // STATIC_EPISODE_SECONDS).astype(np.int64) + 1,
+        'TotalVehicles': total,
+        'VehiclesWaiting': waiting,
+        'QueueLength': waiting,
+        'AverageWaitTime': 0,
+        'Throughput': np.round(departed / episode_elapsed, 5),
+        'CurrentPhase': phase,
+        'PhaseGreenTime': green.astype(np.int64),
+        'PhaseDuration': green.astype(np.int64),
+        'FuelConsumed': 0,
+        'VehiclesDeparted': departed,
+        'TrafficDensity': total,
+    })
+
+
+def _static_progress(rng, start, stop, state):
+    t = _sample_times(rng, start, stop, STATIC_PROGRESS_SECONDS)
+    _, _, fraction = _phase_state(t, STATIC_GREEN_TIMES)
+    return pd.DataFrame({
+        'Step': np.arange(start + 1, stop + 1),
+        'Episode': (t // STATIC_EPISODE_SECONDS).astype(np.int64) + 1,
+        'TotalVehicles': _arrivals(rng, t, state),
+        'VehiclesWaiting': _waiting(rng, fraction, STATIC_MEAN_WAITING),
+        'SimulationTime': t,
+    })
+
+
+def _ml_episodes(rng, start, stop, state):
+    episode = np.arange(start + 1, stop + 1)
+    t = episode * ML_EPISODE_SECONDS
+    # Episode rows report the state at a random moment of the episode
+    phase, green, fraction = _phase_state(t - rng.uniform(0, ML_EPISODE_SECONDS, t.size), ML_GREEN_TIMES)
+    reward = np.round(np.clip(rng.normal(60, 10, episode.size), 0, 100), 5)
+    return pd.DataFrame({
+        'Episode': episode,
+        'TotalVehicles': _arrivals(rng, t, state),
+        'VehiclesWaiting': _waiting(rng, fraction, ML_MEAN_WAITING),
+        'EpisodeDuration': np.round(np.clip(rng.normal(ML_EPISODE_SECONDS, 8, episode.size), 0, 50), 5),
+        'CumulativeReward': reward,
+        'CurrentReward': reward,
+        'CurrentPhase': phase,
+        'GreenLightTime': np.clip(np.rint(green + rng.normal(0, 6, episode.size)), 0, 49).astype(np.int64),
+        'FuelConsumed': 0,
+    })
+
+
+def _ml_rewards(rng, start, stop, state):
+    episode = np.arange(start + 1, stop + 1)
+    return pd.DataFrame({
+        'Step': rng.integers(7, 25, episode.size),
+        'Episode': episode,
+        'Reward': np.round(np.clip(rng.normal(60, 10, episode.size), 0, 100), 5),
+        'CumulativeReward': 0,
+    })
+
+
+def _static_episodes(rng, start, stop, state):
+    episode = np.arange(start + 1, stop + 1)
+    t = episode * STATIC_EPISODE_SECONDS
+    phase, green, fraction = _phase_state(t - rng.uniform(0, STATIC_EPISODE_SECONDS, t.size), STATIC_GREEN_TIMES)
+    total = _arrivals(rng, t, state)
+    return pd.DataFrame({
+        'Episode': episode,
+        'TotalVehicles': total,
+        'VehiclesWaiting': _waiting(rng, fraction, STATIC_MEAN_WAITING),
+        'EpisodeDuration': STATIC_EPISODE_SECONDS,
+        'AverageWaitTime': 0,
+        'Throughput': np.round(total / t, 5),
+        'CurrentPhase': phase,
+        'PhaseGreenTime': green.astype(np.int64),
+        'FuelConsumed': 0,
+    })
+
+
+GENERATORS = {
+    'episode_results.csv': _ml_episodes,
+    'reward_progress.csv': _ml_rewards,
+    'interval_data.csv': _ml_intervals,
+    'static_episode_results.csv': _static_episodes,
+    'static_reward_progress.csv': _static_progress,
+    'static_interval_data.csv': _static_intervals,
+}
+
+
+def write_log(path, generator, n_rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Write one synthetic CSV in chunks
+
+    Args:
+        path: Output CSV path
+        generator: Entry of GENERATORS
+        n_rows: Number of data rows
+        seed: Seed (a SeedSequence or int) for reproducible output
+        chunk_rows: Rows generated and written at a time
+
+    Returns:
+        Number of rows written
+    """
+    seeds = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    state = {}
+    n_chunks = max(-(-n_rows // chunk_rows), 1)
+    with open(path, 'w', newline='') as f:
+        for chunk_index, chunk_seed in enumerate(seeds.spawn(n_chunks)):
+            start = chunk_index * chunk_rows
+            stop = min(start + chunk_rows, n_rows)
+            if stop <= start:
+                break
+            chunk = generator(np.random.default_rng(chunk_seed), start, stop, state)
+            chunk.to_csv(f, header=chunk_index == 0, index=False)
+    return n_rows
+
+
+def generate_logs(output_dir, rows=10_000, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Write a full set of synthetic ML and static logs
+
+    Args:
+        output_dir: Directory the six CSV files are written to
+        rows: Rows per interval file; the other files scale with the same
+            simulated span (see file_row_counts)
+        seed: Seed for reproducible output
+        chunk_rows: Rows generated and written at a time
+
+    Returns:
+        Dict mapping CSV filename to its number of rows
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    counts = file_row_counts(rows)
+    for (filename, generator), file_seed in zip(GENERATORS.items(), np.random.SeedSequence(seed).spawn(len(GENERATORS))):
+        write_log(output_dir / filename, generator, counts[filename], file_seed, chunk_rows)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic traffic logs for benchmarking")
+    parser.add_argument('output_dir', help="Directory the CSV files are written to")
+    parser.add_argument('--rows', type=float, default=10_000, help="Rows per interval file (e.g. 1e6)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    counts = generate_logs(args.output_dir, int(args.rows), args.seed)
+    for filename, n_rows in counts.items():
+        print(f"✅ {filename}: {n_rows:,} rows")
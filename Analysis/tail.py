@@ -0,0 +1,258 @@
+"""
+Incremental ("tail") ingestion of CSV logs that are still being written
+
+Each CsvTail remembers how far into its file it has read and parses only the
+bytes appended since the last poll. A small anchor of the last bytes read is
+kept as well. If the file shrinks or the anchor no longer matches (the logger
+cleared and rewrote it), the tail re-baselines and re-reads the file from the
+start. LiveComparison feeds the new rows into running aggregates, so the cost
+of each summary refresh depends on the amount of new data, not on the file
+size. The optional live dashboard is the exception: drawing it needs the whole
+history, so each render costs time proportional to the logs and it is off by
+default.
+"""
+import io
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from comparison_stats import SUMMARY_METRICS, summary_table
+from csv_cache import CSV_SCHEMAS
+from streaming import INTERVAL_METRICS, RunningStats
+
+
+ANCHOR_BYTES = 64
+
+# Written on every refresh; statistical_comparison owns performance_comparison_summary.csv
+LIVE_SUMMARY_FILE = 'live_performance_summary.csv'
+
+# Log table -> metrics kept as running aggregates for the live summary
+LIVE_METRICS = {'episodes': SUMMARY_METRICS, 'intervals': INTERVAL_METRICS}
+
+
+class CsvTail:
+    def __init__(self, path):
+        """
+        Follow one CSV file, returning only newly appended rows
+
+        Args:
+            path: Path to the CSV file
+        """
+        self.path = Path(path)
+        self.offset = 0
+        self.header = None
+        self.anchor = b''
+
+    def reset(self):
+        """Forget everything read so far"""
+        self.offset = 0
+        self.header = None
+        self.anchor = b''
+
+    def _rewritten(self, f, size):
+        if size < self.offset:
+            return True
+        if not self.anchor:
+            return False
+        f.seek(self.offset - len(self.anchor))
+        return f.read(len(self.anchor)) != self.anchor
+
+    def poll(self):
+        """
+        Parse the rows appended since the last poll
+
+        Returns:
+            Tuple (rows, rebaselined): a DataFrame with the new complete rows (None
+            if there are none) and whether the file was truncated or rewritten, in
+            which case rows holds the whole file again
+        """
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return None, False
+
+        with open(self.path, 'rb') as f:
+            rebaselined = self._rewritten(f, size)
+            if rebaselined:
+                self.reset()
+            if size == self.offset:
+                return None, rebaselined
+
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+
+        # Hold back a partially written last line until it is complete
+        end = data.rfind(b'\n')
+        if end < 0:
+            return None, rebaselined
+        data = data[:end + 1]
+
+        if self.header is None:
+            header_end = data.find(b'\n') + 1
+            self.header = data[:header_end]
+            body = data[header_end:]
+        else:
+            body = data
+
+        self.offset += len(data)
+        self.anchor = data[-ANCHOR_BYTES:] if len(data) >= ANCHOR_BYTES else self._read_anchor()
+
+        if not body.strip():
+            return None, rebaselined
+
+        schema = CSV_SCHEMAS.get(self.path.name, {})
+        columns = self.header.decode().strip().split(',')
+        dtype = {c: schema[c] for c in columns if c in schema}
+        try:
+            rows = pd.read_csv(io.BytesIO(self.header + body), dtype=dtype)
+        except (ValueError, TypeError):
+            rows = pd.read_csv(io.BytesIO(self.header + body))
+        return rows, rebaselined
+
+    def _read_anchor(self):
+        start = max(self.offset - ANCHOR_BYTES, 0)
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return f.read(self.offset - start)
+
+
+class LiveComparison:
+    def __init__(self, comparison, refresh_seconds=30, dashboard_seconds=None):
+        """
+        Keep a TrafficSignalComparison up to date while the simulation runs
+
+        Args:
+            comparison: TrafficSignalComparison whose data directory is followed
+            refresh_seconds: Seconds between polls
+            dashboard_seconds: Re-render the dashboard at most this often, on a
+                refresh that saw new data (None disables it). Unlike the summary,
+                each render concatenates and redraws the full history.
+        """
+        self.comparison = comparison
+        self.refresh_seconds = refresh_seconds
+        self.dashboard_seconds = dashboard_seconds
+        self._last_dashboard = None
+        self.tails = {}
+        self.chunks = {}
+        self.stats = {}
+        self.refreshes = 0
+
+        for approach in ('ml', 'static'):
+            prefix = '' if approach == 'ml' else 'static_'
+            for key, filename in (('episodes', 'episode_results.csv'),
+                                  ('rewards', 'reward_progress.csv'),
+                                  ('intervals', 'interval_data.csv')):
+                self.tails[(approach, key)] = CsvTail(comparison.data_dir / (prefix + filename))
+                self.chunks[(approach, key)] = []
+                if key in LIVE_METRICS:
+                    self.stats[(approach, key)] = {m: RunningStats() for m in LIVE_METRICS[key]}
+
+    def poll(self):
+        """
+        Ingest newly appended rows from every followed CSV
+
+        Returns:
+            Number of new rows ingested
+        """
+        new_rows = 0
+        for (approach, key), tail in self.tails.items():
+            rows, rebaselined = tail.poll()
+            if rebaselined:
+                print(f"🔄 {tail.path.name} was truncated or rewritten, re-reading it")
+                self.chunks[(approach, key)] = []
+                if key in LIVE_METRICS:
+                    self.stats[(approach, key)] = {m: RunningStats() for m in LIVE_METRICS[key]}
+            if rows is None or rows.empty:
+                continue
+
+            new_rows += len(rows)
+            self.chunks[(approach, key)].append(rows)
+            for metric, stats in self.stats.get((approach, key), {}).items():
+                if metric in rows.columns:
+                    stats.update(rows[metric].to_numpy())
+
+        return new_rows
+
+    def sync_frames(self):
+        """
+        Collapse the appended chunks into the comparison's data frames
+
+        Only needed before plotting; the summary is served from the running
+        aggregates and never touches the frames.
+        """
+        for (approach, key), chunks in self.chunks.items():
+            data = self.comparison.ml_data if approach == 'ml' else self.comparison.static_data
+            if len(chunks) > 1:
+                chunks[:] = [pd.concat(chunks, ignore_index=True)]
+            if chunks:
+                data[key] = chunks[0]
+            else:
+                data.pop(key, None)
+        self.comparison._aligned = None
+        self.comparison._metrics = None
+
+    def summary(self):
+        """
+        Current summary table, computed from the running aggregates
+
+        Returns:
+            summary_table columns with a leading Source column ('episodes' or
+            'intervals')
+        """
+        tables = []
+        for key, metrics in LIVE_METRICS.items():
+            ml_stats, static_stats = (
+                {m: s.as_dict() for m, s in self.stats[(approach, key)].items() if s.count}
+                for approach in ('ml', 'static'))
+            table = summary_table(ml_stats, static_stats, metrics)
+            table.insert(0, 'Source', key)
+            tables.append(table)
+        return pd.concat(tables, ignore_index=True)
+
+    def refresh(self):
+        """Poll once, then rewrite the live summary CSV and (periodically) the dashboard"""
+        started = time.perf_counter()
+        new_rows = self.poll()
+        if not new_rows:
+            return 0
+
+        self.refreshes += 1
+        settings = self.comparison.render_settings
+        settings.output_dir.mkdir(parents=True, exist_ok=True)
+        summary_df = self.summary()
+        summary_df.to_csv(settings.output_dir / LIVE_SUMMARY_FILE, index=False)
+
+        if self.dashboard_seconds is not None and (
+                self._last_dashboard is None or started - self._last_dashboard >= self.dashboard_seconds):
+            self._last_dashboard = started
+            self.sync_frames()
+            if all(key in data for data in (self.comparison.ml_data, self.comparison.static_data)
+                   for key in ('episodes', 'intervals')):
+                # Every live render has new data, so a figure cache entry would never be hit
+                self.comparison.render_headless('dashboard', use_figure_cache=False)
+
+        elapsed = time.perf_counter() - started
+        improvements = ', '.join(f"{row['Metric']} {row['Improvement_%']:+.2f}%"
+                                 for row in summary_df.to_dict('records') if row['Source'] == 'episodes')
+        print(f"📡 +{new_rows} rows in {elapsed:.2f}s | {improvements or 'waiting for data'}")
+        return new_rows
+
+    def run(self, max_refreshes=None):
+        """
+        Poll the logs until interrupted (Ctrl+C) or max_refreshes polls have run
+
+        Args:
+            max_refreshes: Stop after this many polls (None runs until interrupted)
+        """
+        print(f"👀 Following CSV logs in {self.comparison.data_dir} every {self.refresh_seconds}s (Ctrl+C to stop)")
+        polls = 0
+        try:
+            while max_refreshes is None or polls < max_refreshes:
+                self.refresh()
+                polls += 1
+                if max_refreshes is None or polls < max_refreshes:
+                    time.sleep(self.refresh_seconds)
+        except KeyboardInterrupt:
+            print("\n⏹️ Stopped following logs")
+        return self.summary()
@@ -0,0 +1,393 @@
+"""
+TensorBoard event files and ML-Agents run logs, read without TensorFlow
+
+An ML-Agents results directory (e.g. Assets/results/TrafficRun02) holds one
+events.out.tfevents.* file per training session under each behavior directory,
+plus run_logs/timers.json and run_logs/training_status.json. Event files are
+TFRecord streams: every record is
+
+    uint64 length | uint32 masked CRC of length | <length> bytes | uint32 masked CRC
+
+and the payload is a serialized tensorflow.Event protobuf. Only the handful of
+fields needed for scalar summaries are decoded here, directly from the protobuf
+wire format, so neither TensorFlow nor protobuf has to be installed. Each event
+file is parsed once and kept in the columnar CsvCache; a resumed run only
+parses the file that grew.
+"""
+import json
+import mmap
+import struct
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csv_cache import CsvCache
+
+
+EVENT_FILE_PATTERN = 'events.out.tfevents.*'
+
+# TensorBoard tag -> column name used by the learning-curve analysis
+LEARNING_CURVE_TAGS = {
+    'Environment/Cumulative Reward': 'CumulativeReward',
+    'Environment/Episode Length': 'EpisodeLength',
+}
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_BYTES = 2
+_WIRE_FIXED32 = 5
+
+# tensorflow.DataType values of the tensors decoded as scalars
+_DT_FLOAT = 1
+_DT_DOUBLE = 2
+
+_DOUBLE = struct.Struct('<d')
+_FLOAT = struct.Struct('<f')
+_LENGTH = struct.Struct('<Q')
+
+
+def _varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(buf, start=0, end=None):
+    """Yield (field number, wire type, value) for every field of a message"""
+    pos = start
+    end = len(buf) if end is None else end
+    while pos < end:
+        key, pos = _varint(buf, pos)
+        field, wire = key >> 3, key & 7
+        if wire == _WIRE_VARINT:
+            value, pos = _varint(buf, pos)
+        elif wire == _WIRE_FIXED64:
+            value = buf[pos:pos + 8]
+            pos += 8
+        elif wire == _WIRE_BYTES:
+            size, pos = _varint(buf, pos)
+            value = buf[pos:pos + size]
+            pos += size
+        elif wire == _WIRE_FIXED32:
+            value = buf[pos:pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire}")
+        yield field, wire, value
+
+
+def iter_records(path):
+    """
+    Yield the payload of every complete record in a TFRecord file
+
+    A record cut short at the end of the file (the trainer is still writing
+    it) is silently dropped. CRCs are not verified.
+
+    Args:
+        path: Path to the event file
+
+    Returns:
+        Iterator of bytes payloads
+    """
+    with open(path, 'rb') as f:
+        size = Path(path).stat().st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = 0
+            while pos + 12 <= size:
+                length, = _LENGTH.unpack_from(data, pos)
+                start = pos + 12
+                end = start + length
+                if end + 4 > size:
+                    break
+                yield data[start:end]
+                pos = end + 4
+
+
+def _tensor_scalar(buf):
+    """Single float/double stored in a TensorProto, or None"""
+    dtype = None
+    values = []
+    content = None
+    for field, wire, value in _fields(buf):
+        if field == 1 and wire == _WIRE_VARINT:
+            dtype = value
+        elif field == 4 and wire == _WIRE_BYTES:
+            content = value
+        elif field == 5:
+            # float_val, packed or not
+            if wire == _WIRE_BYTES:
+                values.extend(v for (v,) in _FLOAT.iter_unpack(value))
+            else:
+                values.append(_FLOAT.unpack(value)[0])
+        elif field == 6:
+            if wire == _WIRE_BYTES:
+                values.extend(v for (v,) in _DOUBLE.iter_unpack(value))
+            else:
+                values.append(_DOUBLE.unpack(value)[0])
+
+    if content is not None and dtype in (_DT_FLOAT, _DT_DOUBLE):
+        unpacker = _FLOAT if dtype == _DT_FLOAT else _DOUBLE
+        if len(content) == unpacker.size:
+            return unpacker.unpack(content)[0]
+    return values[0] if len(values) == 1 else None
+
+
+def _summary_scalars(buf):
+    """(tag, value) for every scalar in a Summary message"""
+    for field, wire, value in _fields(buf):
+        if field != 1 or wire != _WIRE_BYTES:
+            continue
+        tag = None
+        scalar = None
+        for v_field, v_wire, v_value in _fields(value):
+            if v_field == 1 and v_wire == _WIRE_BYTES:
+                tag = bytes(v_value).decode('utf-8', 'replace')
+            elif v_field == 2 and v_wire == _WIRE_FIXED32:
+                scalar = _FLOAT.unpack(v_value)[0]
+            elif v_field == 8 and v_wire == _WIRE_BYTES:
+                scalar = _tensor_scalar(v_value)
+        if tag is not None and scalar is not None:
+            yield tag, scalar
+
+
+def read_event_scalars(path, tags=None):
+    """
+    Decode every scalar summary of one event file
+
+    Args:
+        path: Path to an events.out.tfevents.* file
+        tags: Optional collection of tags to keep (default: all scalar tags)
+
+    Returns:
+        DataFrame with Step (int64), WallTime (float64), Tag (category) and
+        Value (float64) columns, in file order
+    """
+    steps, wall_times, tag_list, values = [], [], [], []
+    for record in iter_records(path):
+        wall_time = np.nan
+        step = 0
+        summary = None
+        for field, wire, value in _fields(record):
+            if field == 1 and wire == _WIRE_FIXED64:
+                wall_time = _DOUBLE.unpack(value)[0]
+            elif field == 2 and wire == _WIRE_VARINT:
+                step = value
+            elif field == 5 and wire == _WIRE_BYTES:
+                summary = value
+        if summary is None:
+            continue
+        for tag, scalar in _summary_scalars(summary):
+            if tags is not None and tag not in tags:
+                continue
+            steps.append(step)
+            wall_times.append(wall_time)
+            tag_list.append(tag)
+            values.append(scalar)
+
+    return pd.DataFrame({
+        'Step': np.asarray(steps, dtype=np.int64),
+        'WallTime': np.asarray(wall_times, dtype=np.float64),
+        'Tag': pd.Categorical(tag_list),
+        'Value': np.asarray(values, dtype=np.float64),
+    })
+
+
+class TrainingRun:
+    def __init__(self, run_directory, use_cache=True):
+        """
+        Training history of one ML-Agents run
+
+        Args:
+            run_directory: Results directory of the run (the folder containing
+                the behavior directories and run_logs/)
+            use_cache: Keep the decoded event files in a columnar cache
+                (<behavior directory>/.cache, see csv_cache.py)
+        """
+        self.run_dir = Path(run_directory)
+        self.use_cache = use_cache
+        self._caches = {}
+        self._scalars = None
+
+    def event_files(self):
+        """Every event file of the run, oldest session first"""
+        files = [p for p in self.run_dir.glob(f'*/{EVENT_FILE_PATTERN}')
+                 if p.is_file() and p.suffix != '.meta']
+        return sorted(files)
+
+    def _read_event_file(self, path):
+        if not self.use_cache:
+            return read_event_scalars(path)
+        cache = self._caches.get(path.parent)
+        if cache is None:
+            cache = self._caches[path.parent] = CsvCache(path.parent)
+        return cache.read(path.name, loader=read_event_scalars)
+
+    def scalars(self, tags=None):
+        """
+        Scalar summaries of every event file in the run
+
+        When a run is resumed, the new session re-logs steps already present in
+        an older file; for every (tag, step) only the most recently written
+        value is kept.
+
+        Args:
+            tags: Optional collection of tags to keep (default: all)
+
+        Returns:
+            DataFrame with Behavior, Step, WallTime, Tag and Value columns,
+            sorted by tag and step
+        """
+        if self._scalars is None:
+            frames = []
+            for path in self.event_files():
+                df = self._read_event_file(path)
+                if len(df):
+                    df = df.assign(Behavior=path.parent.name)
+                    df['Tag'] = df['Tag'].astype(str)
+                    frames.append(df)
+            if frames:
+                scalars = pd.concat(frames, ignore_index=True)
+                scalars = (scalars.sort_values('WallTime', kind='stable')
+                           .drop_duplicates(['Behavior', 'Tag', 'Step'], keep='last')
+                           .sort_values(['Behavior', 'Tag', 'Step'], kind='stable')
+                           .reset_index(drop=True))
+                scalars['Tag'] = scalars['Tag'].astype('category')
+            else:
+                scalars = pd.DataFrame(columns=['Step', 'WallTime', 'Tag', 'Value', 'Behavior'])
+            self._scalars = scalars[['Behavior', 'Step', 'WallTime', 'Tag', 'Value']]
+
+        if tags is None:
+            return self._scalars
+        return self._scalars[self._scalars['Tag'].isin(list(tags))]
+
+    def learning_curve(self, behavior=None):
+        """
+        Reward and episode length per summary step
+
+        Args:
+            behavior: Behavior name (default: the first one in the run)
+
+        Returns:
+            DataFrame with Step, WallTime and one column per LEARNING_CURVE_TAGS
+            entry that was logged
+        """
+        scalars = self.scalars(LEARNING_CURVE_TAGS)
+        if scalars.empty:
+            return pd.DataFrame(columns=['Step', 'WallTime', *LEARNING_CURVE_TAGS.values()])
+        if behavior is None:
+            behavior = scalars['Behavior'].iloc[0]
+        scalars = scalars[scalars['Behavior'] == behavior]
+
+        curve = scalars.pivot_table(index='Step', columns='Tag', values='Value',
+                                    aggfunc='last', observed=True)
+        curve = curve.rename(columns=LEARNING_CURVE_TAGS)
+        curve.columns = list(curve.columns)
+        wall_time = scalars.groupby('Step')['WallTime'].max()
+        return curve.assign(WallTime=wall_time).reset_index()[
+            ['Step', 'WallTime', *[c for c in LEARNING_CURVE_TAGS.values() if c in curve.columns]]]
+
+    def checkpoints(self):
+        """
+        Checkpoints listed in run_logs/training_status.json
+
+        Returns:
+            DataFrame with Behavior, Steps, Reward, CreationTime and FilePath
+            columns (empty if the file is missing)
+        """
+        columns = ['Behavior', 'Steps', 'Reward', 'CreationTime', 'FilePath']
+        try:
+            with open(self.run_dir / 'run_logs' / 'training_status.json') as f:
+                status = json.load(f)
+        except (OSError, ValueError):
+            return pd.DataFrame(columns=columns)
+
+        rows = []
+        for behavior, entry in status.items():
+            if not isinstance(entry, dict):
+                continue
+            for checkpoint in entry.get('checkpoints', []):
+                rows.append({
+                    'Behavior': behavior,
+                    'Steps': checkpoint.get('steps'),
+                    'Reward': checkpoint.get('reward'),
+                    'CreationTime': checkpoint.get('creation_time'),
+                    'FilePath': checkpoint.get('file_path'),
+                })
+        checkpoints = pd.DataFrame(rows, columns=columns)
+        checkpoints['Reward'] = pd.to_numeric(checkpoints['Reward'], errors='coerce')
+        return checkpoints.sort_values(['Behavior', 'Steps'], kind='stable').reset_index(drop=True)
+
+    def gauges(self):
+        """
+        Gauges recorded in run_logs/timers.json for the last training session
+
+        Returns:
+            DataFrame with Name, Value, Min, Max and Count columns (empty if the
+            file is missing)
+        """
+        columns = ['Name', 'Value', 'Min', 'Max', 'Count']
+        try:
+            with open(self.run_dir / 'run_logs' / 'timers.json') as f:
+                timers = json.load(f)
+        except (OSError, ValueError):
+            return pd.DataFrame(columns=columns)
+
+        rows = [{'Name': name, 'Value': g.get('value'), 'Min': g.get('min'),
+                 'Max': g.get('max'), 'Count': g.get('count')}
+                for name, g in timers.get('gauges', {}).items()]
+        return pd.DataFrame(rows, columns=columns)
+
+
+def merge_learning_curves(training_curve, reward_progress):
+    """
+    Combine the TensorBoard learning curve with the CSV reward log
+
+    reward_progress.csv logs one row per episode with the number of decision
+    steps it took; those are accumulated into a step axis so both sources can
+    be plotted and trended on the same x axis.
+
+    Args:
+        training_curve: Output of TrainingRun.learning_curve()
+        reward_progress: DataFrame read from reward_progress.csv (may be None)
+
+    Returns:
+        DataFrame with Source ('tensorboard' or 'reward_progress'), Step,
+        Reward and EpisodeLength columns
+    """
+    frames = []
+    if training_curve is not None and len(training_curve):
+        frames.append(pd.DataFrame({
+            'Source': 'tensorboard',
+            'Step': training_curve['Step'].to_numpy(dtype=np.int64),
+            'Reward': training_curve.get('CumulativeReward', pd.Series(np.nan, index=training_curve.index)).to_numpy(dtype=np.float64),
+            'EpisodeLength': training_curve.get('EpisodeLength', pd.Series(np.nan, index=training_curve.index)).to_numpy(dtype=np.float64),
+        }))
+
+    if reward_progress is not None and len(reward_progress) and 'Reward' in reward_progress.columns:
+        steps = reward_progress['Step'].to_numpy(dtype=np.int64) if 'Step' in reward_progress.columns \
+            else np.ones(len(reward_progress), dtype=np.int64)
+        if np.any(np.diff(steps) < 0):
+            # Per-episode step counts rather than a global step counter
+            episode_lengths = steps.astype(np.float64)
+            steps = np.cumsum(steps)
+        else:
+            episode_lengths = np.full(steps.size, np.nan)
+        frames.append(pd.DataFrame({
+            'Source': 'reward_progress',
+            'Step': steps,
+            'Reward': reward_progress['Reward'].to_numpy(dtype=np.float64),
+            'EpisodeLength': episode_lengths,
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['Source', 'Step', 'Reward', 'EpisodeLength'])
+    return pd.concat(frames, ignore_index=True)